@@ -17,6 +17,9 @@ from .numpyextractors import (
     NumpySnippets,
 )
 from .zarrextractors import ZarrRecordingExtractor, ZarrSortingExtractor, read_zarr, get_default_zarr_compressor
+from .zarrcodecs import get_ephys_zarr_filters
+from .time_tools import PiecewiseLinearTimes
+from .interval_tools import IntervalSet
 from .binaryfolder import BinaryFolderRecording, read_binary_folder
 from .sortingfolder import NumpyFolderSorting, NpzFolderSorting, read_numpy_sorting_folder, read_npz_folder
 from .npysnippetsextractor import NpySnippetsExtractor, read_npy_snippets
@@ -95,6 +98,8 @@ from .recording_tools import (
     write_binary_recording,
     write_to_h5_dataset_format,
     get_random_data_chunks,
+    get_random_recording_slices,
+    random_chunks_cache,
     get_channel_distances,
     get_closest_channels,
     get_noise_levels,
@@ -1,4 +1,5 @@
 from __future__ import annotations
+import json
 import warnings
 from pathlib import Path
 
@@ -12,6 +13,7 @@ from .core_tools import (
     convert_seconds_to_str,
 )
 from .recording_tools import write_binary_recording
+from .time_tools import PiecewiseLinearTimes
 
 
 from .job_tools import split_job_kwargs
@@ -239,8 +241,9 @@ class BaseRecording(BaseRecordingSnippets):
         segment_index = self._check_segment_index(segment_index)
 
         if self.has_time_vector(segment_index):
-            times = self.get_times(segment_index)
-            segment_duration = times[-1] - times[0] + (1 / self.get_sampling_frequency())
+            num_samples = self.get_num_samples(segment_index=segment_index)
+            t_first, t_last = self.sample_index_to_time(np.array([0, num_samples - 1]), segment_index=segment_index)
+            segment_duration = t_last - t_first + (1 / self.get_sampling_frequency())
         else:
             segment_num_samples = self.get_num_samples(segment_index=segment_index)
             segment_duration = segment_num_samples / self.get_sampling_frequency()
@@ -426,7 +429,7 @@ class BaseRecording(BaseRecordingSnippets):
 
         return time_kwargs
 
-    def get_times(self, segment_index=None) -> np.ndarray:
+    def get_times(self, segment_index=None, start_frame=None, end_frame=None) -> np.ndarray:
         """Get time vector for a recording segment.
 
         If the segment has a time_vector, then it is returned. Otherwise
@@ -438,6 +441,10 @@ class BaseRecording(BaseRecordingSnippets):
         ----------
         segment_index : int or None, default: None
             The segment index (required for multi-segment)
+        start_frame : int or None, default: None
+            The first sample of the returned times
+        end_frame : int or None, default: None
+            The end sample (excluded) of the returned times
 
         Returns
         -------
@@ -446,7 +453,7 @@ class BaseRecording(BaseRecordingSnippets):
         """
         segment_index = self._check_segment_index(segment_index)
         rs = self._recording_segments[segment_index]
-        times = rs.get_times()
+        times = rs.get_times(start_frame=start_frame, end_frame=end_frame)
         return times
 
     def has_time_vector(self, segment_index=None):
@@ -472,8 +479,8 @@ class BaseRecording(BaseRecordingSnippets):
 
         Parameters
         ----------
-        times : 1d np.array
-            The time vector
+        times : 1d np.array or PiecewiseLinearTimes
+            The time vector, or its compact piecewise linear model (see `PiecewiseLinearTimes.from_time_vector()`)
         segment_index : int or None, default: None
             The segment index (required for multi-segment)
         with_warning : bool, default: True
@@ -486,7 +493,10 @@ class BaseRecording(BaseRecordingSnippets):
         assert rs.get_num_samples() == times.shape[0], "times have wrong shape"
 
         rs.t_start = None
-        rs.time_vector = times.astype("float64", copy=False)
+        if isinstance(times, PiecewiseLinearTimes):
+            rs.time_vector = times
+        else:
+            rs.time_vector = times.astype("float64", copy=False)
 
         if with_warning:
             warnings.warn(
@@ -610,8 +620,10 @@ class BaseRecording(BaseRecordingSnippets):
 
         for segment_index in range(self.get_num_segments()):
             if self.has_time_vector(segment_index):
-                # the use of get_times is preferred since timestamps are converted to array
-                time_vector = self.get_times(segment_index=segment_index)
+                time_vector = self._recording_segments[segment_index].time_vector
+                if not isinstance(time_vector, PiecewiseLinearTimes):
+                    # the use of get_times is preferred since timestamps are converted to array
+                    time_vector = self.get_times(segment_index=segment_index)
                 cached.set_times(time_vector, segment_index=segment_index)
 
         return cached
@@ -626,9 +638,13 @@ class BaseRecording(BaseRecordingSnippets):
         # load time vector if any
         for segment_index, rs in enumerate(self._recording_segments):
             time_file = folder / f"times_cached_seg{segment_index}.npy"
+            piecewise_time_file = folder / f"times_piecewise_seg{segment_index}.json"
             if time_file.is_file():
                 time_vector = np.load(time_file)
                 rs.time_vector = time_vector
+            elif piecewise_time_file.is_file():
+                with open(piecewise_time_file, "r") as f:
+                    rs.time_vector = PiecewiseLinearTimes.from_dict(json.load(f))
 
     def _extra_metadata_to_folder(self, folder):
         # save probe
@@ -640,7 +656,10 @@ class BaseRecording(BaseRecordingSnippets):
         for segment_index, rs in enumerate(self._recording_segments):
             d = rs.get_times_kwargs()
             time_vector = d["time_vector"]
-            if time_vector is not None:
+            if isinstance(time_vector, PiecewiseLinearTimes):
+                with open(folder / f"times_piecewise_seg{segment_index}.json", "w") as f:
+                    json.dump(time_vector.to_dict(), f)
+            elif time_vector is not None:
                 np.save(folder / f"times_cached_seg{segment_index}.npy", time_vector)
 
     def select_channels(self, channel_ids: list | np.array | tuple) -> "BaseRecording":
@@ -791,6 +810,15 @@ class BaseRecording(BaseRecordingSnippets):
         if not self.is_binary_compatible:
             raise NotImplementedError
 
+    def get_storage_chunk_size(self) -> int | None:
+        """
+        Returns the number of samples of the storage chunks (e.g. for a zarr recording), or None.
+        Used by `ensure_chunk_size()` to align the executor chunks on the storage chunks.
+        Preprocessors that keep the frames of their parent return the value of the parent.
+        """
+        # has to be changed in subclass if yes
+        return None
+
     def binary_compatible_with(
         self,
         dtype=None,
@@ -867,12 +895,18 @@ class BaseRecordingSegment(BaseSegment):
 
         BaseSegment.__init__(self)
 
-    def get_times(self) -> np.ndarray:
-        if self.time_vector is not None:
+    def get_times(self, start_frame=None, end_frame=None) -> np.ndarray:
+        if isinstance(self.time_vector, PiecewiseLinearTimes):
+            return self.time_vector.get_times(start_frame, end_frame)
+        elif self.time_vector is not None:
             self.time_vector = np.asarray(self.time_vector)
-            return self.time_vector
+            if start_frame is None and end_frame is None:
+                return self.time_vector
+            return self.time_vector[start_frame:end_frame]
         else:
-            time_vector = np.arange(self.get_num_samples(), dtype="float64")
+            start_frame = 0 if start_frame is None else start_frame
+            end_frame = self.get_num_samples() if end_frame is None else end_frame
+            time_vector = np.arange(start_frame, end_frame, dtype="float64")
             time_vector /= self.sampling_frequency
             if self.t_start is not None:
                 time_vector += self.t_start
@@ -922,6 +956,8 @@ class BaseRecordingSegment(BaseSegment):
             else:
                 sample_index = (time_s - self.t_start) * self.sampling_frequency
             sample_index = round(sample_index)
+        elif isinstance(self.time_vector, PiecewiseLinearTimes):
+            sample_index = self.time_vector.time_to_sample_index(time_s)
         else:
             sample_index = np.searchsorted(self.time_vector, time_s, side="right") - 1
 
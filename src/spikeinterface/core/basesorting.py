@@ -28,6 +28,8 @@ class BaseSorting(BaseExtractor):
         # caching
         self._cached_spike_vector = None
         self._cached_spike_trains = {}
+        # per-unit index of the spike vector, see get_unit_spike_index()
+        self._cached_unit_spike_index = None
 
     def __repr__(self):
         nseg = self.get_num_segments()
@@ -160,6 +162,9 @@ class BaseSorting(BaseExtractor):
             if end_frame is not None:
                 end = np.searchsorted(spike_frames, end_frame)
                 spike_frames = spike_frames[:end]
+            if not spike_frames.flags.writeable:
+                # views on the read-only per-unit index are copied, the returned spike train can be modified
+                spike_frames = spike_frames.copy()
         else:
             segment = self._sorting_segments[segment_index]
             spike_frames = segment.get_unit_spike_train(
@@ -168,8 +173,7 @@ class BaseSorting(BaseExtractor):
 
         if return_times:
             if self.has_recording():
-                times = self.get_times(segment_index=segment_index)
-                return times[spike_frames]
+                return self._recording.sample_index_to_time(spike_frames, segment_index=segment_index)
             else:
                 segment = self._sorting_segments[segment_index]
                 t_start = segment._t_start if segment._t_start is not None else 0
@@ -228,7 +232,7 @@ class BaseSorting(BaseExtractor):
         else:
             return False
 
-    def get_times(self, segment_index=None):
+    def get_times(self, segment_index=None, start_frame=None, end_frame=None):
         """
         Get time vector for a registered recording segment.
 
@@ -236,11 +240,13 @@ class BaseSorting(BaseExtractor):
             * if the segment has a time_vector, then it is returned
             * if not, a time_vector is constructed on the fly with sampling frequency
 
+        `start_frame` and `end_frame` restrict the returned times to a window of samples.
+
         If there is no registered recording it returns None
         """
         segment_index = self._check_segment_index(segment_index)
         if self.has_recording():
-            return self._recording.get_times(segment_index=segment_index)
+            return self._recording.get_times(segment_index=segment_index, start_frame=start_frame, end_frame=end_frame)
         else:
             return None
 
@@ -521,8 +527,6 @@ class BaseSorting(BaseExtractor):
             If True, will compute it from the spike vector.
             If False, will call `get_unit_spike_train` for each segment for each unit.
         """
-        from .sorting_tools import spike_vector_to_spike_trains
-
         unit_ids = self.unit_ids
 
         if from_spike_vector is None:
@@ -530,13 +534,58 @@ class BaseSorting(BaseExtractor):
             from_spike_vector = self._cached_spike_vector is not None
 
         if from_spike_vector:
-            self._cached_spike_trains = spike_vector_to_spike_trains(self.to_spike_vector(concatenated=False), unit_ids)
+            # one pass per segment: all spike trains are views on the per-unit index
+            self._cached_spike_trains = {}
+            for segment_index in range(self.get_num_segments()):
+                sample_indices, offsets = self.get_unit_spike_index(segment_index=segment_index)
+                self._cached_spike_trains[segment_index] = {
+                    unit_id: sample_indices[offsets[unit_index] : offsets[unit_index + 1]]
+                    for unit_index, unit_id in enumerate(unit_ids)
+                }
 
         else:
             for segment_index in range(self.get_num_segments()):
                 for unit_id in unit_ids:
                     self.get_unit_spike_train(unit_id, segment_index=segment_index, use_cache=True)
 
+    def get_unit_spike_index(self, segment_index=None):
+        """
+        Get a per-unit index (CSR-like) of the spike vector of one segment.
+
+        The index is built lazily from the spike vector the first time and then cached, so
+        that getting the spike train of a unit is a slice instead of a scan of the spike vector.
+
+        Parameters
+        ----------
+        segment_index : int or None, default: None
+            The segment index (required for multi-segment)
+
+        Returns
+        -------
+        sample_indices : np.array
+            The sample indices of the segment sorted by unit_index and then by sample_index (read-only).
+        offsets : np.array
+            The offsets of each unit in sample_indices (size num_units + 1, read-only): the spike train of
+            the unit with index u is `sample_indices[offsets[u] : offsets[u + 1]]`.
+        """
+        from .sorting_tools import spike_vector_to_unit_spike_index
+
+        segment_index = self._check_segment_index(segment_index)
+        spikes = self.to_spike_vector(concatenated=False)
+
+        # the index is invalidated if the cached spike vector has been replaced
+        if self._cached_unit_spike_index is None or self._cached_unit_spike_index[0] is not self._cached_spike_vector:
+            self._cached_unit_spike_index = (self._cached_spike_vector, {})
+
+        segment_indices = self._cached_unit_spike_index[1]
+        if segment_index not in segment_indices:
+            sample_indices, offsets = spike_vector_to_unit_spike_index(spikes[segment_index], self.get_num_units())
+            # the spike trains are views on the cached index: they must not be modified in place
+            sample_indices.flags.writeable = False
+            offsets.flags.writeable = False
+            segment_indices[segment_index] = (sample_indices, offsets)
+        return segment_indices[segment_index]
+
     def _custom_cache_spike_vector(self) -> None:
         """
         Function that can be implemented by some children sorting to quickly
@@ -749,6 +798,16 @@ class SpikeVectorSortingSegment(BaseSortingSegment):
         self.spikes_in_seg = None
 
     def get_unit_spike_train(self, unit_id, start_frame, end_frame):
+        sorting = self.parent_extractor
+        if sorting is not None and sorting._cached_spike_vector is self.spikes:
+            # O(1) slice in the per-unit index of the parent + searchsorted for frame bounds
+            sample_indices, offsets = sorting.get_unit_spike_index(segment_index=self.segment_index)
+            unit_index = self.unit_ids.index(unit_id)
+            times = sample_indices[offsets[unit_index] : offsets[unit_index + 1]]
+            start = 0 if start_frame is None else np.searchsorted(times, start_frame)
+            end = times.size if end_frame is None else np.searchsorted(times, end_frame)
+            return times[start:end]
+
         if self.spikes_in_seg is None:
             # the slicing of segment is done only once the first time
             # this fasten the constructor a lot
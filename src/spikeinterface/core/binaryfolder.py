@@ -18,6 +18,9 @@ class BinaryFolderRecording(BinaryRecordingExtractor):
     Parameters
     ----------
     folder_path : str or Path
+    read_engine : "auto" | "mmap" | "pread" | None, default: None
+        How traces are read from the file, see `BinaryRecordingExtractor`.
+        If None, the engine saved in the folder is used ("auto" for older folders).
 
     Returns
     -------
@@ -25,7 +28,7 @@ class BinaryFolderRecording(BinaryRecordingExtractor):
         The recording
     """
 
-    def __init__(self, folder_path):
+    def __init__(self, folder_path, read_engine=None):
         folder_path = Path(folder_path)
 
         with open(folder_path / "binary.json", "r") as f:
@@ -37,13 +40,15 @@ class BinaryFolderRecording(BinaryRecordingExtractor):
         assert d["relative_paths"]
 
         d = make_paths_absolute(d, folder_path)
+        if read_engine is not None:
+            d["kwargs"]["read_engine"] = read_engine
 
         BinaryRecordingExtractor.__init__(self, **d["kwargs"])
 
         folder_metadata = folder_path
         self.load_metadata_from_folder(folder_metadata)
 
-        self._kwargs = dict(folder_path=str(Path(folder_path).absolute()))
+        self._kwargs = dict(folder_path=str(Path(folder_path).absolute()), read_engine=read_engine)
         self._bin_kwargs = d["kwargs"]
         if "num_channels" not in self._bin_kwargs:
             assert "num_chan" in self._bin_kwargs, "Cannot find num_channels or num_chan in binary.json"
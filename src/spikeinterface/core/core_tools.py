@@ -183,6 +183,80 @@ def make_shared_array(shape, dtype):
     return arr, shm
 
 
+def dumps_to_shared_memory(obj, alignment=64):
+    """
+    Pickle an object into a SharedMemory block so that several processes can load it without copy.
+
+    The object is pickled with protocol 5 and all the numpy buffers are stored out-of-band in a single
+    SharedMemory block. Only a small descriptor (the pickle header, the buffer offsets and the
+    SharedMemory name) needs to be sent to workers, which call loads_from_shared_memory().
+
+    Parameters
+    ----------
+    obj : object
+        Any picklable object, typically a dict containing large numpy arrays
+    alignment : int, default: 64
+        Byte alignment of each buffer in the SharedMemory block
+
+    Returns
+    -------
+    descriptor : dict
+        The descriptor to give to loads_from_shared_memory()
+    shm : SharedMemory
+        The SharedMemory block, that must be closed and unlinked by the caller when workers are done
+    """
+    import pickle
+    from multiprocessing.shared_memory import SharedMemory
+
+    buffers = []
+    header = pickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+    raws = [buffer.raw() for buffer in buffers]
+
+    offsets = []
+    total_size = 0
+    for raw in raws:
+        offsets.append(total_size)
+        total_size += (raw.nbytes + alignment - 1) // alignment * alignment
+
+    shm = SharedMemory(name=None, create=True, size=max(total_size, 1))
+    for raw, offset in zip(raws, offsets):
+        shm.buf[offset : offset + raw.nbytes] = raw
+    sizes = [raw.nbytes for raw in raws]
+    del raws, buffers
+
+    descriptor = dict(shm_name=shm.name, header=header, offsets=offsets, sizes=sizes)
+    return descriptor, shm
+
+
+def loads_from_shared_memory(descriptor):
+    """
+    Load an object stored with dumps_to_shared_memory().
+
+    The numpy arrays of the returned object are read-only views on the SharedMemory block.
+
+    Parameters
+    ----------
+    descriptor : dict
+        The descriptor given by dumps_to_shared_memory()
+
+    Returns
+    -------
+    obj : object
+        The unpickled object
+    shm : SharedMemory
+        The attached SharedMemory block, a reference must be kept as long as obj is used
+    """
+    import pickle
+    from multiprocessing.shared_memory import SharedMemory
+
+    shm = SharedMemory(descriptor["shm_name"])
+    buffers = [
+        shm.buf[offset : offset + size].toreadonly() for offset, size in zip(descriptor["offsets"], descriptor["sizes"])
+    ]
+    obj = pickle.loads(descriptor["header"], buffers=buffers)
+    return obj, shm
+
+
 def is_dict_extractor(d: dict) -> bool:
     """
     Check if a dict describes an extractor.
@@ -2,6 +2,7 @@ from __future__ import annotations
 import numpy as np
 
 from .baserecording import BaseRecording, BaseRecordingSegment
+from .time_tools import PiecewiseLinearTimes
 
 
 class FrameSliceRecording(BaseRecording):
@@ -76,7 +77,10 @@ class FrameSliceRecordingSegment(BaseRecordingSegment):
         if d["time_vector"] is None:
             d["t_start"] = parent_recording_segment.sample_index_to_time(start_frame)
         else:
-            d["time_vector"] = d["time_vector"][start_frame:end_frame]
+            if isinstance(d["time_vector"], PiecewiseLinearTimes):
+                d["time_vector"] = d["time_vector"].slice(start_frame, end_frame)
+            else:
+                d["time_vector"] = d["time_vector"][start_frame:end_frame]
         BaseRecordingSegment.__init__(self, **d)
         self._parent_recording_segment = parent_recording_segment
         self.start_frame = start_frame
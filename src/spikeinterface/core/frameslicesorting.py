@@ -4,6 +4,7 @@ import warnings
 
 from .basesorting import BaseSorting, BaseSortingSegment
 from .waveform_tools import has_exceeding_spikes
+from .interval_tools import IntervalSet
 
 
 class FrameSliceSorting(BaseSorting):
@@ -96,6 +97,22 @@ class FrameSliceSorting(BaseSorting):
             "check_spike_frames": check_spike_frames,
         }
 
+    def _custom_cache_spike_vector(self) -> None:
+        if self._parent._cached_spike_vector is None:
+            self._parent._custom_cache_spike_vector()
+
+            if self._parent._cached_spike_vector is None:
+                return
+
+        parent_spike_vector = self._parent._cached_spike_vector
+        segment = self._sorting_segments[0]
+        frames = IntervalSet([segment.start_frame], [segment.end_frame])
+        # np.array() necessary to fix 'read-only' crash with memmaps.
+        spike_vector = np.array(parent_spike_vector[frames.select_sorted(parent_spike_vector["sample_index"])])
+        # start_frame can be a float: same truncation as the spike vector built from the spike trains
+        spike_vector["sample_index"] = spike_vector["sample_index"] - segment.start_frame
+        self._cached_spike_vector = spike_vector
+
 
 class FrameSliceSortingSegment(BaseSortingSegment):
     def __init__(self, parent_sorting_segment, start_frame, end_frame):
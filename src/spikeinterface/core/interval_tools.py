@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import numpy as np
+
+
+class IntervalSet:
+    """
+    Set of half-open frame intervals `[start, stop)` stored as sorted `starts` and `stops` arrays.
+
+    Overlapping and contiguous intervals are merged at construction, so that both arrays are sorted and the
+    intervals are disjoint: the intervals that overlap a chunk of traces are then found with two binary searches
+    and masks are generated without a loop over intervals. This is the structure used to silence periods,
+    blank artifacts or select the spikes of a frame range.
+
+    Parameters
+    ----------
+    starts : array of int
+        The first frame of each interval
+    stops : array of int
+        The frame after the last frame of each interval (excluded)
+    """
+
+    def __init__(self, starts, stops):
+        starts = np.asarray(starts, dtype="int64").reshape(-1)
+        stops = np.asarray(stops, dtype="int64").reshape(-1)
+        assert starts.size == stops.size, "starts and stops must have the same size"
+        assert np.all(stops >= starts), "stops must be larger than starts"
+
+        # empty intervals are dropped
+        keep = stops > starts
+        starts, stops = starts[keep], stops[keep]
+        order = np.argsort(starts, kind="stable")
+        starts, stops = starts[order], stops[order]
+
+        if starts.size > 1:
+            # an interval starts a new group when it begins after the end of all the previous ones
+            max_stops = np.maximum.accumulate(stops)
+            new_group = np.ones(starts.size, dtype=bool)
+            new_group[1:] = starts[1:] > max_stops[:-1]
+            group_ends = np.append(np.flatnonzero(new_group)[1:], starts.size) - 1
+            starts = starts[new_group]
+            stops = max_stops[group_ends]
+
+        self.starts = starts
+        self.stops = stops
+
+    @classmethod
+    def from_periods(cls, periods) -> "IntervalSet":
+        """
+        Build the set from a (num_periods, 2) array-like of (start_frame, end_frame).
+        """
+        periods = np.asarray(periods, dtype="int64").reshape(-1, 2)
+        return cls(periods[:, 0], periods[:, 1])
+
+    def __len__(self):
+        return self.starts.size
+
+    def __repr__(self):
+        return f"IntervalSet(num_intervals={len(self)})"
+
+    @property
+    def num_frames(self):
+        """
+        The total number of frames covered by the intervals.
+        """
+        return int(np.sum(self.stops - self.starts))
+
+    def find_overlapping(self, start_frame: int, end_frame: int):
+        """
+        Return the range `(first, last)` of the indices of the intervals that overlap `[start_frame, end_frame)`.
+        """
+        first = int(np.searchsorted(self.stops, start_frame, side="right"))
+        last = int(np.searchsorted(self.starts, end_frame, side="left"))
+        return first, max(first, last)
+
+    def get_local_intervals(self, start_frame: int, end_frame: int):
+        """
+        Return the starts and stops of the intervals that overlap `[start_frame, end_frame)`, clipped to it and
+        relative to `start_frame`.
+        """
+        first, last = self.find_overlapping(start_frame, end_frame)
+        local_starts = np.maximum(self.starts[first:last], start_frame) - start_frame
+        local_stops = np.minimum(self.stops[first:last], end_frame) - start_frame
+        return local_starts, local_stops
+
+    def get_mask(self, start_frame: int, end_frame: int):
+        """
+        Boolean mask of length `end_frame - start_frame` that is True for the frames inside the intervals.
+        """
+        local_starts, local_stops = self.get_local_intervals(start_frame, end_frame)
+        # the intervals are disjoint and not contiguous so the clipped bounds are unique
+        counts = np.zeros(end_frame - start_frame + 1, dtype="int8")
+        counts[local_starts] += 1
+        counts[local_stops] -= 1
+        return np.cumsum(counts[:-1], dtype="int8").astype(bool)
+
+    def contains(self, frames):
+        """
+        Vectorized test of the frames that are inside the intervals.
+        """
+        frames = np.asarray(frames)
+        inds = np.searchsorted(self.starts, frames, side="right") - 1
+        inside = inds >= 0
+        inside[inside] = frames[inside] < self.stops[inds[inside]]
+        return inside
+
+    def select_sorted(self, sorted_frames):
+        """
+        Return the indices of the elements of the sorted array `sorted_frames` that are inside the intervals
+        (for instance spikes of a spike vector), without testing every element.
+        """
+        sorted_frames = np.asarray(sorted_frames)
+        lefts = np.searchsorted(sorted_frames, self.starts, side="left")
+        rights = np.searchsorted(sorted_frames, self.stops, side="left")
+        if lefts.size == 1:
+            return np.arange(lefts[0], rights[0])
+        lengths = rights - lefts
+        # concatenation of the ranges lefts[i]:rights[i]
+        offsets = np.repeat(lefts - np.cumsum(np.append(0, lengths[:-1])), lengths)
+        return np.arange(np.sum(lengths)) + offsets
@@ -7,7 +7,13 @@ import numpy as np
 import platform
 import os
 import warnings
-from spikeinterface.core.core_tools import convert_string_to_bytes, convert_bytes_to_str, convert_seconds_to_str
+from spikeinterface.core.core_tools import (
+    convert_string_to_bytes,
+    convert_bytes_to_str,
+    convert_seconds_to_str,
+    dumps_to_shared_memory,
+    loads_from_shared_memory,
+)
 
 import sys
 from tqdm.auto import tqdm
@@ -35,6 +41,9 @@ _shared_job_kwargs_doc = """**job_kwargs : keyword arguments for parallel proces
             * mp_context : "fork" | "spawn" | None, default: None
                 Context for multiprocessing. It can be None, "fork" or "spawn".
                 Note that "fork" is only safely available on LINUX systems
+            * prefetch_depth : int, default: 0
+                Number of chunks read ahead by a reader thread in each worker while the current chunk is processed
+                (only for functions supporting it). 0 disables the read-ahead.
     """
 
 
@@ -47,6 +56,7 @@ job_keys = (
     "progress_bar",
     "mp_context",
     "max_threads_per_process",
+    "prefetch_depth",
 )
 
 # theses key are the same and should not be in th final dict
@@ -199,6 +209,10 @@ def ensure_chunk_size(
     If chunk_size/chunk_memory/total_memory are all None then there is no chunk computing
     and the full trace is retrieved at once.
 
+    When the chunk size is derived from memory or duration and the recording has a storage chunk size
+    (see `BaseRecording.get_storage_chunk_size()`, for instance a zarr recording), it is rounded to a multiple
+    of the storage chunk size so that executor chunks are aligned on the storage chunk grid.
+
     Parameters
     ----------
     chunk_size : int or None
@@ -213,6 +227,7 @@ def ensure_chunk_size(
         Units are second if float.
         If str then the str must contain units(e.g. "1s", "500ms")
     """
+    align_to_storage = chunk_size is None and any(v is not None for v in (chunk_memory, total_memory, chunk_duration))
     if chunk_size is not None:
         # manual setting
         chunk_size = int(chunk_size)
@@ -253,6 +268,10 @@ def ensure_chunk_size(
         else:
             raise ValueError("For n_jobs >1 you must specify total_memory or chunk_size or chunk_memory")
 
+    storage_chunk_size = recording.get_storage_chunk_size()
+    if storage_chunk_size is not None and align_to_storage:
+        chunk_size = max(1, int(round(chunk_size / storage_chunk_size))) * storage_chunk_size
+
     return chunk_size
 
 
@@ -306,6 +325,15 @@ class ChunkRecordingExecutor:
         If None, no limits.
     progress_bar : bool, default: False
         If True, a progress bar is printed to monitor the progress of the process
+    prefetch_func : function or None, default: None
+        Function that reads the data of a chunk, with the same signature as "func".
+        When given (and prefetch_depth > 0), it is run by a reader thread on the next chunks while "func"
+        processes the current one, and its result is given to "func" in `worker_ctx["prefetched_data"]`.
+        This overlaps I/O and computation. Note that "func" and "prefetch_func" then run concurrently in
+        the same process and should not share non thread-safe objects.
+    prefetch_depth : int, default: 0
+        Maximum number of chunks read in advance by each worker. 0 disables the read-ahead.
+        In parallel mode, consecutive chunks are sent by batch to the workers so that they can be read ahead.
 
 
     Returns
@@ -332,11 +360,15 @@ class ChunkRecordingExecutor:
         mp_context=None,
         job_name="",
         max_threads_per_process=1,
+        prefetch_func=None,
+        prefetch_depth=0,
     ):
         self.recording = recording
         self.func = func
         self.init_func = init_func
         self.init_args = init_args
+        self.prefetch_func = prefetch_func
+        self.prefetch_depth = int(prefetch_depth) if prefetch_func is not None else 0
 
         if mp_context is None:
             mp_context = recording.get_preferred_mp_context()
@@ -382,11 +414,20 @@ class ChunkRecordingExecutor:
                 f"chunk_duration={chunk_duration_str}",
             )
 
-    def run(self):
+    def run(self, recording_slices=None):
         """
         Runs the defined jobs.
+
+        Parameters
+        ----------
+        recording_slices : list of tuple or None, default: None
+            List of (segment_index, start_frame, end_frame) to process instead of the whole recording
+            divided in chunks of `chunk_size`
         """
-        all_chunks = divide_recording_into_chunks(self.recording, self.chunk_size)
+        if recording_slices is None:
+            all_chunks = divide_recording_into_chunks(self.recording, self.chunk_size)
+        else:
+            all_chunks = list(recording_slices)
 
         if self.handle_returns:
             returns = []
@@ -394,36 +435,72 @@ class ChunkRecordingExecutor:
             returns = None
 
         if self.n_jobs == 1:
+            worker_ctx = self.init_func(*self.init_args)
+            if self.prefetch_depth > 0:
+                results = run_chunks_with_prefetch(
+                    all_chunks, self.func, self.prefetch_func, worker_ctx, self.prefetch_depth
+                )
+            else:
+                results = (self.func(*chunk, worker_ctx) for chunk in all_chunks)
+
             if self.progress_bar:
-                all_chunks = tqdm(all_chunks, ascii=True, desc=self.job_name)
+                results = tqdm(results, ascii=True, desc=self.job_name, total=len(all_chunks))
 
-            worker_ctx = self.init_func(*self.init_args)
-            for segment_index, frame_start, frame_stop in all_chunks:
-                res = self.func(segment_index, frame_start, frame_stop, worker_ctx)
+            for res in results:
                 if self.handle_returns:
                     returns.append(res)
                 if self.gather_func is not None:
                     self.gather_func(res)
         else:
             n_jobs = min(self.n_jobs, len(all_chunks))
+            mp_context = mp.get_context(self.mp_context)
+
+            if mp_context.get_start_method() == "fork":
+                # forked workers inherit init_args, nothing is serialized
+                init_args, init_args_shm, shm = self.init_args, None, None
+            else:
+                # init_args (recording chain included) are pickled once in a shared memory blob that all
+                # workers read, instead of being pickled and sent to each worker
+                init_args_shm, shm = dumps_to_shared_memory(self.init_args)
+                init_args = None
 
             # parallel
-            with ProcessPoolExecutor(
-                max_workers=n_jobs,
-                initializer=worker_initializer,
-                mp_context=mp.get_context(self.mp_context),
-                initargs=(self.func, self.init_func, self.init_args, self.max_threads_per_process),
-            ) as executor:
-                results = executor.map(function_wrapper, all_chunks)
-
-                if self.progress_bar:
-                    results = tqdm(results, desc=self.job_name, total=len(all_chunks))
-
-                for res in results:
-                    if self.handle_returns:
-                        returns.append(res)
-                    if self.gather_func is not None:
-                        self.gather_func(res)
+            try:
+                with ProcessPoolExecutor(
+                    max_workers=n_jobs,
+                    initializer=worker_initializer,
+                    mp_context=mp_context,
+                    initargs=(
+                        self.func,
+                        self.init_func,
+                        init_args,
+                        self.max_threads_per_process,
+                        self.prefetch_func,
+                        self.prefetch_depth,
+                        init_args_shm,
+                    ),
+                ) as executor:
+                    if self.prefetch_depth > 0:
+                        # workers receive batches of consecutive chunks, so they know what to read ahead
+                        batch_size = max(1, int(np.ceil(len(all_chunks) / (n_jobs * 4))))
+                        batches = [all_chunks[i : i + batch_size] for i in range(0, len(all_chunks), batch_size)]
+                        results = executor.map(function_wrapper_prefetch, batches)
+                        results = (res for batch_results in results for res in batch_results)
+                    else:
+                        results = executor.map(function_wrapper, all_chunks)
+
+                    if self.progress_bar:
+                        results = tqdm(results, desc=self.job_name, total=len(all_chunks))
+
+                    for res in results:
+                        if self.handle_returns:
+                            returns.append(res)
+                        if self.gather_func is not None:
+                            self.gather_func(res)
+            finally:
+                if shm is not None:
+                    shm.close()
+                    shm.unlink()
 
         return returns
 
@@ -436,14 +513,22 @@ global _worker_ctx
 global _func
 
 
-def worker_initializer(func, init_func, init_args, max_threads_per_process):
+def worker_initializer(
+    func, init_func, init_args, max_threads_per_process, prefetch_func=None, prefetch_depth=0, init_args_shm=None
+):
     global _worker_ctx
+    global _init_args_shm
+    if init_args_shm is not None:
+        # the numpy arrays of init_args are read-only views on the shared memory that must stay attached
+        init_args, _init_args_shm = loads_from_shared_memory(init_args_shm)
     if max_threads_per_process is None:
         _worker_ctx = init_func(*init_args)
     else:
         with threadpool_limits(limits=max_threads_per_process):
             _worker_ctx = init_func(*init_args)
     _worker_ctx["max_threads_per_process"] = max_threads_per_process
+    _worker_ctx["prefetch_func"] = prefetch_func
+    _worker_ctx["prefetch_depth"] = prefetch_depth
     global _func
     _func = func
 
@@ -460,6 +545,66 @@ def function_wrapper(args):
             return _func(segment_index, start_frame, end_frame, _worker_ctx)
 
 
+def function_wrapper_prefetch(chunks):
+    global _func
+    global _worker_ctx
+    max_threads_per_process = _worker_ctx["max_threads_per_process"]
+    prefetch_func = _worker_ctx["prefetch_func"]
+    prefetch_depth = _worker_ctx["prefetch_depth"]
+    if max_threads_per_process is None:
+        return list(run_chunks_with_prefetch(chunks, _func, prefetch_func, _worker_ctx, prefetch_depth))
+    else:
+        with threadpool_limits(limits=max_threads_per_process):
+            return list(run_chunks_with_prefetch(chunks, _func, prefetch_func, _worker_ctx, prefetch_depth))
+
+
+def run_chunks_with_prefetch(chunks, func, prefetch_func, worker_ctx, prefetch_depth):
+    """
+    Generator running `func` on chunks while a reader thread runs `prefetch_func` on the next chunks.
+
+    At most `prefetch_depth` prefetched chunks wait in memory (bounded queue). The result of
+    `prefetch_func` is given to `func` in `worker_ctx["prefetched_data"]`.
+    An exception in the reader thread is raised in the calling thread.
+    """
+    import queue
+    import threading
+
+    data_queue = queue.Queue(maxsize=prefetch_depth)
+    stop_event = threading.Event()
+
+    def reader():
+        for chunk in chunks:
+            try:
+                item = (chunk, prefetch_func(*chunk, worker_ctx), None)
+            except Exception as e:
+                item = (chunk, None, e)
+            # do not block forever if the consumer has stopped
+            while not stop_event.is_set():
+                try:
+                    data_queue.put(item, timeout=0.1)
+                    break
+                except queue.Full:
+                    pass
+            if item[2] is not None or stop_event.is_set():
+                return
+
+    thread = threading.Thread(target=reader, name="chunk_prefetch", daemon=True)
+    thread.start()
+    try:
+        for _ in range(len(chunks)):
+            chunk, data, error = data_queue.get()
+            if error is not None:
+                raise error
+            worker_ctx["prefetched_data"] = data
+            try:
+                yield func(*chunk, worker_ctx)
+            finally:
+                worker_ctx.pop("prefetched_data", None)
+    finally:
+        stop_event.set()
+        thread.join()
+
+
 # Here some utils copy/paste from DART (Charlie Windolf)
 
 
@@ -501,6 +501,7 @@ def run_node_pipeline(
         gather_func=gather_func,
         job_name=job_name,
         verbose=verbose,
+        prefetch_func=_read_peak_pipeline_chunk,
         **job_kwargs,
     )
 
@@ -519,15 +520,26 @@ def _init_peak_pipeline(recording, nodes):
     return worker_ctx
 
 
-def _compute_peak_pipeline_chunk(segment_index, start_frame, end_frame, worker_ctx):
+def _read_peak_pipeline_chunk(segment_index, start_frame, end_frame, worker_ctx):
     recording = worker_ctx["recording"]
     max_margin = worker_ctx["max_margin"]
-    nodes = worker_ctx["nodes"]
 
     recording_segment = recording._recording_segments[segment_index]
     traces_chunk, left_margin, right_margin = get_chunk_with_margin(
         recording_segment, start_frame, end_frame, None, max_margin, add_zeros=True
     )
+    return traces_chunk, left_margin, right_margin
+
+
+def _compute_peak_pipeline_chunk(segment_index, start_frame, end_frame, worker_ctx):
+    max_margin = worker_ctx["max_margin"]
+    nodes = worker_ctx["nodes"]
+
+    # traces can have been read ahead by the executor
+    prefetched_data = worker_ctx.get("prefetched_data", None)
+    if prefetched_data is None:
+        prefetched_data = _read_peak_pipeline_chunk(segment_index, start_frame, end_frame, worker_ctx)
+    traces_chunk, left_margin, right_margin = prefetched_data
 
     # compute the graph
     pipeline_outputs = {}
@@ -34,6 +34,18 @@ class NpzSortingExtractor(BaseSorting):
 
         self._kwargs = {"file_path": str(Path(file_path).absolute())}
 
+    def _custom_cache_spike_vector(self) -> None:
+        from .sorting_tools import spike_vector_from_unit_labels
+
+        spikes = []
+        for segment_index, segment in enumerate(self._sorting_segments):
+            spikes.append(
+                spike_vector_from_unit_labels(
+                    segment.spike_indexes, segment.spike_labels, self.unit_ids, segment_index=segment_index
+                )
+            )
+        self._cached_spike_vector = np.concatenate(spikes)
+
     @staticmethod
     def write_sorting(sorting, save_path):
         d = {}
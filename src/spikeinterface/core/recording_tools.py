@@ -5,6 +5,8 @@ import warnings
 from pathlib import Path
 import os
 import mmap
+import weakref
+from contextlib import contextmanager
 import tqdm
 
 
@@ -16,6 +18,7 @@ from .job_tools import (
     ensure_n_jobs,
     divide_segment_into_chunks,
     fix_job_kwargs,
+    split_job_kwargs,
     ChunkRecordingExecutor,
     _shared_job_kwargs_doc,
 )
@@ -144,11 +147,30 @@ def write_binary_recording(
     init_func = _init_binary_worker
     init_args = (recording, file_path_dict, dtype, byte_offset, cast_unsigned)
     executor = ChunkRecordingExecutor(
-        recording, func, init_func, init_args, job_name="write_binary_recording", verbose=verbose, **job_kwargs
+        recording,
+        func,
+        init_func,
+        init_args,
+        job_name="write_binary_recording",
+        verbose=verbose,
+        prefetch_func=_read_binary_chunk,
+        **job_kwargs,
     )
     executor.run()
 
 
+# used by write_binary_recording + ChunkRecordingExecutor (read-ahead thread)
+def _read_binary_chunk(segment_index, start_frame, end_frame, worker_ctx):
+    recording = worker_ctx["recording"]
+    traces = recording.get_traces(
+        start_frame=start_frame,
+        end_frame=end_frame,
+        segment_index=segment_index,
+        cast_unsigned=worker_ctx["cast_unsigned"],
+    )
+    return traces
+
+
 # used by write_binary_recording + ChunkRecordingExecutor
 def _write_binary_chunk(segment_index, start_frame, end_frame, worker_ctx):
     # recover variables of the worker
@@ -178,10 +200,12 @@ def _write_binary_chunk(segment_index, start_frame, end_frame, worker_ctx):
     shape = (num_frames, num_channels)
     memmap_array = np.ndarray(shape=shape, dtype=dtype, buffer=memmap_obj, offset=start_offset)
 
-    # Extract the traces and store them in the memmap array
-    traces = recording.get_traces(
-        start_frame=start_frame, end_frame=end_frame, segment_index=segment_index, cast_unsigned=cast_unsigned
-    )
+    # Extract the traces (unless already read ahead) and store them in the memmap array
+    traces = worker_ctx.get("prefetched_data", None)
+    if traces is None:
+        traces = recording.get_traces(
+            start_frame=start_frame, end_frame=end_frame, segment_index=segment_index, cast_unsigned=cast_unsigned
+        )
 
     if traces.dtype != dtype:
         traces = traces.astype(dtype, copy=False)
@@ -512,6 +536,99 @@ def determine_cast_unsigned(recording, dtype):
     return cast_unsigned
 
 
+def get_random_recording_slices(
+    recording,
+    num_chunks_per_segment=20,
+    chunk_size=10000,
+    seed=0,
+    margin_frames=0,
+):
+    """
+    Draw random chunks across segments, see `get_random_data_chunks()`.
+
+    Returns
+    -------
+    recording_slices : list
+        List of (segment_index, start_frame, end_frame)
+    """
+    # TODO: if segment have differents length make another sampling that dependant on the length of the segment
+    # Should be done by changing kwargs with total_num_chunks=XXX and total_duration=YYYY
+    # And randomize the number of chunk per segment weighted by segment duration
+
+    # check chunk size
+    num_segments = recording.get_num_segments()
+    for segment_index in range(num_segments):
+        chunk_size_limit = recording.get_num_frames(segment_index) - 2 * margin_frames
+        if chunk_size > chunk_size_limit:
+            chunk_size = chunk_size_limit - 1
+            warnings.warn(
+                f"chunk_size is greater than the number "
+                f"of samples for segment index {segment_index}. "
+                f"Using {chunk_size}."
+            )
+
+    rng = np.random.default_rng(seed)
+    recording_slices = []
+    low = margin_frames
+    size = num_chunks_per_segment
+    for segment_index in range(num_segments):
+        num_frames = recording.get_num_frames(segment_index)
+        high = num_frames - chunk_size - margin_frames
+        random_starts = rng.integers(low=low, high=high, size=size)
+        recording_slices.extend(
+            [(segment_index, int(start_frame), int(start_frame + chunk_size)) for start_frame in random_starts]
+        )
+    return recording_slices
+
+
+# Random chunks already read inside a `random_chunks_cache()` block, shared by the estimators (noise levels,
+# whitening, normalization, ...) that sample the same recording object with the same parameters.
+# None when no block is active.
+_random_chunks_cache = None
+_random_chunks_cache_max_bytes = 0
+
+
+@contextmanager
+def random_chunks_cache(max_bytes=500 * 1024**2):
+    """
+    Context manager that shares the random chunks read by `get_random_data_chunks()` inside the block.
+
+    Inside the block, the raw chunks read on a recording object with a given `seed` are kept in memory and
+    reused by the next calls on the same recording object with the same chunk parameters. So the estimators
+    built on the same recording (noise levels, whitening, normalization, ...) read (and compute through the
+    preprocessing chain) one set of random chunks. The chunks are released at the end of the block.
+
+    The cache is keyed on the recording object: the recording must not be modified inside the block.
+
+    No function opens a block by itself, the sharing only happens where the caller opens one, for instance:
+
+        with random_chunks_cache():
+            noise_levels = get_noise_levels(recording, return_scaled=False)
+            recording_z = zscore(recording)
+            recording_w = whiten(recording)
+
+    Preprocessors chained one after the other (e.g. `whiten(zscore(recording))`) sample different recording
+    objects and so do not share their chunks.
+
+    Parameters
+    ----------
+    max_bytes : int, default: 500 * 1024**2
+        The maximum size of the cached chunks, the chunks of the oldest recordings are dropped first.
+        The chunks of a recording are not cached when they are bigger than this.
+    """
+    global _random_chunks_cache, _random_chunks_cache_max_bytes
+    if _random_chunks_cache is not None:
+        # nested block: the outer block owns the cache
+        yield
+        return
+    _random_chunks_cache = weakref.WeakKeyDictionary()
+    _random_chunks_cache_max_bytes = max_bytes
+    try:
+        yield
+    finally:
+        _random_chunks_cache = None
+
+
 def get_random_data_chunks(
     recording,
     return_scaled=False,
@@ -520,12 +637,16 @@ def get_random_data_chunks(
     concatenated=True,
     seed=0,
     margin_frames=0,
+    **job_kwargs,
 ):
     """
     Extract random chunks across segments
 
     This is used for instance in get_noise_levels() to estimate noise on traces.
 
+    Inside a `random_chunks_cache()` block, the chunks read with a `seed` are reused by the next calls on the
+    same recording object with the same chunk parameters.
+
     Parameters
     ----------
     recording : BaseRecording
@@ -542,52 +663,135 @@ def get_random_data_chunks(
         Random seed
     margin_frames : int, default: 0
         Margin in number of frames to avoid edge effects
+    **job_kwargs : keyword arguments for parallel processing:
+        If given, the chunks are read in parallel with a `ChunkRecordingExecutor` (only "n_jobs", "mp_context",
+        "max_threads_per_process" and "progress_bar" are used), otherwise they are read sequentially.
 
     Returns
     -------
     chunk_list : np.array
         Array of concatenate chunks per segment
     """
-    # TODO: if segment have differents length make another sampling that dependant on the length of the segment
-    # Should be done by changing kwargs with total_num_chunks=XXX and total_duration=YYYY
-    # And randomize the number of chunk per segment weighted by segment duration
+    recording_slices = get_random_recording_slices(
+        recording,
+        num_chunks_per_segment=num_chunks_per_segment,
+        chunk_size=chunk_size,
+        seed=seed,
+        margin_frames=margin_frames,
+    )
 
-    # check chunk size
-    num_segments = recording.get_num_segments()
-    for segment_index in range(num_segments):
-        chunk_size_limit = recording.get_num_frames(segment_index) - 2 * margin_frames
-        if chunk_size > chunk_size_limit:
-            chunk_size = chunk_size_limit - 1
-            warnings.warn(
-                f"chunk_size is greater than the number "
-                f"of samples for segment index {segment_index}. "
-                f"Using {chunk_size}."
-            )
+    cache_key = (num_chunks_per_segment, chunk_size, seed, margin_frames)
+    use_cache = seed is not None and _random_chunks_cache is not None
+    scale_from_raw = return_scaled and (recording.has_scaleable_traces() or recording.get_dtype().kind == "f")
+
+    raw_chunks = None
+    if use_cache and (not return_scaled or scale_from_raw):
+        cached_key, raw_chunks = _random_chunks_cache.get(recording, (None, None))
+        if cached_key != cache_key:
+            raw_chunks = _read_random_data_chunks(recording, recording_slices, False, job_kwargs)
+            _add_to_random_chunks_cache(recording, cache_key, raw_chunks)
+
+    if raw_chunks is None:
+        chunk_list = _read_random_data_chunks(recording, recording_slices, return_scaled, job_kwargs)
+    elif return_scaled and recording.has_scaleable_traces():
+        # same scaling as BaseRecording.get_traces()
+        gains = recording.get_property("gain_to_uV").astype("float32", copy=False)
+        offsets = recording.get_property("offset_to_uV").astype("float32", copy=False)
+        chunk_list = [chunk.astype("float32", copy=False) * gains + offsets for chunk in raw_chunks]
+    elif concatenated:
+        chunk_list = raw_chunks
+    else:
+        # the cached chunks are read-only and shared
+        chunk_list = [chunk.copy() for chunk in raw_chunks]
 
-    rng = np.random.default_rng(seed)
-    chunk_list = []
-    low = margin_frames
-    size = num_chunks_per_segment
-    for segment_index in range(num_segments):
-        num_frames = recording.get_num_frames(segment_index)
-        high = num_frames - chunk_size - margin_frames
-        random_starts = rng.integers(low=low, high=high, size=size)
-        segment_trace_chunk = [
+    if concatenated:
+        return np.concatenate(chunk_list, axis=0)
+    else:
+        return chunk_list
+
+
+def split_random_chunk_kwargs(mixed_kwargs):
+    """
+    Split the kwargs of `get_random_data_chunks()` into the chunk parameters and the job kwargs.
+
+    The chunk parameters define the sampled data and are kept in the provenance of an estimator, whereas
+    the job kwargs only read the chunks in parallel and must not be kept.
+    "chunk_size" is a chunk parameter here.
+    """
+    random_chunk_kwargs, job_kwargs = split_job_kwargs(mixed_kwargs)
+    if "chunk_size" in job_kwargs:
+        random_chunk_kwargs["chunk_size"] = job_kwargs.pop("chunk_size")
+    return random_chunk_kwargs, job_kwargs
+
+
+def _add_to_random_chunks_cache(recording, cache_key, chunks):
+    nbytes = sum(chunk.nbytes for chunk in chunks)
+    if nbytes > _random_chunks_cache_max_bytes:
+        return
+    # only the last sampled set of each recording is kept, the oldest recordings are removed first
+    _random_chunks_cache.pop(recording, None)
+    cached_nbytes = sum(chunk.nbytes for entry in _random_chunks_cache.values() for chunk in entry[1])
+    while len(_random_chunks_cache) > 0 and cached_nbytes + nbytes > _random_chunks_cache_max_bytes:
+        oldest = next(iter(_random_chunks_cache.keys()))
+        cached_nbytes -= sum(chunk.nbytes for chunk in _random_chunks_cache.pop(oldest)[1])
+    for chunk in chunks:
+        chunk.flags.writeable = False
+    _random_chunks_cache[recording] = (cache_key, chunks)
+
+
+def _read_random_data_chunks(recording, recording_slices, return_scaled, job_kwargs):
+    if len(job_kwargs) == 0:
+        chunk_list = [
             recording.get_traces(
                 start_frame=start_frame,
-                end_frame=(start_frame + chunk_size),
+                end_frame=end_frame,
                 segment_index=segment_index,
                 return_scaled=return_scaled,
             )
-            for start_frame in random_starts
+            for segment_index, start_frame, end_frame in recording_slices
         ]
+    else:
+        job_kwargs = fix_job_kwargs(job_kwargs)
+        # the chunks are given by the random slices, the chunking keys are not used
+        executor_keys = ("n_jobs", "mp_context", "max_threads_per_process", "progress_bar")
+        executor_kwargs = {k: job_kwargs[k] for k in executor_keys if k in job_kwargs}
+        if job_kwargs["n_jobs"] > 1:
+            init_args = (recording.to_dict(), return_scaled)
+        else:
+            init_args = (recording, return_scaled)
+        executor = ChunkRecordingExecutor(
+            recording,
+            _get_random_data_chunk,
+            _init_random_data_chunk_worker,
+            init_args,
+            handle_returns=True,
+            job_name="get_random_data_chunks",
+            chunk_size=recording_slices[0][2] - recording_slices[0][1],
+            **executor_kwargs,
+        )
+        chunk_list = executor.run(recording_slices=recording_slices)
+    return chunk_list
 
-        chunk_list.extend(segment_trace_chunk)
 
-    if concatenated:
-        return np.concatenate(chunk_list, axis=0)
+def _init_random_data_chunk_worker(recording, return_scaled):
+    worker_ctx = {}
+    if isinstance(recording, dict):
+        from spikeinterface.core import load_extractor
+
+        worker_ctx["recording"] = load_extractor(recording)
     else:
-        return chunk_list
+        worker_ctx["recording"] = recording
+    worker_ctx["return_scaled"] = return_scaled
+    return worker_ctx
+
+
+def _get_random_data_chunk(segment_index, start_frame, end_frame, worker_ctx):
+    return worker_ctx["recording"].get_traces(
+        start_frame=start_frame,
+        end_frame=end_frame,
+        segment_index=segment_index,
+        return_scaled=worker_ctx["return_scaled"],
+    )
 
 
 def get_channel_distances(recording):
@@ -663,7 +867,7 @@ def get_noise_levels(
     force_recompute : bool
         If True, noise levels are recomputed even if they are already stored in the recording extractor
     random_chunk_kwargs : dict
-        Kwargs for get_random_data_chunks
+        Kwargs for get_random_data_chunks (job kwargs can be given to read the chunks in parallel)
 
     Returns
     -------
@@ -3,7 +3,7 @@ from __future__ import annotations
 import numpy as np
 from spikeinterface.core import NumpySorting
 
-from .basesorting import BaseSorting
+from .basesorting import BaseSorting, minimum_spike_dtype
 from .numpyextractors import NumpySorting
 
 
@@ -11,7 +11,8 @@ def spike_vector_to_spike_trains(spike_vector: list[np.array], unit_ids: np.arra
     """
     Computes all spike trains for all units/segments from a spike vector list.
 
-    Internally calls numba if numba is installed.
+    Spike trains are built in one pass per segment with `spike_vector_to_unit_spike_index()`
+    and are views on a unit-sorted copy of the sample indices of the segment.
 
     Parameters
     ----------
@@ -27,6 +28,40 @@ def spike_vector_to_spike_trains(spike_vector: list[np.array], unit_ids: np.arra
         (as a dict: unit_id --> spike_train).
     """
 
+    num_units = len(unit_ids)
+    spike_trains = {}
+    for segment_index, spikes in enumerate(spike_vector):
+        sample_indices, offsets = spike_vector_to_unit_spike_index(spikes, num_units)
+        spike_trains[segment_index] = {
+            unit_id: sample_indices[offsets[unit_index] : offsets[unit_index + 1]]
+            for unit_index, unit_id in enumerate(unit_ids)
+        }
+
+    return spike_trains
+
+
+def spike_vector_to_unit_spike_index(spikes: np.array, num_units: int):
+    """
+    Computes a per-unit index (CSR-like) of the spike vector of one segment.
+
+    The sample indices are reordered by unit (stable sort, so each unit stays sorted in time)
+    and `offsets` gives the boundaries of each unit: the spike train of unit index `u` is the slice
+    `sample_indices[offsets[u] : offsets[u + 1]]`.
+
+    Parameters
+    ----------
+    spikes: np.ndarray
+        Spike vector of one segment, obtained with sorting.to_spike_vector(concatenated=False)
+    num_units: int
+        Number of units
+
+    Returns
+    -------
+    sample_indices: np.ndarray
+        The sample indices sorted by unit_index and then by sample_index.
+    offsets: np.ndarray
+        The offsets of each unit in sample_indices, of size num_units + 1.
+    """
     try:
         import numba
 
@@ -35,20 +70,23 @@ def spike_vector_to_spike_trains(spike_vector: list[np.array], unit_ids: np.arra
         HAVE_NUMBA = False
 
     if HAVE_NUMBA:
-        # the trick here is to have a function getter
-        vector_to_list_of_spiketrain = get_numba_vector_to_list_of_spiketrain()
-    else:
-        vector_to_list_of_spiketrain = vector_to_list_of_spiketrain_numpy
+        # counting sort in linear time
+        vector_to_unit_spike_index = get_numba_vector_to_unit_spike_index()
+        sample_indices = np.asarray(spikes["sample_index"]).astype(np.int64, copy=False)
+        unit_indices = np.asarray(spikes["unit_index"]).astype(np.int64, copy=False)
+        return vector_to_unit_spike_index(sample_indices, unit_indices, num_units)
 
-    num_units = unit_ids.size
-    spike_trains = {}
-    for segment_index, spikes in enumerate(spike_vector):
-        sample_indices = np.array(spikes["sample_index"]).astype(np.int64, copy=False)
-        unit_indices = np.array(spikes["unit_index"]).astype(np.int64, copy=False)
-        list_of_spiketrains = vector_to_list_of_spiketrain(sample_indices, unit_indices, num_units)
-        spike_trains[segment_index] = dict(zip(unit_ids, list_of_spiketrains))
+    unit_indices = np.asarray(spikes["unit_index"])
+    if num_units <= np.iinfo("uint16").max:
+        # numpy uses a radix sort (linear time) for stable sort of 16 bits integers
+        unit_indices = unit_indices.astype("uint16")
+    order = np.argsort(unit_indices, kind="stable")
+    sample_indices = np.asarray(spikes["sample_index"])[order].astype("int64", copy=False)
 
-    return spike_trains
+    offsets = np.zeros(num_units + 1, dtype="int64")
+    np.cumsum(np.bincount(unit_indices, minlength=num_units), out=offsets[1:])
+
+    return sample_indices, offsets
 
 
 def spike_vector_to_indices(spike_vector: list[np.array], unit_ids: np.array, absolute_index: bool = False):
@@ -106,6 +144,59 @@ def spike_vector_to_indices(spike_vector: list[np.array], unit_ids: np.array, ab
     return spike_indices
 
 
+def spike_vector_from_unit_labels(sample_indices, unit_labels, unit_ids=None, segment_index=0) -> np.ndarray:
+    """
+    Build the spike vector of one segment directly from flat arrays of spike samples and unit labels.
+
+    Most file formats (phy/kilosort, mda, npz, alf, ...) store spikes this way, so sorting extractors
+    can use this in `_custom_cache_spike_vector()` instead of the generic `to_spike_vector()`
+    which concatenates `get_unit_spike_train()` unit by unit.
+
+    Spikes are ordered by sample_index and then by unit_index. Spikes with a label not in unit_ids
+    are discarded.
+
+    Parameters
+    ----------
+    sample_indices : np.array
+        The sample index of every spike.
+    unit_labels : np.array
+        The unit id of every spike.
+    unit_ids : np.array | None, default: None
+        The unit ids of the sorting. If None, unit_labels are already unit indices.
+    segment_index : int, default: 0
+        The segment index written in the spike vector.
+
+    Returns
+    -------
+    spikes : np.array
+        Spike vector with dtype minimum_spike_dtype.
+    """
+    sample_indices = np.asarray(sample_indices).astype("int64", copy=False)
+    unit_labels = np.asarray(unit_labels)
+
+    if unit_ids is None:
+        unit_indices = unit_labels.astype("int64", copy=False)
+    else:
+        unit_ids = np.asarray(unit_ids)
+        if unit_ids.size == 0:
+            return np.zeros(0, dtype=minimum_spike_dtype)
+        # map labels to indices with one sort instead of one mask per unit
+        sorter = np.argsort(unit_ids, kind="stable")
+        pos = np.searchsorted(unit_ids, unit_labels, sorter=sorter)
+        unit_indices = sorter[np.clip(pos, 0, unit_ids.size - 1)]
+        keep = unit_ids[unit_indices] == unit_labels
+        if not np.all(keep):
+            sample_indices = sample_indices[keep]
+            unit_indices = unit_indices[keep]
+
+    order = np.lexsort((unit_indices, sample_indices))
+    spikes = np.zeros(sample_indices.size, dtype=minimum_spike_dtype)
+    spikes["sample_index"] = sample_indices[order]
+    spikes["unit_index"] = unit_indices[order]
+    spikes["segment_index"] = segment_index
+    return spikes
+
+
 def vector_to_list_of_spiketrain_numpy(sample_indices, unit_indices, num_units):
     """
     Slower implementation of vetor_to_dict using numpy boolean mask.
@@ -152,6 +243,40 @@ def get_numba_vector_to_list_of_spiketrain():
     return vector_to_list_of_spiketrain_numba
 
 
+def get_numba_vector_to_unit_spike_index():
+    if hasattr(get_numba_vector_to_unit_spike_index, "_cached_numba_function"):
+        return get_numba_vector_to_unit_spike_index._cached_numba_function
+
+    import numba
+
+    @numba.jit(nopython=True, nogil=True, cache=False)
+    def vector_to_unit_spike_index_numba(sample_indices, unit_indices, num_units):
+        """
+        Fast implementation of spike_vector_to_unit_spike_index using a counting sort.
+        This is for one segment.
+        """
+        num_spikes = sample_indices.size
+        offsets = np.zeros(num_units + 1, dtype=np.int64)
+        for s in range(num_spikes):
+            offsets[unit_indices[s] + 1] += 1
+        for u in range(num_units):
+            offsets[u + 1] += offsets[u]
+
+        unit_sorted_sample_indices = np.empty(num_spikes, dtype=np.int64)
+        current_x = offsets[:-1].copy()
+        for s in range(num_spikes):
+            unit_index = unit_indices[s]
+            unit_sorted_sample_indices[current_x[unit_index]] = sample_indices[s]
+            current_x[unit_index] += 1
+
+        return unit_sorted_sample_indices, offsets
+
+    # Cache the compiled function
+    get_numba_vector_to_unit_spike_index._cached_numba_function = vector_to_unit_spike_index_numba
+
+    return vector_to_unit_spike_index_numba
+
+
 # TODO later : implement other method like "maximum_rate", "by_percent", ...
 def random_spikes_selection(
     sorting: BaseSorting,
@@ -157,6 +157,21 @@ def test_npy_sorting():
     assert sorting.get_num_segments() == 2
     assert set(sorting.get_unit_ids()) == set(["0", "1"])
     check_sorted_arrays_equal(sorting.get_unit_spike_train(segment_index=0, unit_id="1"), [2, 5])
+    check_sorted_arrays_equal(sorting.get_unit_spike_train(segment_index=0, unit_id="0", start_frame=1), [1, 9])
+
+    # per-unit index of the spike vector
+    sample_indices, offsets = sorting.get_unit_spike_index(segment_index=1)
+    assert np.array_equal(sample_indices, [0, 1])
+    assert np.array_equal(offsets, [0, 2, 2])
+    # the index is cached and shared by the spike trains, so it is read-only
+    assert not sample_indices.flags.writeable and not offsets.flags.writeable
+    # the spike trains returned by the public getter can still be modified without changing the index
+    sorting.precompute_spike_trains(from_spike_vector=True)
+    spike_train = sorting.get_unit_spike_train(segment_index=1, unit_id="0")
+    assert spike_train.flags.writeable
+    spike_train += 1
+    assert np.array_equal(sorting.get_unit_spike_train(segment_index=1, unit_id="0"), [0, 1])
+    assert np.array_equal(sample_indices, [0, 1])
 
     # Check registering a recording
     seg_nframes = [10, 5]
@@ -3,6 +3,7 @@ import numpy as np
 from pathlib import Path
 
 from spikeinterface.core import BinaryRecordingExtractor
+from spikeinterface.core.binaryrecordingextractor import HAVE_PREAD
 from spikeinterface.core.numpyextractors import NumpyRecording
 from spikeinterface.core.core_tools import measure_memory_allocation
 from spikeinterface.core.generate import NoiseGeneratorRecording
@@ -126,5 +127,47 @@ def test_sequential_reading_of_small_traces(folder_with_binary_files):
     assert np.allclose(small_traces, expected_traces)
 
 
+@pytest.mark.parametrize("read_engine", ["mmap", "pread", "auto"])
+def test_read_engine(folder_with_binary_files, read_engine):
+    folder = folder_with_binary_files
+    file_paths = [folder / "traces_cached_seg0.raw"]
+    recording = BinaryRecordingExtractor(
+        file_paths=file_paths, sampling_frequency=30_000.0, num_channels=32, dtype="float32", read_engine=read_engine
+    )
+    reference = BinaryRecordingExtractor(
+        file_paths=file_paths, sampling_frequency=30_000.0, num_channels=32, dtype="float32", read_engine="mmap"
+    )
+
+    for start_frame, end_frame in [(0, 30_000), (10, 15), (10_000, 20_000)]:
+        for channel_ids in [None, [0, 5, 31], [7, 3]]:
+            traces = recording.get_traces(start_frame=start_frame, end_frame=end_frame, channel_ids=channel_ids)
+            expected_traces = reference.get_traces(
+                start_frame=start_frame, end_frame=end_frame, channel_ids=channel_ids
+            )
+            assert np.array_equal(traces, expected_traces)
+
+    # the reusable buffer must not be shared by the returned traces
+    traces = recording.get_traces(start_frame=0, end_frame=10_000, channel_ids=[0, 1])
+    recording.get_traces(start_frame=10_000, end_frame=20_000, channel_ids=[0, 1])
+    assert np.array_equal(traces, reference.get_traces(start_frame=0, end_frame=10_000, channel_ids=[0, 1]))
+
+
+def test_read_engine_auto(folder_with_binary_files):
+    folder = folder_with_binary_files
+    file_paths = [folder / "traces_cached_seg0.raw"]
+    recording = BinaryRecordingExtractor(
+        file_paths=file_paths, sampling_frequency=30_000.0, num_channels=32, dtype="float32", read_engine="auto"
+    )
+    segment = recording._recording_segments[0]
+    if not HAVE_PREAD:
+        assert not segment._use_pread(0, 30_000, [0, 5])
+        return
+    # 30_000 frames of 32 float32 channels are 3.84 MB
+    assert segment._use_pread(0, 30_000, np.array([0, 5]))
+    assert not segment._use_pread(0, 1_000, np.array([0, 5]))
+    assert not segment._use_pread(0, 30_000, None)
+    assert not segment._use_pread(0, 30_000, slice(0, 5))
+
+
 if __name__ == "__main__":
     test_BinaryRecordingExtractor()
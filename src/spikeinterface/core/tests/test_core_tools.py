@@ -12,6 +12,8 @@ from spikeinterface.core.core_tools import (
     normal_pdf,
     convert_string_to_bytes,
     add_suffix,
+    dumps_to_shared_memory,
+    loads_from_shared_memory,
 )
 
 
@@ -191,5 +193,27 @@ def test_normal_pdf() -> None:
     assert math.isclose(normal_pdf(-0.9355, mu=mu, sigma=sigma), 0.03006929091)
 
 
+def test_dumps_loads_shared_memory():
+    obj = dict(
+        templates=np.random.randn(10, 50, 4).astype("float32"),
+        overlaps=[np.arange(12).reshape(3, 4), np.ones(5, dtype="int16")],
+        name="test",
+    )
+    descriptor, shm = dumps_to_shared_memory(obj)
+    try:
+        loaded, shm_loaded = loads_from_shared_memory(descriptor)
+        np.testing.assert_array_equal(loaded["templates"], obj["templates"])
+        np.testing.assert_array_equal(loaded["overlaps"][0], obj["overlaps"][0])
+        np.testing.assert_array_equal(loaded["overlaps"][1], obj["overlaps"][1])
+        assert loaded["name"] == "test"
+        # arrays are read-only views on the shared buffer
+        assert not loaded["templates"].flags.writeable
+        del loaded
+        shm_loaded.close()
+    finally:
+        shm.close()
+        shm.unlink()
+
+
 if __name__ == "__main__":
     test_path_utils_functions()
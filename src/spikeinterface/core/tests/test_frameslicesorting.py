@@ -3,7 +3,7 @@ import warnings
 import numpy as np
 from numpy.testing import assert_raises
 
-from spikeinterface.core import NumpyRecording, NumpySorting
+from spikeinterface.core import NumpyRecording, NumpySorting, generate_sorting
 
 
 def test_FrameSliceSorting():
@@ -91,5 +91,16 @@ def test_FrameSliceSorting():
     assert_raises(Exception, sorting_exceeding.frame_slice, None, None)
 
 
+def test_frame_slice_spike_vector():
+    sorting = generate_sorting(durations=[20.0], seed=0)
+    sorting.to_spike_vector()
+    # float frames are accepted too
+    for start_frame, end_frame in [(10_000, 400_000), (10_000 / 3, 400_000 / 3)]:
+        sliced = sorting.frame_slice(start_frame=start_frame, end_frame=end_frame)
+        spike_vector = sliced.to_spike_vector()
+        spike_vector_from_trains = sliced.to_spike_vector(use_cache=False)
+        np.testing.assert_array_equal(spike_vector, spike_vector_from_trains)
+
+
 if __name__ == "__main__":
     test_FrameSliceSorting()
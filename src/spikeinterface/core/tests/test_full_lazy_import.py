@@ -0,0 +1,80 @@
+import json
+import subprocess
+import sys
+import types
+
+# cold import of `spikeinterface.full` must stay under this budget (in seconds, best of several runs)
+# the budget is generous (the cold import takes a fraction of it) so that it only catches a lost laziness
+COLD_IMPORT_BUDGET = 5.0
+
+# these modules must not be imported by `import spikeinterface.full`
+LAZY_MODULES = ["spikeinterface.extractors", "spikeinterface.sorters", "spikeinterface.widgets", "numba"]
+
+
+def _run_python(code):
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def test_full_is_lazy():
+    code = (
+        "import sys, json\n"
+        "import spikeinterface.full as si\n"
+        "before = [m for m in sys.modules]\n"
+        "si.read_spikeglx\n"
+        "after = [m for m in sys.modules]\n"
+        "print(json.dumps([before, after]))\n"
+    )
+    before, after = _run_python(code)
+    for module_name in LAZY_MODULES:
+        assert module_name not in before, f"{module_name} is imported by 'import spikeinterface.full'"
+    assert "spikeinterface.extractors" in after
+    for module_name in ["spikeinterface.sorters", "spikeinterface.postprocessing", "spikeinterface.widgets"]:
+        assert module_name not in after, f"{module_name} is imported by 'si.read_spikeglx'"
+
+
+def test_full_introspection_is_lazy():
+    code = (
+        "import sys, json\n"
+        "import spikeinterface.full as si\n"
+        "probes = [hasattr(si, name) for name in ['__wrapped__', '__test__', '_ipython_canary_method_should_not_exist_']]\n"
+        "print(json.dumps([probes, [m for m in sys.modules]]))\n"
+    )
+    probes, modules = _run_python(code)
+    assert not any(probes)
+    for module_name in LAZY_MODULES:
+        assert module_name not in modules, f"{module_name} is imported by an introspection probe"
+
+
+def test_full_lazy_index():
+    import spikeinterface.full as si
+
+    lazy_index = si._get_lazy_index()
+    public = si._import_all()
+    for name, value in public.items():
+        if isinstance(value, types.ModuleType) or name not in lazy_index:
+            continue
+        module = sys.modules[f"spikeinterface.{lazy_index[name]}"]
+        assert getattr(module, name) is value, f"{name} resolves to a different object in lazy mode"
+
+    # attribute access
+    assert si.plot_traces is public["plot_traces"]
+
+
+def test_cold_import_time():
+    code = (
+        "import time, json\n"
+        "t0 = time.perf_counter()\n"
+        "import spikeinterface.full\n"
+        "print(json.dumps(time.perf_counter() - t0))\n"
+    )
+    import_time = min(_run_python(code) for _ in range(3))
+    print(f"cold import time of spikeinterface.full: {import_time:.3f}s")
+    assert import_time < COLD_IMPORT_BUDGET
+
+
+if __name__ == "__main__":
+    test_full_is_lazy()
+    test_full_introspection_is_lazy()
+    test_full_lazy_index()
+    test_cold_import_time()
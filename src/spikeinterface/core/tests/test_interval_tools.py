@@ -0,0 +1,34 @@
+import numpy as np
+
+from spikeinterface.core import IntervalSet
+
+
+def test_interval_set():
+    # overlapping, contiguous and empty intervals are merged or dropped
+    intervals = IntervalSet([10, 5, 30, 40, 45, 100], [20, 12, 40, 45, 50, 100])
+    assert len(intervals) == 2
+    np.testing.assert_array_equal(intervals.starts, [5, 30])
+    np.testing.assert_array_equal(intervals.stops, [20, 50])
+    assert intervals.num_frames == 35
+    assert intervals.find_overlapping(20, 30) == (1, 1)
+    assert intervals.find_overlapping(19, 31) == (0, 2)
+
+    # compare with a dense mask
+    rng = np.random.default_rng(seed=0)
+    starts = rng.integers(0, 10_000, size=500)
+    stops = starts + rng.integers(0, 50, size=500)
+    intervals = IntervalSet.from_periods(np.stack([starts, stops], axis=1))
+    dense = np.zeros(10_100, dtype=bool)
+    for start, stop in zip(starts, stops):
+        dense[start:stop] = True
+
+    for start_frame, end_frame in [(0, 10_100), (17, 18), (2_000, 3_333), (9_000, 10_100)]:
+        np.testing.assert_array_equal(intervals.get_mask(start_frame, end_frame), dense[start_frame:end_frame])
+
+    frames = np.sort(rng.integers(0, 10_100, size=2_000))
+    np.testing.assert_array_equal(intervals.contains(frames), dense[frames])
+    np.testing.assert_array_equal(intervals.select_sorted(frames), np.flatnonzero(dense[frames]))
+
+    empty = IntervalSet([], [])
+    assert not np.any(empty.get_mask(0, 100))
+    assert empty.select_sorted(frames).size == 0
@@ -1,5 +1,6 @@
 import pytest
 import os
+import numpy as np
 
 from spikeinterface.core import generate_recording, set_global_job_kwargs, get_global_job_kwargs
 
@@ -12,6 +13,7 @@ from spikeinterface.core.job_tools import (
     split_job_kwargs,
     divide_recording_into_chunks,
 )
+from spikeinterface.core.core_tools import dumps_to_shared_memory, loads_from_shared_memory
 
 
 def test_divide_segment_into_chunks():
@@ -87,6 +89,15 @@ def func(segment_index, start_frame, end_frame, worker_ctx):
     return os.getpid()
 
 
+def prefetch_func(segment_index, start_frame, end_frame, worker_ctx):
+    return segment_index, start_frame, end_frame
+
+
+def func_with_prefetch(segment_index, start_frame, end_frame, worker_ctx):
+    assert worker_ctx["prefetched_data"] == (segment_index, start_frame, end_frame)
+    return start_frame
+
+
 def init_func(arg1, arg2, arg3):
     worker_ctx = {}
     worker_ctx["arg1"] = arg1
@@ -172,6 +183,23 @@ def test_ChunkRecordingExecutor():
     )
     processor.run()
 
+    # chunk + read-ahead, in loop and parallel
+    for n_jobs in (1, 2):
+        processor = ChunkRecordingExecutor(
+            recording,
+            func_with_prefetch,
+            init_func,
+            init_args,
+            handle_returns=True,
+            n_jobs=n_jobs,
+            chunk_duration="200ms",
+            prefetch_func=prefetch_func,
+            prefetch_depth=2,
+        )
+        start_frames = processor.run()
+        chunks = divide_recording_into_chunks(recording, processor.chunk_size)
+        assert start_frames == [start_frame for _, start_frame, _ in chunks]
+
 
 def test_fix_job_kwargs():
     # test negative n_jobs
@@ -220,6 +248,25 @@ def test_split_job_kwargs():
     assert "other_param" not in job_kwargs and "n_jobs" in job_kwargs and "progress_bar" in job_kwargs
 
 
+def test_init_args_shared_memory():
+    recording = generate_recording(num_channels=4, durations=[1.0], seed=0)
+    init_args = (recording, {"some": "option"}, np.arange(10))
+    descriptor, shm = dumps_to_shared_memory(init_args)
+    try:
+        (recording2, options, array), shm2 = loads_from_shared_memory(descriptor)
+        assert options == {"some": "option"}
+        assert recording2.get_num_channels() == 4
+        assert (recording2.get_traces() == recording.get_traces()).all()
+        # the arrays are read-only views on the shared memory
+        assert not array.flags.writeable
+        np.testing.assert_array_equal(array, np.arange(10))
+        del recording2, array
+        shm2.close()
+    finally:
+        shm.close()
+        shm.unlink()
+
+
 if __name__ == "__main__":
     # test_divide_segment_into_chunks()
     # test_ensure_n_jobs()
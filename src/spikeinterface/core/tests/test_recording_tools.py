@@ -12,6 +12,8 @@ from spikeinterface.core.recording_tools import (
     write_binary_recording,
     write_memory_recording,
     get_random_data_chunks,
+    get_random_recording_slices,
+    random_chunks_cache,
     get_chunk_with_margin,
     get_closest_channels,
     get_channel_distances,
@@ -172,6 +174,61 @@ def test_get_random_data_chunks():
     chunks = get_random_data_chunks(rec, num_chunks_per_segment=50, chunk_size=500, seed=0)
     assert chunks.shape == (50000, 1)
 
+    # parallel reading gives the same chunks in the same order
+    chunks_parallel = get_random_data_chunks(
+        rec, num_chunks_per_segment=50, chunk_size=500, seed=0, n_jobs=2, progress_bar=False
+    )
+    np.testing.assert_array_equal(chunks, chunks_parallel)
+
+
+def test_get_random_data_chunks_cache():
+    rec = generate_recording(num_channels=4, sampling_frequency=1000.0, durations=[10.0])
+    rec.set_channel_gains(2.0)
+    rec.set_channel_offsets(1.0)
+    random_chunk_kwargs = dict(num_chunks_per_segment=5, chunk_size=500, seed=0)
+    recording_slices = get_random_recording_slices(rec, **random_chunk_kwargs)
+
+    num_reads = 0
+    segment = rec._recording_segments[0]
+    original_get_traces = segment.get_traces
+
+    def counting_get_traces(*args, **kwargs):
+        nonlocal num_reads
+        num_reads += 1
+        return original_get_traces(*args, **kwargs)
+
+    segment.get_traces = counting_get_traces
+
+    # the cache is off by default
+    get_random_data_chunks(rec, **random_chunk_kwargs)
+    get_random_data_chunks(rec, **random_chunk_kwargs)
+    assert num_reads == 10
+
+    with random_chunks_cache():
+        chunks = get_random_data_chunks(rec, **random_chunk_kwargs)
+        # the second call is served by the cache, modifying the returned array does not modify the cache
+        chunks[:] = 0
+        chunks_cached = get_random_data_chunks(rec, **random_chunk_kwargs)
+        assert num_reads == 15
+        segment.get_traces = original_get_traces
+        chunks_read = np.concatenate(
+            [rec.get_traces(start_frame=s, end_frame=e, segment_index=i) for i, s, e in recording_slices]
+        )
+        np.testing.assert_array_equal(chunks_cached, chunks_read)
+
+        # scaled chunks are computed from the cached raw chunks
+        scaled_cached = get_random_data_chunks(rec, return_scaled=True, **random_chunk_kwargs)
+        scaled_read = np.concatenate(
+            [
+                rec.get_traces(start_frame=s, end_frame=e, segment_index=i, return_scaled=True)
+                for i, s, e in recording_slices
+            ]
+        )
+        np.testing.assert_array_equal(scaled_cached, scaled_read)
+
+        chunk_list = get_random_data_chunks(rec, concatenated=False, **random_chunk_kwargs)
+        assert all(chunk.flags.writeable for chunk in chunk_list)
+
 
 def test_get_closest_channels():
     rec = generate_recording(num_channels=32, sampling_frequency=1000.0, durations=[0.1])
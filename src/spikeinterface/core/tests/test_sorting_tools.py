@@ -9,6 +9,8 @@ from spikeinterface.core.sorting_tools import (
     spike_vector_to_spike_trains,
     random_spikes_selection,
     spike_vector_to_indices,
+    spike_vector_to_unit_spike_index,
+    spike_vector_from_unit_labels,
     apply_merges_to_sorting,
     _get_ids_after_merging,
     generate_unit_ids_for_merge_group,
@@ -43,6 +45,33 @@ def test_spike_vector_to_indices():
         )
 
 
+def test_spike_vector_to_unit_spike_index():
+    sorting = NumpySorting.from_unit_dict({1: np.array([0, 51, 108]), 5: np.array([23, 87]), 7: np.array([])}, 30_000)
+    spike_vector = sorting.to_spike_vector(concatenated=False)
+    sample_indices, offsets = spike_vector_to_unit_spike_index(spike_vector[0], sorting.get_num_units())
+
+    assert np.array_equal(offsets, [0, 3, 5, 5])
+    for unit_index, unit_id in enumerate(sorting.unit_ids):
+        assert np.array_equal(
+            sample_indices[offsets[unit_index] : offsets[unit_index + 1]],
+            sorting.get_unit_spike_train(unit_id=unit_id, segment_index=0),
+        )
+
+
+def test_spike_vector_from_unit_labels():
+    sorting = NumpySorting.from_unit_dict({"a": np.array([0, 51, 108]), "b": np.array([23, 51, 87])}, 30_000)
+    sample_indices = np.array([108, 23, 51, 51, 0, 87, 12])
+    unit_labels = np.array(["a", "b", "b", "a", "a", "b", "c"])
+    spikes = spike_vector_from_unit_labels(sample_indices, unit_labels, sorting.unit_ids)
+    # unknown label "c" is discarded
+    assert np.array_equal(spikes, sorting.to_spike_vector())
+
+    unit_indices = sorting.ids_to_indices(unit_labels[:-1])
+    spikes = spike_vector_from_unit_labels(sample_indices[:-1], unit_indices, segment_index=1)
+    assert np.array_equal(spikes["sample_index"], sorting.to_spike_vector()["sample_index"])
+    assert np.all(spikes["segment_index"] == 1)
+
+
 def test_random_spikes_selection():
     recording, sorting = generate_ground_truth_recording(
         durations=[20.0, 10.0],
@@ -160,6 +189,7 @@ def test_generate_unit_ids_for_merge_group():
 
 
 if __name__ == "__main__":
+    # test_spike_vector_from_unit_labels()
     # test_spike_vector_to_spike_trains()
     # test_spike_vector_to_indices()
     # test_random_spikes_selection()
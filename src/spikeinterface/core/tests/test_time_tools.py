@@ -0,0 +1,71 @@
+import pytest
+import numpy as np
+
+from spikeinterface.core import PiecewiseLinearTimes, generate_recording, load_extractor, read_zarr
+
+
+def _make_time_vector(num_samples=300_000, sampling_frequency=30000.0):
+    sample_inds = np.arange(num_samples)
+    # clock drift and two gaps
+    time_vector = 12.0 + sample_inds / (sampling_frequency * (1 + 3e-5)) + 1e-15 * sample_inds.astype("float64") ** 2
+    time_vector[100_000:] += 2.5
+    time_vector[200_000:] += 0.01
+    return time_vector
+
+
+def test_piecewise_linear_times():
+    time_vector = _make_time_vector()
+    times = PiecewiseLinearTimes.from_time_vector(time_vector, tolerance=1e-7)
+
+    assert len(times) == time_vector.size
+    assert times.num_pieces < 100
+    assert np.max(np.abs(times.get_times() - time_vector)) <= 1e-7
+    assert np.max(np.abs(np.asarray(times) - time_vector)) <= 1e-7
+    np.testing.assert_array_equal(times.get_times(1000, 1010), times.get_times()[1000:1010])
+    np.testing.assert_array_equal(times[[5, -1]], times.get_times()[[5, -1]])
+    with pytest.raises(IndexError):
+        times[time_vector.size]
+
+    # time_to_sample_index behaves like a searchsorted on the dense times
+    dense = times.get_times()
+    rng = np.random.default_rng(seed=0)
+    queries = np.concatenate(
+        [rng.uniform(dense[0] - 1, dense[-1] + 1, size=10_000), dense[rng.integers(0, dense.size, size=10_000)]]
+    )
+    np.testing.assert_array_equal(
+        times.time_to_sample_index(queries), np.searchsorted(dense, queries, side="right") - 1
+    )
+
+    # slice stays compact
+    sliced = times.slice(99_000, 250_000)
+    assert isinstance(sliced, PiecewiseLinearTimes)
+    np.testing.assert_allclose(sliced.get_times(), dense[99_000:250_000], rtol=0, atol=1e-12)
+
+    times2 = PiecewiseLinearTimes.from_dict(times.to_dict())
+    np.testing.assert_array_equal(times2.get_times(), dense)
+
+
+def test_recording_with_piecewise_times(tmp_path):
+    time_vector = _make_time_vector()
+    times = PiecewiseLinearTimes.from_time_vector(time_vector, tolerance=1e-7)
+    dense = times.get_times()
+
+    recording = generate_recording(num_channels=2, durations=[time_vector.size / 30000.0], seed=0)
+    recording.set_times(times, with_warning=False)
+    assert recording.has_time_vector()
+    np.testing.assert_array_equal(recording.get_times(start_frame=10, end_frame=20), dense[10:20])
+    assert recording.time_to_sample_index(dense[150_000]) == 150_000
+    assert recording.sample_index_to_time(150_000) == dense[150_000]
+
+    sliced = recording.frame_slice(50_000, 150_000)
+    np.testing.assert_allclose(sliced.get_times(), dense[50_000:150_000], rtol=0, atol=1e-12)
+
+    for format in ("binary", "zarr"):
+        saved = recording.save(format=format, folder=tmp_path / f"rec_{format}")
+        for rec in (saved, load_extractor(saved.to_dict())):
+            assert isinstance(rec._recording_segments[0].time_vector, PiecewiseLinearTimes)
+            np.testing.assert_array_equal(rec.get_times(), dense)
+
+
+if __name__ == "__main__":
+    test_piecewise_linear_times()
@@ -0,0 +1,69 @@
+import pytest
+import numpy as np
+
+from spikeinterface.core import (
+    NumpyRecording,
+    ZarrRecordingExtractor,
+    generate_recording,
+    get_ephys_zarr_filters,
+)
+from spikeinterface.core.zarrcodecs import TemporalDelta, ChannelDelta, LSBScale, benchmark_zarr_compression
+
+
+@pytest.mark.parametrize("dtype", ["int16", "uint16", "int32"])
+def test_ephys_filters_lossless(dtype):
+    info = np.iinfo(dtype)
+    rng = np.random.default_rng(0)
+    traces = rng.integers(info.min, info.max, size=(1000, 6), dtype=dtype, endpoint=True)
+    # extreme values make the residuals wrap around
+    traces[::7] = info.min
+    traces[::11] = info.max
+
+    for codec in (
+        TemporalDelta(dtype, 6, order=1),
+        TemporalDelta(dtype, 6, order=2),
+        ChannelDelta(dtype, 6),
+        LSBScale(dtype),
+    ):
+        encoded = codec.encode(traces)
+        assert encoded.dtype == np.dtype(dtype)
+        decoded = codec.decode(encoded.tobytes()).reshape(traces.shape)
+        np.testing.assert_array_equal(decoded, traces)
+
+    lsb = LSBScale(dtype)
+    encoded = lsb.encode((traces // 8) * 8)
+    assert encoded[0] == 8
+
+
+def test_save_zarr_with_ephys_filters(tmp_path):
+    recording = generate_recording(num_channels=8, durations=[2.0], seed=0)
+    traces = (np.round(recording.get_traces() * 20).astype("int16")) * 4
+    recording = NumpyRecording([traces], recording.sampling_frequency)
+
+    filters = get_ephys_zarr_filters("int16", num_channels=4, temporal_order=2, channel_delta=True, lsb_scale=True)
+    recording.save(
+        format="zarr",
+        folder=tmp_path / "rec_filters.zarr",
+        filters_by_dataset={"traces": filters},
+        channel_chunk_size=4,
+        chunk_duration="0.7s",
+    )
+    recording_zarr = ZarrRecordingExtractor(tmp_path / "rec_filters.zarr")
+    assert recording_zarr._root["traces_seg0"].filters == filters
+    np.testing.assert_array_equal(recording_zarr.get_traces(), traces)
+
+
+def test_benchmark_zarr_compression():
+    recording = generate_recording(num_channels=4, durations=[1.0], seed=0)
+    traces = np.round(recording.get_traces() * 20).astype("int16")
+    recording = NumpyRecording([traces], recording.sampling_frequency)
+    results = benchmark_zarr_compression(recording, chunk_duration=0.5, num_repeats=1)
+    assert "default" in results.index
+    assert "delta1_per_channel" in results.index
+    assert np.all(results["compression_ratio"] > 0)
+    assert np.all(results["decode_MBps"] > 0)
+
+
+if __name__ == "__main__":
+    test_ephys_filters_lossless("int16")
+    test_benchmark_zarr_compression()
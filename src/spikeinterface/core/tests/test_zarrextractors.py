@@ -1,6 +1,8 @@
+import gc
 import pytest
 from pathlib import Path
 
+import numpy as np
 import zarr
 
 from spikeinterface.core import (
@@ -11,6 +13,7 @@ from spikeinterface.core import (
     load_extractor,
 )
 from spikeinterface.core.zarrextractors import add_sorting_to_zarr_group, get_default_zarr_compressor
+from spikeinterface.core.job_tools import ensure_chunk_size
 
 
 def test_zarr_compression_options(tmp_path):
@@ -75,7 +78,44 @@ def test_ZarrSortingExtractor(tmp_path):
     sorting = load_extractor(sorting.to_dict())
 
 
+def test_zarr_chunked_reads(tmp_path):
+    recording = generate_recording(num_channels=20, durations=[2.0], seed=0)
+    folder = tmp_path / "rec_chunked.zarr"
+    ZarrRecordingExtractor.write_recording(recording, folder, chunk_size=7000, channel_chunk_size=6)
+    rec_zarr = ZarrRecordingExtractor(folder, cache_memory="1M")
+    assert rec_zarr.get_storage_chunk_size() == 7000
+    # the storage chunk size is not propagated to a frame slice
+    assert rec_zarr.frame_slice(100, 50000).get_storage_chunk_size() is None
+
+    traces_zarr = rec_zarr._root["traces_seg0"][:]
+    rec_segment = rec_zarr._recording_segments[0]
+    for start_frame, end_frame in [(0, 60000), (6990, 7010), (100, 101), (13999, 42001), (500, 500)]:
+        for channel_indices in [None, slice(2, 15), np.array([19, 0, 7, 7, 3]), [5], np.arange(20) % 3 == 0]:
+            traces = rec_segment.get_traces(start_frame, end_frame, channel_indices)
+            expected = traces_zarr[start_frame:end_frame]
+            if channel_indices is not None:
+                expected = expected[:, channel_indices]
+            np.testing.assert_array_equal(traces, expected)
+    assert rec_segment._cache.nbytes <= 1_000_000
+    # the decompression threads are reused
+    thread_pool = rec_segment._thread_pool
+    assert thread_pool is not None
+    rec_segment._cache = type(rec_segment._cache)(0)
+    rec_segment.get_traces(0, 30000, None)
+    assert rec_segment._thread_pool is thread_pool
+
+    # executor chunks are aligned on the storage chunks, except when chunk_size is given explicitly
+    assert ensure_chunk_size(rec_zarr, chunk_duration="1s") == 28000
+    assert ensure_chunk_size(rec_zarr, chunk_size=10000) == 10000
+
+    # the decompression threads are stopped with the segment
+    del rec_zarr, rec_segment
+    gc.collect()
+    assert thread_pool._shutdown
+
+
 if __name__ == "__main__":
     tmp_path = Path("tmp")
     test_zarr_compression_options(tmp_path)
     test_ZarrSortingExtractor(tmp_path)
+    test_zarr_chunked_reads(tmp_path)
@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import numpy as np
+
+
+class PiecewiseLinearTimes:
+    """
+    Compact representation of the timestamps of a segment as a piecewise linear function of the sample index.
+
+    The sample `i` of the piece `k` (`sample_starts[k] <= i < sample_starts[k + 1]`) is at time
+    `t_starts[k] + (i - sample_starts[k]) / sampling_frequencies[k]`.
+    A new piece starts at each gap (jump of the time) and each time the clock drift makes the effective
+    sampling frequency change.
+
+    The object behaves like a read-only 1d float64 array (`len()`, `shape`, indexing, `np.asarray()`), so it
+    can be used as the `time_vector` of a recording segment. Only the times of the requested samples are
+    computed, the full vector is never stored.
+
+    Parameters
+    ----------
+    sample_starts : array of int
+        The first sample of each piece, the first one must be 0
+    t_starts : array of float
+        The time of the first sample of each piece
+    sampling_frequencies : array of float
+        The sampling frequency of each piece
+    num_samples : int
+        The number of samples of the segment
+    """
+
+    ndim = 1
+    dtype = np.dtype("float64")
+
+    def __init__(self, sample_starts, t_starts, sampling_frequencies, num_samples):
+        self.sample_starts = np.asarray(sample_starts, dtype="int64")
+        self.t_starts = np.asarray(t_starts, dtype="float64")
+        self.sampling_frequencies = np.asarray(sampling_frequencies, dtype="float64")
+        self.num_samples = int(num_samples)
+
+        assert self.sample_starts.ndim == 1 and self.sample_starts.size > 0, "At least one piece is needed"
+        assert self.sample_starts.size == self.t_starts.size == self.sampling_frequencies.size
+        assert self.sample_starts[0] == 0, "The first piece must start at sample 0"
+        assert np.all(np.diff(self.sample_starts) > 0), "sample_starts must be strictly increasing"
+        assert self.sample_starts[-1] < max(self.num_samples, 1), "Pieces must start before num_samples"
+        self._sample_ends = np.append(self.sample_starts[1:], self.num_samples)
+
+    @classmethod
+    def from_time_vector(cls, time_vector, tolerance: float = 1e-6) -> "PiecewiseLinearTimes":
+        """
+        Fit the piecewise linear model on a time vector.
+
+        Pieces are first split at gaps (intervals that differ from the median interval by more than half of it)
+        and then recursively split at the sample of maximum error until every time is reproduced within
+        `tolerance`.
+
+        Parameters
+        ----------
+        time_vector : array
+            The increasing timestamps of the segment
+        tolerance : float, default: 1e-6
+            The maximum error in seconds between the timestamps and the model
+
+        Returns
+        -------
+        times : PiecewiseLinearTimes
+            The compact time model
+        """
+        time_vector = np.asarray(time_vector, dtype="float64")
+        assert time_vector.ndim == 1 and time_vector.size > 0, "time_vector must be a non empty 1d array"
+        num_samples = time_vector.size
+        if num_samples == 1:
+            return cls([0], time_vector[:1], [1.0], 1)
+
+        intervals = np.diff(time_vector)
+        median_interval = np.median(intervals)
+        assert median_interval > 0, "time_vector must be increasing"
+        default_sampling_frequency = 1.0 / median_interval
+
+        (gaps,) = np.nonzero(np.abs(intervals - median_interval) > 0.5 * median_interval)
+        boundaries = np.concatenate([[0], gaps + 1, [num_samples]])
+
+        pieces = []
+        to_fit = [(int(a), int(b)) for a, b in zip(boundaries[:-1], boundaries[1:])]
+        while len(to_fit) > 0:
+            a, b = to_fit.pop()
+            if b - a == 1:
+                pieces.append((a, time_vector[a], default_sampling_frequency))
+                continue
+            sampling_frequency = (b - 1 - a) / (time_vector[b - 1] - time_vector[a])
+            fitted = time_vector[a] + np.arange(b - a) / sampling_frequency
+            errors = np.abs(fitted - time_vector[a:b])
+            worst = int(np.argmax(errors))
+            if errors[worst] <= tolerance:
+                pieces.append((a, time_vector[a], sampling_frequency))
+            else:
+                split = a + max(worst, 1)
+                to_fit.append((a, split))
+                to_fit.append((split, b))
+
+        pieces = sorted(pieces)
+        sample_starts, t_starts, sampling_frequencies = zip(*pieces)
+        return cls(sample_starts, t_starts, sampling_frequencies, num_samples)
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "PiecewiseLinearTimes":
+        return cls(d["sample_starts"], d["t_starts"], d["sampling_frequencies"], d["num_samples"])
+
+    def to_dict(self) -> dict:
+        return dict(
+            sample_starts=self.sample_starts.tolist(),
+            t_starts=self.t_starts.tolist(),
+            sampling_frequencies=self.sampling_frequencies.tolist(),
+            num_samples=self.num_samples,
+        )
+
+    @property
+    def shape(self):
+        return (self.num_samples,)
+
+    @property
+    def size(self):
+        return self.num_samples
+
+    @property
+    def num_pieces(self):
+        return self.sample_starts.size
+
+    def __len__(self):
+        return self.num_samples
+
+    def __repr__(self):
+        return f"PiecewiseLinearTimes(num_samples={self.num_samples}, num_pieces={self.num_pieces})"
+
+    def __array__(self, dtype=None, copy=None):
+        times = self.get_times()
+        if dtype is not None:
+            times = times.astype(dtype)
+        return times
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return self.get_times(*key.indices(self.num_samples))
+        sample_inds = np.asarray(key)
+        if sample_inds.dtype.kind == "b":
+            (sample_inds,) = np.nonzero(sample_inds)
+        sample_inds = np.where(sample_inds < 0, sample_inds + self.num_samples, sample_inds)
+        if sample_inds.size > 0 and (sample_inds.min() < 0 or sample_inds.max() >= self.num_samples):
+            raise IndexError(f"Sample index out of bounds for {self.num_samples} samples")
+        return self.sample_index_to_time(sample_inds)
+
+    def sample_index_to_time(self, sample_inds):
+        """
+        Vectorized conversion of sample indices into times in seconds.
+        """
+        sample_inds = np.asarray(sample_inds)
+        k = np.searchsorted(self.sample_starts, sample_inds, side="right") - 1
+        k = np.maximum(k, 0)
+        return self.t_starts[k] + (sample_inds - self.sample_starts[k]) / self.sampling_frequencies[k]
+
+    def time_to_sample_index(self, times):
+        """
+        Vectorized conversion of times in seconds into the index of the last sample at or before each time.
+        This is the same as `np.searchsorted(time_vector, times, side="right") - 1`: -1 before the first sample
+        and the last sample of the previous piece inside a gap.
+        """
+        times = np.asarray(times, dtype="float64")
+        k = np.searchsorted(self.t_starts, times, side="right") - 1
+        before = k < 0
+        k = np.maximum(k, 0)
+        t_starts = self.t_starts[k]
+        sampling_frequencies = self.sampling_frequencies[k]
+        piece_lengths = self._sample_ends[k] - self.sample_starts[k]
+
+        local = np.floor((times - t_starts) * sampling_frequencies)
+        local = np.clip(local, 0, piece_lengths - 1).astype("int64")
+        # fix the float rounding with the exact same formula as sample_index_to_time()
+        local -= ((t_starts + local / sampling_frequencies) > times) & (local > 0)
+        local += ((t_starts + (local + 1) / sampling_frequencies) <= times) & (local + 1 < piece_lengths)
+
+        sample_inds = self.sample_starts[k] + local
+        return np.where(before, -1, sample_inds)
+
+    def get_times(self, start_frame=None, end_frame=None, step=1):
+        """
+        Return the times of samples from `start_frame` to `end_frame`.
+        """
+        start_frame = 0 if start_frame is None else start_frame
+        end_frame = self.num_samples if end_frame is None else end_frame
+        return self.sample_index_to_time(np.arange(start_frame, end_frame, step, dtype="int64"))
+
+    def slice(self, start_frame, end_frame) -> "PiecewiseLinearTimes":
+        """
+        Return the time model of the samples from `start_frame` to `end_frame`, still in compact form.
+        """
+        start_frame = int(start_frame)
+        end_frame = int(end_frame)
+        first = max(int(np.searchsorted(self.sample_starts, start_frame, side="right")) - 1, 0)
+        last = max(int(np.searchsorted(self.sample_starts, end_frame, side="left")), first + 1)
+        sample_starts = self.sample_starts[first:last].copy()
+        t_starts = self.t_starts[first:last].copy()
+        sampling_frequencies = self.sampling_frequencies[first:last].copy()
+        t_starts[0] = self.sample_index_to_time(start_frame)
+        sample_starts[0] = start_frame
+        return PiecewiseLinearTimes(
+            sample_starts - start_frame, t_starts, sampling_frequencies, max(end_frame - start_frame, 0)
+        )
@@ -0,0 +1,294 @@
+"""
+Lossless numcodecs filters tuned for extracellular traces.
+
+These filters are placed before the compressor in the zarr pipeline (see the `filters` and
+`filters_by_dataset` arguments of `save(format="zarr")`). They turn the traces into residuals that are
+smaller in amplitude and therefore compress better with an entropy coder (e.g. Blosc zstd + bitshuffle):
+
+  * `TemporalDelta` : difference between consecutive samples (order 1) or linear prediction (order 2)
+  * `ChannelDelta` : difference between neighbouring channels (inter-channel prediction)
+  * `LSBScale` : divide every chunk by the greatest common divisor of its values (data recorded with a
+    quantization step that is not 1)
+
+All filters are exact on integer data (they rely on wrap-around integer arithmetic) and keep the dtype,
+so that the shuffle of the compressor still sees the right item size.
+The codecs are registered in numcodecs when `spikeinterface.core` is imported: reading a zarr
+file written with them requires spikeinterface.
+"""
+
+from __future__ import annotations
+
+import time
+
+import numpy as np
+from numcodecs.abc import Codec
+from numcodecs.compat import ensure_ndarray, ndarray_copy
+from numcodecs.registry import register_codec
+
+
+class _IntegerTracesFilter(Codec):
+    def __init__(self, dtype, num_channels):
+        self.dtype = np.dtype(dtype)
+        assert self.dtype.kind in "iu", f"{self.__class__.__name__} is lossless only for integer dtypes"
+        self.num_channels = int(num_channels)
+
+    def _as_traces(self, buf):
+        arr = ensure_ndarray(buf).view(self.dtype)
+        return arr.reshape(-1, self.num_channels)
+
+    def get_config(self):
+        return dict(id=self.codec_id, dtype=self.dtype.str, num_channels=self.num_channels)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(dtype={self.dtype.str!r}, num_channels={self.num_channels})"
+
+
+class TemporalDelta(_IntegerTracesFilter):
+    """
+    Encode each sample as the residual of a polynomial prediction from the previous samples of the same channel.
+
+    Parameters
+    ----------
+    dtype : dtype
+        The integer dtype of the traces
+    num_channels : int
+        The number of channels of the chunks (the `channel_chunk_size` or the number of channels)
+    order : 1 | 2, default: 1
+        1 : x[t] - x[t-1], 2 : x[t] - 2 * x[t-1] + x[t-2] (linear prediction)
+    """
+
+    codec_id = "spikeinterface_temporal_delta"
+
+    def __init__(self, dtype, num_channels, order=1):
+        _IntegerTracesFilter.__init__(self, dtype, num_channels)
+        assert order in (1, 2), "order must be 1 or 2"
+        self.order = int(order)
+
+    def encode(self, buf):
+        enc = self._as_traces(buf).copy()
+        for _ in range(self.order):
+            enc[1:] = np.subtract(enc[1:], enc[:-1])
+        return enc
+
+    def decode(self, buf, out=None):
+        dec = self._as_traces(buf)
+        for _ in range(self.order):
+            dec = np.cumsum(dec, axis=0, dtype=self.dtype)
+        return ndarray_copy(dec, out)
+
+    def get_config(self):
+        config = _IntegerTracesFilter.get_config(self)
+        config["order"] = self.order
+        return config
+
+    def __repr__(self):
+        return f"TemporalDelta(dtype={self.dtype.str!r}, num_channels={self.num_channels}, order={self.order})"
+
+
+class ChannelDelta(_IntegerTracesFilter):
+    """
+    Encode each channel as the difference with the previous channel of the chunk.
+    This removes the noise shared by neighbouring channels (reference, common noise).
+
+    Parameters
+    ----------
+    dtype : dtype
+        The integer dtype of the traces
+    num_channels : int
+        The number of channels of the chunks (the `channel_chunk_size` or the number of channels)
+    """
+
+    codec_id = "spikeinterface_channel_delta"
+
+    def encode(self, buf):
+        enc = self._as_traces(buf).copy()
+        enc[:, 1:] = np.subtract(enc[:, 1:], enc[:, :-1])
+        return enc
+
+    def decode(self, buf, out=None):
+        dec = np.cumsum(self._as_traces(buf), axis=1, dtype=self.dtype)
+        return ndarray_copy(dec, out)
+
+
+class LSBScale(Codec):
+    """
+    Divide the values of each chunk by their greatest common divisor.
+
+    Some acquisition systems store values that are all multiples of a quantization step (LSB) bigger
+    than 1: the step is then lost entropy for the compressor. The divisor is stored as the first item of
+    the encoded chunk, so this filter must be the last one of the filters list.
+
+    Parameters
+    ----------
+    dtype : dtype
+        The integer dtype of the traces
+    """
+
+    codec_id = "spikeinterface_lsb_scale"
+
+    def __init__(self, dtype):
+        self.dtype = np.dtype(dtype)
+        assert self.dtype.kind in "iu", "LSBScale is lossless only for integer dtypes"
+
+    def encode(self, buf):
+        arr = ensure_ndarray(buf).view(self.dtype).reshape(-1)
+        step = int(np.gcd.reduce(arr.astype("int64"))) if arr.size > 0 else 1
+        if step == 0 or step > np.iinfo(self.dtype).max:
+            step = 1
+        enc = np.empty(arr.size + 1, dtype=self.dtype)
+        enc[0] = step
+        np.floor_divide(arr, step, out=enc[1:])
+        return enc
+
+    def decode(self, buf, out=None):
+        enc = ensure_ndarray(buf).view(self.dtype).reshape(-1)
+        dec = enc[1:] * enc[0]
+        return ndarray_copy(dec, out)
+
+    def get_config(self):
+        return dict(id=self.codec_id, dtype=self.dtype.str)
+
+    def __repr__(self):
+        return f"LSBScale(dtype={self.dtype.str!r})"
+
+
+for _codec in (TemporalDelta, ChannelDelta, LSBScale):
+    register_codec(_codec)
+
+
+def get_ephys_zarr_filters(
+    dtype, num_channels, temporal_order: int | None = 1, channel_delta: bool = False, lsb_scale: bool = False
+):
+    """
+    Return a list of lossless filters for integer traces, to be used with `save(format="zarr")`
+    as `filters_by_dataset={"traces": filters}`.
+
+    Parameters
+    ----------
+    dtype : dtype
+        The integer dtype of the saved traces
+    num_channels : int
+        The number of channels in each chunk: the `channel_chunk_size` if any, otherwise the number of channels
+    temporal_order : 1 | 2 | None, default: 1
+        The order of the `TemporalDelta` filter, None to not use it
+    channel_delta : bool, default: False
+        If True, the `ChannelDelta` filter is used
+    lsb_scale : bool, default: False
+        If True, the `LSBScale` filter is used
+
+    Returns
+    -------
+    filters : list
+        The list of filters
+    """
+    filters = []
+    if channel_delta:
+        filters.append(ChannelDelta(dtype=dtype, num_channels=num_channels))
+    if temporal_order is not None:
+        filters.append(TemporalDelta(dtype=dtype, num_channels=num_channels, order=temporal_order))
+    if lsb_scale:
+        filters.append(LSBScale(dtype=dtype))
+    return filters
+
+
+def benchmark_zarr_compression(
+    recording=None,
+    codecs: dict | None = None,
+    chunk_duration: float = 1.0,
+    segment_index: int = 0,
+    num_repeats: int = 3,
+):
+    """
+    Benchmark zarr compressors and filters on traces: compression ratio and encode/decode speed.
+
+    The traces are loaded once in memory and encoded in an in-memory zarr store, so that the speeds
+    only reflect the codecs and the chunking.
+
+    Parameters
+    ----------
+    recording : BaseRecording or None, default: None
+        The recording to compress. If None, a 10s 32 channels int16 ground truth recording is generated
+        with `generate_ground_truth_recording()`.
+    codecs : dict or None, default: None
+        Dict of name: dict(compressor=..., filters=..., channel_chunk_size=...). Each entry is optional.
+        If None, the default compressor is compared with several combinations of the ephys filters,
+        with and without channel chunking.
+    chunk_duration : float, default: 1.0
+        The duration of chunks in seconds
+    segment_index : int, default: 0
+        The segment to use
+    num_repeats : int, default: 3
+        Encode and decode are repeated and the best time is kept
+
+    Returns
+    -------
+    results : pandas.DataFrame
+        One row per codec with "compression_ratio", "encode_MBps" and "decode_MBps" columns
+    """
+    import pandas as pd
+    import zarr
+    from .zarrextractors import get_default_zarr_compressor
+
+    if recording is None:
+        from .generate import generate_ground_truth_recording
+
+        recording, _ = generate_ground_truth_recording(durations=[10.0], num_channels=32, seed=0)
+        # quantize the generated microvolts like an acquisition system with a 0.195 uV step
+        traces = np.round(recording.get_traces(segment_index=segment_index) / 0.195).astype("int16")
+    else:
+        traces = recording.get_traces(segment_index=segment_index)
+    dtype = traces.dtype
+    num_channels = traces.shape[1]
+    chunk_size = int(chunk_duration * recording.sampling_frequency)
+
+    if codecs is None:
+        codecs = {"default": dict()}
+        if dtype.kind in "iu":
+            for ccs in (None, 1):
+                suffix = "" if ccs is None else "_per_channel"
+                nc = num_channels if ccs is None else ccs
+                if ccs is not None:
+                    codecs[f"default{suffix}"] = dict(channel_chunk_size=ccs)
+                codecs[f"delta1{suffix}"] = dict(filters=get_ephys_zarr_filters(dtype, nc, 1), channel_chunk_size=ccs)
+                codecs[f"delta2{suffix}"] = dict(filters=get_ephys_zarr_filters(dtype, nc, 2), channel_chunk_size=ccs)
+            codecs["channel_delta"] = dict(filters=get_ephys_zarr_filters(dtype, num_channels, None, True))
+            codecs["channel_delta_delta1"] = dict(filters=get_ephys_zarr_filters(dtype, num_channels, 1, True))
+            codecs["delta1_lsb"] = dict(filters=get_ephys_zarr_filters(dtype, num_channels, 1, lsb_scale=True))
+
+    rows = []
+    for name, params in codecs.items():
+        compressor = params.get("compressor", get_default_zarr_compressor())
+        filters = params.get("filters", None)
+        channel_chunk_size = params.get("channel_chunk_size", None)
+
+        encode_time = np.inf
+        for _ in range(num_repeats):
+            z = zarr.zeros(
+                shape=traces.shape,
+                chunks=(chunk_size, channel_chunk_size),
+                dtype=dtype,
+                compressor=compressor,
+                filters=filters,
+                store=zarr.MemoryStore(),
+            )
+            t0 = time.perf_counter()
+            z[:] = traces
+            encode_time = min(encode_time, time.perf_counter() - t0)
+
+        decode_time = np.inf
+        for _ in range(num_repeats):
+            t0 = time.perf_counter()
+            decoded = z[:]
+            decode_time = min(decode_time, time.perf_counter() - t0)
+        assert np.array_equal(decoded, traces), f"Codec {name} is not lossless"
+
+        rows.append(
+            dict(
+                codec=name,
+                compression_ratio=z.nbytes / z.nbytes_stored,
+                encode_MBps=traces.nbytes / encode_time / 1e6,
+                decode_MBps=traces.nbytes / decode_time / 1e6,
+            )
+        )
+
+    return pd.DataFrame(rows).set_index("codec")
@@ -1,6 +1,10 @@
 from __future__ import annotations
 
+import os
 import warnings
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import numpy as np
 import zarr
@@ -9,9 +13,11 @@ from probeinterface import ProbeGroup
 
 from .baserecording import BaseRecording, BaseRecordingSegment
 from .basesorting import BaseSorting, SpikeVectorSortingSegment, minimum_spike_dtype
-from .core_tools import define_function_from_class, check_json
+from .core_tools import define_function_from_class, check_json, convert_string_to_bytes
 from .job_tools import split_job_kwargs
 from .recording_tools import determine_cast_unsigned
+from .time_tools import PiecewiseLinearTimes
+from . import zarrcodecs  # registers the ephys filters in numcodecs
 
 
 class ZarrRecordingExtractor(BaseRecording):
@@ -24,6 +30,12 @@ class ZarrRecordingExtractor(BaseRecording):
         Path to the zarr root folder
     storage_options : dict or None
         Storage options for zarr `store`. E.g., if "s3://" or "gcs://" they can provide authentication methods, etc.
+    cache_memory : str or None, default: "100M"
+        Memory budget (per process and per segment) of the LRU cache of decompressed chunks.
+        Chunks shared by consecutive reads (e.g. the margins of neighbouring executor chunks)
+        are then decompressed only once. None disables the cache.
+    decompression_threads : int, default: 4
+        Maximum number of threads used to decompress the chunks needed by one `get_traces()` call
 
     Returns
     -------
@@ -31,7 +43,13 @@ class ZarrRecordingExtractor(BaseRecording):
         The recording Extractor
     """
 
-    def __init__(self, folder_path: Path | str, storage_options: dict | None = None):
+    def __init__(
+        self,
+        folder_path: Path | str,
+        storage_options: dict | None = None,
+        cache_memory: str | None = "100M",
+        decompression_threads: int = 4,
+    ):
 
         folder_path, folder_path_kwarg = resolve_zarr_path(folder_path)
 
@@ -65,8 +83,11 @@ class ZarrRecordingExtractor(BaseRecording):
 
             time_kwargs = {}
             time_vector = self._root.get(f"times_seg{segment_index}", None)
+            piecewise_times = self._root.attrs.get("piecewise_times", {}).get(str(segment_index), None)
             if time_vector is not None:
                 time_kwargs["time_vector"] = time_vector
+            elif piecewise_times is not None:
+                time_kwargs["time_vector"] = PiecewiseLinearTimes.from_dict(piecewise_times)
             else:
                 if t_starts is None:
                     t_start = None
@@ -77,7 +98,13 @@ class ZarrRecordingExtractor(BaseRecording):
                 time_kwargs["t_start"] = t_start
                 time_kwargs["sampling_frequency"] = sampling_frequency
 
-            rec_segment = ZarrRecordingSegment(self._root, trace_name, **time_kwargs)
+            rec_segment = ZarrRecordingSegment(
+                self._root,
+                trace_name,
+                cache_memory=cache_memory,
+                decompression_threads=decompression_threads,
+                **time_kwargs,
+            )
 
             nbytes_segment = self._root[trace_name].nbytes
             nbytes_stored_segment = self._root[trace_name].nbytes_stored
@@ -107,8 +134,18 @@ class ZarrRecordingExtractor(BaseRecording):
         # annotate compression ratios
         cr = total_nbytes / total_nbytes_stored
         self.annotate(compression_ratio=cr, compression_ratio_segments=cr_by_segment)
+        # the time chunking of the storage, used by ensure_chunk_size() to align the executor chunks on it
+        self._storage_chunk_size = int(self._root["traces_seg0"].chunks[0])
 
-        self._kwargs = {"folder_path": folder_path_kwarg, "storage_options": storage_options}
+        self._kwargs = {
+            "folder_path": folder_path_kwarg,
+            "storage_options": storage_options,
+            "cache_memory": cache_memory,
+            "decompression_threads": decompression_threads,
+        }
+
+    def get_storage_chunk_size(self):
+        return self._storage_chunk_size
 
     @staticmethod
     def write_recording(
@@ -119,9 +156,22 @@ class ZarrRecordingExtractor(BaseRecording):
 
 
 class ZarrRecordingSegment(BaseRecordingSegment):
-    def __init__(self, root, dataset_name, **time_kwargs):
+    """
+    Read traces chunk by chunk on the zarr chunk grid.
+
+    `get_traces()` plans which (time, channel) chunks cover the request, only touches the channel
+    chunks of the selected channels, decompresses the missing chunks with a thread pool and keeps
+    the decompressed chunks in a small LRU cache.
+    """
+
+    def __init__(self, root, dataset_name, cache_memory="100M", decompression_threads=4, **time_kwargs):
         BaseRecordingSegment.__init__(self, **time_kwargs)
         self._timeseries = root[dataset_name]
+        self.decompression_threads = max(1, int(decompression_threads))
+        self._cache = ChunkLRUCache(convert_string_to_bytes(cache_memory) if cache_memory is not None else 0)
+        # created on first use, and again in a forked process (the threads do not survive the fork)
+        self._thread_pool = None
+        self._thread_pool_pid = None
 
     def get_num_samples(self) -> int:
         """Returns the number of samples in this signal block
@@ -137,11 +187,133 @@ class ZarrRecordingSegment(BaseRecordingSegment):
         end_frame: int | None = None,
         channel_indices: list[int | str] | None = None,
     ) -> np.ndarray:
-        traces = self._timeseries[start_frame:end_frame]
-        if channel_indices is not None:
-            traces = traces[:, channel_indices]
+        timeseries = self._timeseries
+        num_samples, num_channels = timeseries.shape
+        start_frame = 0 if start_frame is None else start_frame
+        end_frame = num_samples if end_frame is None else end_frame
+        time_chunk, channel_chunk = timeseries.chunks
+
+        if channel_indices is None:
+            channel_indices = np.arange(num_channels)
+        elif isinstance(channel_indices, slice):
+            channel_indices = np.arange(num_channels)[channel_indices]
+        else:
+            channel_indices = np.asarray(channel_indices)
+            if channel_indices.dtype == bool:
+                channel_indices = np.flatnonzero(channel_indices)
+            channel_indices = channel_indices.astype("int64", copy=False)
+
+        traces = np.empty((end_frame - start_frame, channel_indices.size), dtype=timeseries.dtype)
+        if traces.size == 0:
+            return traces
+
+        # plan: for each needed channel chunk, the output columns and the columns inside the chunk
+        channel_chunk_inds = channel_indices // channel_chunk
+        channel_plan = []
+        for c in np.unique(channel_chunk_inds):
+            (out_columns,) = np.nonzero(channel_chunk_inds == c)
+            in_columns = channel_indices[out_columns] - c * channel_chunk
+            channel_plan.append((int(c), _as_slice(out_columns), _as_slice(in_columns)))
+        time_chunk_inds = range(start_frame // time_chunk, (end_frame - 1) // time_chunk + 1)
+        keys = [(t, c) for t in time_chunk_inds for c, _, _ in channel_plan]
+
+        blocks = self._get_chunks(keys)
+
+        for t in time_chunk_inds:
+            chunk_start = t * time_chunk
+            i0 = max(start_frame, chunk_start)
+            i1 = min(end_frame, chunk_start + time_chunk)
+            for c, out_columns, in_columns in channel_plan:
+                block = blocks[(t, c)][i0 - chunk_start : i1 - chunk_start]
+                traces[i0 - start_frame : i1 - start_frame, out_columns] = block[:, in_columns]
+
         return traces
 
+    def _get_chunks(self, keys):
+        blocks = {}
+        missing = []
+        for key in keys:
+            block = self._cache.get(key)
+            if block is None:
+                missing.append(key)
+            else:
+                blocks[key] = block
+
+        timeseries = self._timeseries
+        n_threads = min(self.decompression_threads, len(missing))
+        if n_threads > 1:
+            decoded = list(self._get_thread_pool().map(lambda key: timeseries.blocks[key], missing))
+        else:
+            decoded = [timeseries.blocks[key] for key in missing]
+
+        for key, block in zip(missing, decoded):
+            blocks[key] = block
+            self._cache.put(key, block)
+        return blocks
+
+    def _get_thread_pool(self):
+        if self._thread_pool is None or self._thread_pool_pid != os.getpid():
+            self._thread_pool = ThreadPoolExecutor(max_workers=self.decompression_threads)
+            self._thread_pool_pid = os.getpid()
+        return self._thread_pool
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_thread_pool"] = None
+        state["_thread_pool_pid"] = None
+        return state
+
+    def __del__(self):
+        # the threads of a pool inherited by a fork do not exist in this process
+        thread_pool = getattr(self, "_thread_pool", None)
+        if thread_pool is not None and self._thread_pool_pid == os.getpid():
+            thread_pool.shutdown(wait=False)
+
+
+class ChunkLRUCache:
+    """
+    Thread safe LRU cache of decompressed chunks bounded by a memory budget in bytes.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._blocks = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            block = self._blocks.get(key, None)
+            if block is not None:
+                self._blocks.move_to_end(key)
+            return block
+
+    def put(self, key, block):
+        if block.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._blocks:
+                return
+            self._blocks[key] = block
+            self.nbytes += block.nbytes
+            while self.nbytes > self.max_bytes:
+                _, removed = self._blocks.popitem(last=False)
+                self.nbytes -= removed.nbytes
+
+    def __getstate__(self):
+        # decompressed chunks and the lock are never shipped to workers
+        return dict(max_bytes=self.max_bytes)
+
+    def __setstate__(self, state):
+        self.__init__(state["max_bytes"])
+
+
+def _as_slice(indices):
+    """Return a slice equivalent to an array of increasing consecutive indices, otherwise the array itself"""
+    if indices.size > 0 and indices[-1] - indices[0] == indices.size - 1 and np.all(np.diff(indices) == 1):
+        return slice(int(indices[0]), int(indices[-1]) + 1)
+    return indices
+
 
 class ZarrSortingExtractor(BaseSorting):
     """
@@ -399,6 +571,7 @@ def add_recording_to_zarr_group(
 
     # save time vector if any
     t_starts = np.zeros(recording.get_num_segments(), dtype="float64") * np.nan
+    piecewise_times = {}
     for segment_index, rs in enumerate(recording._recording_segments):
         d = rs.get_times_kwargs()
         time_vector = d["time_vector"]
@@ -406,7 +579,10 @@ def add_recording_to_zarr_group(
         compressor_times = compressor_by_dataset.get("times", global_compressor)
         filters_times = filters_by_dataset.get("times", global_filters)
 
-        if time_vector is not None:
+        if isinstance(time_vector, PiecewiseLinearTimes):
+            # the compact time model is stored as attributes, times are never materialized
+            piecewise_times[str(segment_index)] = time_vector.to_dict()
+        elif time_vector is not None:
             _ = zarr_group.create_dataset(
                 name=f"times_seg{segment_index}",
                 data=time_vector,
@@ -418,6 +594,8 @@ def add_recording_to_zarr_group(
 
     if np.any(~np.isnan(t_starts)):
         zarr_group.create_dataset(name="t_starts", data=t_starts, compressor=None)
+    if len(piecewise_times) > 0:
+        zarr_group.attrs["piecewise_times"] = piecewise_times
 
     add_properties_and_annotations(zarr_group, recording)
 
@@ -2,7 +2,7 @@ from __future__ import annotations
 from typing import Optional
 import numpy as np
 
-from ..core import BaseSorting, BaseSortingSegment, BaseRecording
+from ..core import BaseSorting, BaseSortingSegment, BaseRecording, IntervalSet
 from ..core.waveform_tools import has_exceeding_spikes
 
 
@@ -61,9 +61,8 @@ class RemoveExcessSpikesSorting(BaseSorting):
         segments_bounds = np.searchsorted(parent_spike_vector["segment_index"], np.arange(1 + num_segments))
         for segment_index in range(num_segments):
             spike_vector = parent_spike_vector[segments_bounds[segment_index] : segments_bounds[segment_index + 1]]
-            end = np.searchsorted(spike_vector["sample_index"], self._num_samples[segment_index])
-            start = np.searchsorted(spike_vector["sample_index"], 0, side="left")
-            list_spike_vectors.append(spike_vector[start:end])
+            frames = IntervalSet([0], [self._num_samples[segment_index]])
+            list_spike_vectors.append(spike_vector[frames.select_sorted(spike_vector["sample_index"])])
 
         spike_vector = np.concatenate(list_spike_vectors)
         self._cached_spike_vector = spike_vector
@@ -6,4 +6,4 @@ from .bids import read_bids
 
 from .neuropixels_utils import get_neuropixels_channel_groups, get_neuropixels_sample_shifts
 
-from .neoextractors import get_neo_num_blocks, get_neo_streams
+from .neoextractors import get_neo_num_blocks, get_neo_streams, neo_reader_cache
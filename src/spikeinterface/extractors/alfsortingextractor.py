@@ -6,6 +6,7 @@ import numpy as np
 
 from spikeinterface.core import BaseSorting, BaseSortingSegment
 from spikeinterface.core.core_tools import define_function_from_class
+from spikeinterface.core.sorting_tools import spike_vector_from_unit_labels
 
 
 class ALFSortingExtractor(BaseSorting):
@@ -44,6 +45,12 @@ class ALFSortingExtractor(BaseSorting):
         self.extra_requirements.append("ONE-api")
         self._kwargs = {"folder_path": str(Path(folder_path).resolve()), "sampling_frequency": sampling_frequency}
 
+    def _custom_cache_spike_vector(self) -> None:
+        segment = self._sorting_segments[0]
+        self._cached_spike_vector = spike_vector_from_unit_labels(
+            segment._spike_samples, segment._spike_clusters, self.unit_ids
+        )
+
 
 class ALFSortingSegment(BaseSortingSegment):
     def __init__(self, spike_clusters, spike_samples):
@@ -6,6 +6,7 @@ from pathlib import Path
 
 from ..core import BaseSorting, BaseSortingSegment
 from ..core.core_tools import define_function_from_class
+from ..core.sorting_tools import spike_vector_from_unit_labels
 
 
 class CellExplorerSortingExtractor(BaseSorting):
@@ -112,6 +113,14 @@ class CellExplorerSortingExtractor(BaseSorting):
             session_info_file_path=str(session_info_file_path),
         )
 
+    def _custom_cache_spike_vector(self) -> None:
+        spiketrains_dict = self._sorting_segments[0].spiketrains_dict
+        spike_trains = [spiketrains_dict[unit_id] for unit_id in self.unit_ids]
+        num_spikes = [spike_train.size for spike_train in spike_trains]
+        unit_indices = np.repeat(np.arange(self.get_num_units()), num_spikes)
+        sample_indices = np.concatenate(spike_trains) if len(spike_trains) > 0 else np.zeros(0, dtype="int64")
+        self._cached_spike_vector = spike_vector_from_unit_labels(sample_indices, unit_indices)
+
     def _retrieve_sampling_frequency_from_session_file(self) -> float | None:
         """
         Retrieve the sampling frequency from the `.session.mat` file if available.
@@ -12,6 +12,7 @@ import numpy as np
 
 from spikeinterface.core import BaseRecording, BaseRecordingSegment, BaseSorting, BaseSortingSegment
 from spikeinterface.core.core_tools import define_function_from_class
+from spikeinterface.core.sorting_tools import spike_vector_from_unit_labels
 from spikeinterface.core import write_binary_recording
 from spikeinterface.core.job_tools import fix_job_kwargs
 
@@ -203,6 +204,12 @@ class MdaSortingExtractor(BaseSorting):
             "sampling_frequency": sampling_frequency,
         }
 
+    def _custom_cache_spike_vector(self) -> None:
+        segment = self._sorting_segments[0]
+        self._cached_spike_vector = spike_vector_from_unit_labels(
+            np.rint(segment._spike_times), segment._labels, self.unit_ids
+        )
+
     @staticmethod
     def write_sorting(sorting, save_path, write_primary_channels=False):
         assert sorting.get_num_segments() == 1, "MdaSorting.write_sorting() can only write a single segment " "sorting"
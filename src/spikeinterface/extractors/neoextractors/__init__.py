@@ -40,6 +40,7 @@ from .spikeglx import SpikeGLXRecordingExtractor, SpikeGLXEventExtractor, read_s
 from .tdt import TdtRecordingExtractor, read_tdt
 
 from .neo_utils import get_neo_streams, get_neo_num_blocks
+from .neobaseextractor import neo_reader_cache
 
 neo_recording_extractors_list = [
     AlphaOmegaRecordingExtractor,
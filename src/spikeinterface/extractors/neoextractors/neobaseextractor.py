@@ -1,6 +1,11 @@
 from __future__ import annotations
 
 from typing import Optional, Union, Dict, Any, List, Tuple
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+import mmap
+import os
 import warnings
 from math import isclose
 
@@ -17,6 +22,58 @@ from spikeinterface.core import (
 )
 
 
+# parsed neo readers reused inside a `neo_reader_cache()` block, None when no block is active
+_neo_reader_cache = None
+_neo_reader_cache_max_size = 8
+
+
+def _neo_reader_cache_key(raw_class, neo_kwargs):
+    """
+    Cache key made of the kwargs and of the size and modification time of the files they point to,
+    so that a file modified inside the block is parsed again.
+    """
+    key = [raw_class]
+    for name, value in sorted(neo_kwargs.items()):
+        key.append((name, repr(value)))
+        if isinstance(value, (str, Path)) and os.path.exists(value):
+            paths = [Path(value)]
+            if paths[0].is_dir():
+                paths += sorted(paths[0].iterdir())
+            for path in paths:
+                stat = path.stat()
+                key.append((str(path), stat.st_size, stat.st_mtime_ns))
+    return tuple(key)
+
+
+@contextmanager
+def neo_reader_cache(max_size: int = 8):
+    """
+    Context manager that reuses the neo readers parsed by `get_neo_io_reader()` inside the block, for instance
+    to read several streams of the same files or to call `get_neo_streams()` before reading.
+
+    The cache is off by default: cached readers are shared by all the extractors of the block and keep their
+    files open (and locked on Windows) until the end of the block, where they are released.
+    The cache only lives in the process that opens the block: the workers of a parallel job rebuild the
+    extractors and parse the headers again.
+
+    Parameters
+    ----------
+    max_size : int, default: 8
+        The maximum number of readers kept, the least recently used ones are dropped first.
+    """
+    global _neo_reader_cache, _neo_reader_cache_max_size
+    if _neo_reader_cache is not None:
+        # nested block: the outer block owns the cache
+        yield
+        return
+    _neo_reader_cache = OrderedDict()
+    _neo_reader_cache_max_size = max_size
+    try:
+        yield
+    finally:
+        _neo_reader_cache = None
+
+
 class _NeoBaseExtractor:
     NeoRawIOClass = None
 
@@ -45,6 +102,7 @@ class _NeoBaseExtractor:
         Dynamically creates an instance of a NEO IO reader class using the specified class name and keyword arguments.
 
         Note that the function parses the header which makes all the information available to the extractor.
+        Inside a `neo_reader_cache()` block, opening the same files again reuses the parsed reader.
 
         Parameters
         ----------
@@ -60,11 +118,27 @@ class _NeoBaseExtractor:
 
         """
 
+        cache = _neo_reader_cache
+        key = None
+        if cache is not None:
+            try:
+                key = _neo_reader_cache_key(raw_class, neo_kwargs)
+            except OSError:
+                key = None
+            if key is not None and key in cache:
+                cache.move_to_end(key)
+                return cache[key]
+
         rawio_module = importlib.import_module("neo.rawio")
         neoIOclass = getattr(rawio_module, raw_class)
         neo_reader = neoIOclass(**neo_kwargs)
         neo_reader.parse_header()
 
+        if key is not None and _neo_reader_cache_max_size > 0:
+            cache[key] = neo_reader
+            while len(cache) > _neo_reader_cache_max_size:
+                cache.popitem(last=False)
+
         return neo_reader
 
     @classmethod
@@ -155,6 +229,11 @@ class _NeoBaseExtractor:
 
 
 class NeoBaseRecordingExtractor(_NeoBaseExtractor, BaseRecording):
+    # When the neo reader exposes the signals as a memmap on an interleaved binary file (SpikeGLX, OpenEphys binary,
+    # raw binary, ...) the traces are read directly from the file with the BinaryRecordingSegment engine instead of
+    # `neo_reader.get_analogsignal_chunk()`. Set to False to always read through neo.
+    use_binary_fast_path = True
+
     def __init__(
         self,
         stream_id: Optional[str] = None,
@@ -311,12 +390,41 @@ class NeoBaseRecordingExtractor(_NeoBaseExtractor, BaseRecording):
         nseg = self.neo_reader.segment_count(block_index=self.block_index)
         for segment_index in range(nseg):
             rec_segment = NeoRecordingSegment(
-                self.neo_reader, self.block_index, segment_index, self.stream_index, self.inverted_gain
+                self.neo_reader,
+                self.block_index,
+                segment_index,
+                self.stream_index,
+                self.inverted_gain,
+                use_binary_fast_path=self.use_binary_fast_path,
             )
             self.add_recording_segment(rec_segment)
 
         self._kwargs.update(kwargs)
 
+    def is_binary_compatible(self) -> bool:
+        # the stream must be the full rows of the same kind of file for all segments, without gain inversion
+        if self.inverted_gain:
+            return False
+        file_layouts = set()
+        for rec_segment in self._recording_segments:
+            binary_segment = rec_segment._binary_segment
+            if binary_segment is None or binary_segment.num_channels != self.get_num_channels():
+                return False
+            file_layouts.add((binary_segment.file_offset, binary_segment.dtype.str))
+        return len(file_layouts) == 1
+
+    def get_binary_description(self):
+        assert self.is_binary_compatible(), "This neo recording is not binary compatible"
+        binary_segments = [rec_segment._binary_segment for rec_segment in self._recording_segments]
+        d = dict(
+            file_paths=[str(binary_segment.file_path) for binary_segment in binary_segments],
+            dtype=binary_segments[0].dtype,
+            num_channels=binary_segments[0].num_channels,
+            time_axis=0,
+            file_offset=binary_segments[0].file_offset,
+        )
+        return d
+
     @classmethod
     def get_num_blocks(cls, *args, **kwargs):
         neo_kwargs = cls.map_to_neo_kwargs(*args, **kwargs)
@@ -325,7 +433,7 @@ class NeoBaseRecordingExtractor(_NeoBaseExtractor, BaseRecording):
 
 
 class NeoRecordingSegment(BaseRecordingSegment):
-    def __init__(self, neo_reader, block_index, segment_index, stream_index, inverted_gain):
+    def __init__(self, neo_reader, block_index, segment_index, stream_index, inverted_gain, use_binary_fast_path=True):
         sampling_frequency = neo_reader.get_signal_sampling_rate(stream_index=stream_index)
         t_start = neo_reader.get_signal_t_start(block_index, segment_index, stream_index=stream_index)
         BaseRecordingSegment.__init__(self, sampling_frequency=sampling_frequency, t_start=t_start)
@@ -335,6 +443,14 @@ class NeoRecordingSegment(BaseRecordingSegment):
         self.block_index = block_index
         self.inverted_gain = inverted_gain
 
+        self._binary_segment = None
+        if use_binary_fast_path:
+            self._binary_segment = get_binary_segment_from_neo_memmap(
+                neo_reader, block_index, segment_index, stream_index
+            )
+        if self._binary_segment is not None:
+            self._num_stream_channels = neo_reader.signal_channels_count(stream_index)
+
     def get_num_samples(self):
         num_samples = self.neo_reader.get_signal_size(
             block_index=self.block_index, seg_index=self.segment_index, stream_index=self.stream_index
@@ -348,19 +464,111 @@ class NeoRecordingSegment(BaseRecordingSegment):
         end_frame: Union[int, None] = None,
         channel_indices: Union[List, None] = None,
     ) -> np.ndarray:
-        raw_traces = self.neo_reader.get_analogsignal_chunk(
-            block_index=self.block_index,
-            seg_index=self.segment_index,
-            i_start=start_frame,
-            i_stop=end_frame,
-            stream_index=self.stream_index,
-            channel_indexes=channel_indices,
-        )
+        if self._binary_segment is not None:
+            if channel_indices is None and self._num_stream_channels != self._binary_segment.num_channels:
+                # the stream is only the first columns of the file (e.g. SpikeGLX without the sync channel)
+                channel_indices = slice(0, self._num_stream_channels)
+            elif channel_indices is not None and not isinstance(channel_indices, slice):
+                channel_indices = np.asarray(channel_indices)
+                if channel_indices.dtype != bool and channel_indices.size > 0 and np.all(np.diff(channel_indices) == 1):
+                    # consecutive channels: a slice avoids a copy
+                    channel_indices = slice(channel_indices[0], channel_indices[0] + channel_indices.size)
+            raw_traces = self._binary_segment.get_traces(start_frame, end_frame, channel_indices)
+        else:
+            raw_traces = self.neo_reader.get_analogsignal_chunk(
+                block_index=self.block_index,
+                seg_index=self.segment_index,
+                i_start=start_frame,
+                i_stop=end_frame,
+                stream_index=self.stream_index,
+                channel_indexes=channel_indices,
+            )
         if self.inverted_gain:
             raw_traces = -raw_traces
         return raw_traces
 
 
+def get_binary_segment_from_neo_memmap(neo_reader, block_index, segment_index, stream_index):
+    """
+    Discover the raw file layout of a neo stream from the memmap returned by the neo reader.
+
+    Many neo readers (SpikeGLX, OpenEphys binary, raw binary, ...) return the signals as a view of a
+    `np.memmap` on an interleaved binary file. In that case the file path, dtype, byte offset and number
+    of interleaved channels can be recovered from the view, and a `BinaryRecordingSegment` on the same
+    file is returned. The columns of this binary segment are the channels of the stream.
+
+    Returns None (and neo should be used) when the layout can not be discovered safely.
+    """
+    from spikeinterface.core.binaryrecordingextractor import BinaryRecordingSegment
+
+    num_samples = neo_reader.get_signal_size(
+        block_index=block_index, seg_index=segment_index, stream_index=stream_index
+    )
+    num_samples = int(num_samples)
+    if num_samples == 0:
+        return None
+
+    try:
+        chunk = neo_reader.get_analogsignal_chunk(
+            block_index=block_index,
+            seg_index=segment_index,
+            i_start=0,
+            i_stop=1,
+            stream_index=stream_index,
+            channel_indexes=None,
+        )
+    except Exception:
+        return None
+
+    mm = getattr(chunk, "_mmap", None)
+    if not isinstance(chunk, np.memmap) or mm is None or chunk.filename is None or chunk.ndim != 2:
+        return None
+    itemsize = chunk.dtype.itemsize
+    row_bytes = chunk.strides[0]
+    # channels must be interleaved: contiguous columns and rows of full samples
+    if chunk.strides[1] != itemsize or row_bytes % itemsize != 0 or row_bytes < chunk.shape[1] * itemsize:
+        return None
+
+    # byte position of the first sample of the stream in the file
+    # np.memmap maps the file from the offset rounded down to the allocation granularity
+    mmap_start = chunk.offset - chunk.offset % mmap.ALLOCATIONGRANULARITY
+    mmap_address = np.frombuffer(mm, dtype="uint8").ctypes.data
+    file_offset = mmap_start + chunk.ctypes.data - mmap_address
+
+    file_path = chunk.filename
+    # the rows read for the stream must be inside the file
+    if file_offset < 0 or file_offset + num_samples * row_bytes > os.path.getsize(file_path):
+        return None
+
+    sampling_frequency = neo_reader.get_signal_sampling_rate(stream_index=stream_index)
+    binary_segment = BinaryRecordingSegment(
+        file_path,
+        sampling_frequency,
+        None,
+        row_bytes // itemsize,
+        chunk.dtype,
+        0,
+        file_offset,
+    )
+
+    # check on a few samples that neo and the discovered layout agree
+    num_stream_channels = chunk.shape[1]
+    for i_start in (0, num_samples // 2, num_samples - 1):
+        neo_traces = neo_reader.get_analogsignal_chunk(
+            block_index=block_index,
+            seg_index=segment_index,
+            i_start=i_start,
+            i_stop=i_start + 1,
+            stream_index=stream_index,
+            channel_indexes=None,
+        )
+        binary_traces = binary_segment.get_traces(i_start, i_start + 1, slice(0, num_stream_channels))
+        if not np.array_equal(neo_traces, binary_traces):
+            return None
+
+    return binary_segment
+
+
 class NeoBaseSortingExtractor(_NeoBaseExtractor, BaseSorting):
     neo_returns_frames = True
     # `neo_returns_frames` is a class attribute indicating whether
@@ -8,6 +8,7 @@ import numpy as np
 from spikeinterface import get_global_tmp_folder
 from spikeinterface.core import BaseRecording, BaseRecordingSegment, BaseSorting, BaseSortingSegment
 from spikeinterface.core.core_tools import define_function_from_class
+from spikeinterface.core.sorting_tools import spike_vector_from_unit_labels
 
 
 def read_file_from_backend(
@@ -1126,6 +1127,16 @@ class NwbSortingExtractor(BaseSorting, _BaseNWBExtractor):
             "t_start": self.t_start,
         }
 
+    def _custom_cache_spike_vector(self) -> None:
+        # the units table is a ragged array: read all spike times at once instead of unit by unit
+        segment = self._sorting_segments[0]
+        spike_times_index = np.asarray(segment.spike_times_index_data[:], dtype="int64")
+        num_spikes = np.diff(spike_times_index, prepend=0)
+        unit_indices = np.repeat(np.arange(self.get_num_units()), num_spikes)
+        spike_times = np.asarray(segment.spike_times_data[:])
+        frames = np.round((spike_times - segment._t_start) * segment._sampling_frequency)
+        self._cached_spike_vector = spike_vector_from_unit_labels(frames, unit_indices)
+
     def _fetch_sorting_segment_info_pynwb(
         self, unit_table_path: str = None, samples_for_rate_estimation: int = 1000, cache: bool = False
     ):
@@ -7,6 +7,7 @@ import numpy as np
 
 from spikeinterface.core import BaseSorting, BaseSortingSegment, read_python
 from spikeinterface.core.core_tools import define_function_from_class
+from spikeinterface.core.sorting_tools import spike_vector_from_unit_labels
 
 
 class BasePhyKilosortSortingExtractor(BaseSorting):
@@ -187,6 +188,13 @@ class BasePhyKilosortSortingExtractor(BaseSorting):
 
         self.add_sorting_segment(PhySortingSegment(spike_times_clean, spike_clusters_clean))
 
+    def _custom_cache_spike_vector(self) -> None:
+        # spike times and clusters are already flat arrays
+        segment = self._sorting_segments[0]
+        self._cached_spike_vector = spike_vector_from_unit_labels(
+            segment._all_spikes, segment._all_clusters, self.unit_ids
+        )
+
 
 class PhySortingSegment(BaseSortingSegment):
     def __init__(self, all_spikes, all_clusters):
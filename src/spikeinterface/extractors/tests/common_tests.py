@@ -84,6 +84,34 @@ class RecordingCommonTestSuite(CommonTestSuite):
             if hasattr(self.ExtractorClass, "NeoRawIOClass"):
                 rec = self.ExtractorClass(self.get_full_path(path), all_annotations=True, **kwargs)
 
+    def test_neo_binary_fast_path(self):
+        if not issubclass(self.ExtractorClass, NeoBaseRecordingExtractor):
+            return
+        for entity in self.entities:
+            if isinstance(entity, tuple):
+                path, kwargs = entity
+            elif isinstance(entity, str):
+                path = entity
+                kwargs = {}
+
+            full_path = self.get_full_path(path)
+            recording = self.ExtractorClass(full_path, **kwargs)
+            try:
+                self.ExtractorClass.use_binary_fast_path = False
+                neo_recording = self.ExtractorClass(full_path, **kwargs)
+            finally:
+                self.ExtractorClass.use_binary_fast_path = True
+
+            channel_ids = recording.channel_ids[::2]
+            for segment_index in range(recording.get_num_segments()):
+                end_frame = min(recording.get_num_samples(segment_index=segment_index), 1000)
+                for ids in (None, channel_ids):
+                    traces = recording.get_traces(segment_index=segment_index, end_frame=end_frame, channel_ids=ids)
+                    neo_traces = neo_recording.get_traces(
+                        segment_index=segment_index, end_frame=end_frame, channel_ids=ids
+                    )
+                    assert np.array_equal(traces, neo_traces)
+
     def test_pickling(self):
         for entity in self.entities:
             if isinstance(entity, tuple):
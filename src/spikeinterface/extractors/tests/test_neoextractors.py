@@ -381,6 +381,35 @@ class Plexon2SortingTest(SortingCommonTestSuite, unittest.TestCase):
     entities = [("plexon/4chDemoPL2.pl2", {"sampling_frequency": 40000})]
 
 
+def test_neo_reader_cache(tmp_path):
+    import numpy as np
+    from spikeinterface.extractors import neo_reader_cache
+    from spikeinterface.extractors.neoextractors.neobaseextractor import NeoBaseRecordingExtractor
+
+    file_path = tmp_path / "signals.raw"
+    np.zeros((1000, 4), dtype="int16").tofile(file_path)
+    neo_kwargs = dict(filename=str(file_path), dtype="int16", sampling_rate=1000.0, nb_channel=4)
+
+    # off by default
+    reader = NeoBaseRecordingExtractor.get_neo_io_reader("RawBinarySignalRawIO", **neo_kwargs)
+    assert NeoBaseRecordingExtractor.get_neo_io_reader("RawBinarySignalRawIO", **neo_kwargs) is not reader
+
+    with neo_reader_cache():
+        reader = NeoBaseRecordingExtractor.get_neo_io_reader("RawBinarySignalRawIO", **neo_kwargs)
+        with neo_reader_cache():
+            assert NeoBaseRecordingExtractor.get_neo_io_reader("RawBinarySignalRawIO", **neo_kwargs) is reader
+
+        # a modified file is parsed again (the cached reader keeps the file locked on Windows)
+        if platform.system() != "Windows":
+            np.zeros((2000, 4), dtype="int16").tofile(file_path)
+            reader2 = NeoBaseRecordingExtractor.get_neo_io_reader("RawBinarySignalRawIO", **neo_kwargs)
+            assert reader2.get_signal_size(0, 0, 0) == 2000
+            reader = reader2
+
+    # the readers are released at the end of the block
+    assert NeoBaseRecordingExtractor.get_neo_io_reader("RawBinarySignalRawIO", **neo_kwargs) is not reader
+
+
 if __name__ == "__main__":
     # test = MearecSortingTest()
     # test = SpikeGLXRecordingTest()
@@ -1,27 +1,153 @@
 """
 This is a module to import the entire spikeinterface in a flat way.
 With `import spikeinterface.full as si`
-Note that import is convenient, but quite heavy.
 
 # this imports the core only
 import spikeinterface as si
 
-# this imports everything in a flat module
+# this gives access to everything in a flat module
 import spieinterface.full as si
+
+The submodules are imported lazily (PEP 562): `si.read_spikeglx` imports `spikeinterface.extractors`
+(with all its extractors) but not the other submodules, and `si.plot_traces` imports `spikeinterface.widgets`.
+`from spikeinterface.full import *` still imports everything.
 """
 
+import ast
+import importlib
 import importlib.metadata
+import sys
+from pathlib import Path
 
 __version__ = importlib.metadata.version("spikeinterface")
 
 from .core import *
-from .extractors import *
-from .sorters import *
-from .preprocessing import *
-from .postprocessing import *
-from .qualitymetrics import *
-from .curation import *
-from .comparison import *
-from .widgets import *
-from .exporters import *
-from .generation import *
+
+# same order as the former eager star imports: a name exported by several submodules comes from the last one
+_submodules = [
+    "core",
+    "extractors",
+    "sorters",
+    "preprocessing",
+    "postprocessing",
+    "qualitymetrics",
+    "curation",
+    "comparison",
+    "widgets",
+    "exporters",
+    "generation",
+]
+
+_lazy_index = None
+# note that `globals` is shadowed by spikeinterface.core.globals
+_this_module = sys.modules[__name__]
+
+
+def _module_file(module_name):
+    path = Path(__file__).parent.joinpath(*module_name.split(".")[1:])
+    if (path / "__init__.py").is_file():
+        return path / "__init__.py", True
+    elif path.with_suffix(".py").is_file():
+        return path.with_suffix(".py"), False
+    return None, False
+
+
+def _exported_names(module_name, visited):
+    """
+    Names that `from module_name import *` gives, found by parsing the source without importing it.
+    """
+    if module_name in visited:
+        return []
+    visited.add(module_name)
+    file, is_package = _module_file(module_name)
+    if file is None:
+        return []
+    tree = ast.parse(file.read_text(encoding="utf8"))
+    package = module_name if is_package else module_name.rsplit(".", 1)[0]
+
+    names = []
+    explicit_all = None
+    statements = list(tree.body)
+    while len(statements) > 0:
+        node = statements.pop(0)
+        if isinstance(node, (ast.If, ast.Try)):
+            statements = node.body + getattr(node, "orelse", []) + statements
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.append(node.name)
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            for target in targets:
+                if isinstance(target, ast.Name):
+                    names.append(target.id)
+                    if target.id == "__all__" and isinstance(node.value, (ast.List, ast.Tuple)):
+                        explicit_all = [elt.value for elt in node.value.elts if isinstance(elt, ast.Constant)]
+        elif isinstance(node, ast.Import):
+            names.extend(alias.asname or alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            if node.level > 0:
+                base = package.rsplit(".", node.level - 1)[0] if node.level > 1 else package
+                source = f"{base}.{node.module}" if node.module else base
+            else:
+                source = node.module
+            for alias in node.names:
+                if alias.name == "*":
+                    if source.startswith("spikeinterface."):
+                        names.extend(_exported_names(source, visited))
+                else:
+                    names.append(alias.asname or alias.name)
+
+    if explicit_all is not None:
+        return explicit_all
+    return [name for name in names if not name.startswith("_")]
+
+
+def _get_lazy_index():
+    global _lazy_index
+    if _lazy_index is None:
+        _lazy_index = {}
+        for submodule in _submodules:
+            for name in _exported_names(f"spikeinterface.{submodule}", set()):
+                _lazy_index[name] = submodule
+    return _lazy_index
+
+
+def _import_all():
+    public = {}
+    for submodule in _submodules:
+        module = importlib.import_module(f"spikeinterface.{submodule}")
+        names = getattr(module, "__all__", None)
+        if names is None:
+            names = [name for name in dir(module) if not name.startswith("_")]
+        for name in names:
+            public[name] = getattr(module, name)
+    return public
+
+
+def __getattr__(name):
+    if name == "__all__":
+        public = _import_all()
+        _this_module.__dict__.update(public)
+        return list(public.keys())
+
+    # private and dunder names probed by introspection (inspect, doctest, debuggers) must not import everything
+    if name.startswith("_"):
+        raise AttributeError(f"module 'spikeinterface.full' has no attribute '{name}'")
+
+    submodule = _get_lazy_index().get(name, None)
+    if submodule is not None:
+        module = importlib.import_module(f"spikeinterface.{submodule}")
+        if hasattr(module, name):
+            value = getattr(module, name)
+            setattr(_this_module, name, value)
+            return value
+
+    # names created dynamically are not seen by the source parsing
+    public = _import_all()
+    if name in public:
+        setattr(_this_module, name, public[name])
+        return public[name]
+    raise AttributeError(f"module 'spikeinterface.full' has no attribute '{name}'")
+
+
+def __dir__():
+    return sorted(set(_this_module.__dict__.keys()) | set(_get_lazy_index().keys()))
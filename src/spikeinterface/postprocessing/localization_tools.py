@@ -1,6 +1,10 @@
 from __future__ import annotations
 
 import warnings
+import hashlib
+import json
+from collections import OrderedDict
+from pathlib import Path
 
 import numpy as np
 
@@ -49,8 +53,9 @@ def compute_monopolar_triangulation(
         A SortingAnalyzer or Templates object
     unit_ids: str | int | None
         A list of unit_id to restrci the computation
-    method : "least_square" | "minimize_with_log_penality", default: "least_square"
-       The optimizer to use
+    optimizer : "least_square" | "minimize_with_log_penality" | "batched_lm", default: "least_square"
+       The optimizer to use. "batched_lm" solves the same least square problem as "least_square" but
+       for all units at once with a vectorized Levenberg-Marquardt (see solve_monopolar_triangulation_batched())
     radius_um : float, default: 75
         For channel sparsity
     max_distance_um : float, default: 1000
@@ -71,7 +76,7 @@ def compute_monopolar_triangulation(
         3d or 4d, x, y, z, alpha
         alpha is the amplitude at source estimation
     """
-    assert optimizer in ("least_square", "minimize_with_log_penality")
+    assert optimizer in ("least_square", "minimize_with_log_penality", "batched_lm")
 
     assert feature in ["ptp", "energy", "peak_voltage"], f"{feature} is not a valid feature"
 
@@ -98,6 +103,13 @@ def compute_monopolar_triangulation(
         enforce_decrease_radial_parents = make_radial_order_parents(contact_locations, neighbours_mask)
         best_channels = get_template_extremum_channel(sorting_analyzer_or_templates, outputs="index")
 
+    if optimizer == "batched_lm":
+        # all units are solved at once: channels are padded to the largest neighborhood and masked
+        max_num_chans = max(sparsity.unit_id_to_channel_indices[unit_id].size for unit_id in unit_ids)
+        all_wf_data = np.zeros((unit_ids.size, max_num_chans), dtype="float64")
+        all_contact_locations = np.zeros((unit_ids.size, max_num_chans, 2), dtype="float64")
+        channel_mask = np.zeros((unit_ids.size, max_num_chans), dtype=bool)
+
     unit_location = np.zeros((unit_ids.size, 4), dtype="float64")
     for i, unit_id in enumerate(unit_ids):
         chan_inds = sparsity.unit_id_to_channel_indices[unit_id]
@@ -117,7 +129,20 @@ def compute_monopolar_triangulation(
         #        wf_data, best_channels[unit_id], enforce_decrease_radial_parents, in_place=True
         #    )
 
-        unit_location[i] = solve_monopolar_triangulation(wf_data, local_contact_locations, max_distance_um, optimizer)
+        if optimizer == "batched_lm":
+            num_chans = chan_inds.size
+            all_wf_data[i, :num_chans] = wf_data
+            all_contact_locations[i, :num_chans] = local_contact_locations
+            channel_mask[i, :num_chans] = True
+        else:
+            unit_location[i] = solve_monopolar_triangulation(
+                wf_data, local_contact_locations, max_distance_um, optimizer
+            )
+
+    if optimizer == "batched_lm":
+        unit_location[:] = solve_monopolar_triangulation_batched(
+            all_wf_data, all_contact_locations, max_distance_um, channel_mask=channel_mask
+        )
 
     if not return_alpha:
         unit_location = unit_location[:, :3]
@@ -267,29 +292,22 @@ def compute_grid_convolution(
 
     prototype = prototype[:, np.newaxis]
 
-    template_positions, weights, nearest_template_mask, z_factors = get_grid_convolution_templates_and_weights(
+    template_positions, sparse_weights, z_factors = get_grid_convolution_sparse_weights(
         contact_locations, radius_um, upsampling_um, margin_um, weight_method
     )
 
     peak_channels = get_template_extremum_channel(sorting_analyzer_or_templates, peak_sign, outputs="index")
 
-    weights_sparsity_mask = weights > 0
-
-    nb_weights = weights.shape[0]
     unit_location = np.zeros((unit_ids.size, 3), dtype="float64")
 
     for i, unit_id in enumerate(unit_ids):
         main_chan = peak_channels[unit_id]
         wf = templates[i, :, :]
-        nearest_mask = nearest_template_mask[main_chan, :]
-        channel_mask = np.sum(weights_sparsity_mask[:, :, nearest_mask], axis=(0, 2)) > 0
-        num_templates = np.sum(nearest_mask)
-        sub_w = weights[:, channel_mask, :][:, :, nearest_mask]
-        global_products = (wf[:, channel_mask] * prototype).sum(axis=0)
+        chan_inds = sparse_weights["channel_indices"][main_chan]
+        sub_w = sparse_weights["weights"][main_chan]
+        global_products = (wf[:, chan_inds] * prototype).sum(axis=0)
 
-        dot_products = np.zeros((nb_weights, num_templates), dtype=np.float32)
-        for count in range(nb_weights):
-            dot_products[count] = np.dot(global_products, sub_w[count])
+        dot_products = np.matmul(global_products, sub_w).astype(np.float32)
 
         mask = dot_products < 0
         if percentile > 0:
@@ -303,9 +321,8 @@ def compute_grid_convolution(
             dot_products[dot_products < thresholds] = 0
         dot_products[mask] = 0
 
-        nearest_templates = template_positions[nearest_mask]
-        for count in range(nb_weights):
-            unit_location[i, :2] += np.dot(dot_products[count], nearest_templates)
+        nearest_templates = template_positions[sparse_weights["template_indices"][main_chan]]
+        unit_location[i, :2] = np.dot(dot_products.sum(axis=0), nearest_templates)
 
         scalar_products = dot_products.sum(1)
         unit_location[i, 2] = np.dot(z_factors, scalar_products)
@@ -411,6 +428,166 @@ def estimate_distance_error_with_log(vec, wf_data, local_contact_locations, max_
     return err
 
 
+# ----
+# optimizer "batched_lm"
+
+
+def make_initial_guess_and_bounds_batched(wf_data, local_contact_locations, max_distance_um, initial_z=20):
+    """
+    Vectorized version of make_initial_guess_and_bounds() for several spikes at once.
+
+    Parameters
+    ----------
+    wf_data : np.array
+        The features with shape (num_spikes, num_channels). Padded (masked) channels must be 0.
+    local_contact_locations : np.array
+        The channel locations with shape (num_spikes, num_channels, 2)
+    max_distance_um : float
+        Boundary for x, y, z and alpha
+    initial_z : float, default: 20
+        The initial guess for z
+
+    Returns
+    -------
+    x0 : np.array
+        The initial guesses (x, y, z, alpha) with shape (num_spikes, 4)
+    lower_bounds, upper_bounds : np.array
+        The bounds with shape (num_spikes, 4)
+    """
+    num_spikes = wf_data.shape[0]
+    ind_max = np.argmax(wf_data, axis=1)
+    max_ptp = wf_data[np.arange(num_spikes), ind_max]
+    max_alpha = max_ptp * max_distance_um
+
+    # initial guess is the center of mass
+    with np.errstate(divide="ignore", invalid="ignore"):
+        com = np.sum(wf_data[:, :, np.newaxis] * local_contact_locations, axis=1) / np.sum(wf_data, axis=1)[:, None]
+    x0 = np.zeros((num_spikes, 4), dtype="float64")
+    x0[:, :2] = com
+    x0[:, 2] = initial_z
+    max_locations = local_contact_locations[np.arange(num_spikes), ind_max, :]
+    x0[:, 3] = np.sqrt(np.sum((com - max_locations) ** 2, axis=1) + initial_z**2) * max_ptp
+
+    # bounds depend on initial guess
+    lower_bounds = np.zeros((num_spikes, 4), dtype="float64")
+    lower_bounds[:, :2] = x0[:, :2] - max_distance_um
+    lower_bounds[:, 2] = 1
+    upper_bounds = np.zeros((num_spikes, 4), dtype="float64")
+    upper_bounds[:, :2] = x0[:, :2] + max_distance_um
+    upper_bounds[:, 2] = max_distance_um * 10
+    upper_bounds[:, 3] = max_alpha
+
+    return x0, lower_bounds, upper_bounds
+
+
+def estimate_distance_error_and_jacobian_batched(vecs, wf_data, local_contact_locations, channel_mask):
+    # vectorized estimate_distance_error() that also gives the jacobian with shape (num_spikes, num_channels, 4)
+    dx = vecs[:, np.newaxis, 0] - local_contact_locations[:, :, 0]
+    dy = vecs[:, np.newaxis, 1] - local_contact_locations[:, :, 1]
+    z = vecs[:, np.newaxis, 2]
+    alpha = vecs[:, np.newaxis, 3]
+    inv_dist = 1.0 / np.sqrt(dx**2 + dy**2 + z**2)
+
+    err = (wf_data - alpha * inv_dist) * channel_mask
+    factor = alpha * inv_dist**3 * channel_mask
+    jacobian = np.stack([factor * dx, factor * dy, factor * z, -inv_dist * channel_mask], axis=2)
+    return err, jacobian
+
+
+def solve_monopolar_triangulation_batched(
+    wf_data, local_contact_locations, max_distance_um, channel_mask=None, max_iterations=200, tolerance=1e-8
+):
+    """
+    Solve the monopolar triangulation for many spikes at once.
+
+    This minimizes the same cost as the "least_square" optimizer (see solve_monopolar_triangulation())
+    with the same initial guesses and bounds, but instead of calling scipy.optimize.least_squares() for
+    each spike, a projected Levenberg-Marquardt is run in a vectorized way over all spikes.
+    Each spike keeps its own damping factor and stops iterating when it has converged.
+
+    Parameters
+    ----------
+    wf_data : np.array
+        The features (ptp, energy, ...) with shape (num_spikes, num_channels)
+    local_contact_locations : np.array
+        The channel locations with shape (num_channels, 2) when shared by all spikes
+        or (num_spikes, num_channels, 2)
+    max_distance_um : float
+        Boundary for x, y, z and alpha
+    channel_mask : np.array | None, default: None
+        Boolean mask with shape (num_spikes, num_channels) to handle neighborhoods of different sizes.
+        Masked channels do not contribute to the cost. If None all channels are used.
+    max_iterations : int, default: 200
+        Maximum number of Levenberg-Marquardt iterations
+    tolerance : float, default: 1e-8
+        Relative tolerance on the cost and on the step to stop iterating
+
+    Returns
+    -------
+    locations : np.array
+        The x, y, z, alpha for each spike with shape (num_spikes, 4)
+    """
+    wf_data = np.asarray(wf_data, dtype="float64")
+    num_spikes, num_channels = wf_data.shape
+    if num_spikes == 0:
+        return np.zeros((0, 4), dtype="float64")
+
+    local_contact_locations = np.asarray(local_contact_locations, dtype="float64")
+    if local_contact_locations.ndim == 2:
+        local_contact_locations = np.broadcast_to(local_contact_locations, (num_spikes, num_channels, 2))
+    if channel_mask is None:
+        channel_mask = np.ones((num_spikes, num_channels), dtype="float64")
+    else:
+        channel_mask = np.asarray(channel_mask, dtype="float64")
+    wf_data = wf_data * channel_mask
+
+    x0, lower_bounds, upper_bounds = make_initial_guess_and_bounds_batched(
+        wf_data, local_contact_locations, max_distance_um
+    )
+    vecs = np.clip(x0, lower_bounds, upper_bounds)
+    err, jacobian = estimate_distance_error_and_jacobian_batched(vecs, wf_data, local_contact_locations, channel_mask)
+    cost = np.sum(err**2, axis=1)
+    damping = np.full(num_spikes, 1e-3)
+
+    # spikes with invalid data (no signal) are not optimized
+    valid = np.all(np.isfinite(vecs), axis=1) & np.isfinite(cost)
+    active = np.flatnonzero(valid)
+    diag_inds = np.arange(4)
+    for _ in range(max_iterations):
+        if active.size == 0:
+            break
+        J = jacobian[active]
+        JtJ = np.einsum("nci,ncj->nij", J, J)
+        Jte = np.einsum("nci,nc->ni", J, err[active])
+        JtJ[:, diag_inds, diag_inds] += damping[active, np.newaxis] * np.maximum(JtJ[:, diag_inds, diag_inds], 1e-12)
+        step = np.linalg.solve(JtJ, -Jte[:, :, np.newaxis])[:, :, 0]
+
+        new_vecs = np.clip(vecs[active] + step, lower_bounds[active], upper_bounds[active])
+        new_err, new_jacobian = estimate_distance_error_and_jacobian_batched(
+            new_vecs, wf_data[active], local_contact_locations[active], channel_mask[active]
+        )
+        new_cost = np.sum(new_err**2, axis=1)
+
+        old_cost = cost[active]
+        improved = new_cost < old_cost
+        accepted = active[improved]
+        actual_step = np.linalg.norm(new_vecs - vecs[active], axis=1)
+        vecs[accepted] = new_vecs[improved]
+        err[accepted] = new_err[improved]
+        jacobian[accepted] = new_jacobian[improved]
+        cost[accepted] = new_cost[improved]
+        damping[active] = np.where(improved, damping[active] / 10.0, damping[active] * 10.0)
+
+        converged = (improved & (old_cost - new_cost <= tolerance * old_cost)) | (
+            actual_step <= tolerance * (np.linalg.norm(vecs[active], axis=1) + tolerance)
+        )
+        converged |= damping[active] > 1e10
+        active = active[~converged]
+
+    vecs[~valid] = np.nan
+    return vecs
+
+
 # ---
 # waveform cleaning for localization. could be moved to another file
 
@@ -507,6 +684,21 @@ def enforce_decrease_shells_data(wf_data, maxchan, radial_parents, in_place=Fals
     return decreasing_data
 
 
+def enforce_decrease_shells_data_batched(wf_data, maxchan, radial_parents, in_place=False):
+    """Radial enforce decrease for several spikes sharing the same maxchan
+
+    wf_data has shape (num_spikes, num_channels). This gives the same result as
+    enforce_decrease_shells_data() applied on every spike.
+    """
+    decreasing_data = wf_data if in_place else wf_data.copy()
+
+    for c, parents_rel in radial_parents[maxchan]:
+        parents_max = decreasing_data[:, parents_rel].max(axis=1)
+        np.minimum(decreasing_data[:, c], parents_max, out=decreasing_data[:, c])
+
+    return decreasing_data
+
+
 def get_grid_convolution_templates_and_weights(
     contact_locations, radius_um=40, upsampling_um=5, margin_um=50, weight_method={"mode": "exponential_3d"}
 ):
@@ -570,6 +762,114 @@ def get_grid_convolution_templates_and_weights(
     return template_positions, weights, nearest_template_mask, z_factors
 
 
+# LRU of the weights computed in this process, keyed by a hash of the geometry and the parameters
+_grid_convolution_sparse_weights_cache = OrderedDict()
+_grid_convolution_sparse_weights_cache_size = 4
+
+
+def get_grid_convolution_sparse_weights(
+    contact_locations,
+    radius_um=40,
+    upsampling_um=5,
+    margin_um=50,
+    weight_method={"mode": "exponential_3d"},
+    cache_folder=None,
+):
+    """Get the grid of artificial templates with weights stored sparsely per channel neighborhood
+
+    The dense weights given by get_grid_convolution_templates_and_weights() have shape
+    (nb_weights, num_channels, num_templates) but, for a given main channel, only the templates
+    close to this channel (nearest_template_mask) and the channels having non zero weights for
+    these templates are used. This precomputes these sub blocks once for every channel, so that
+    localization is a batched dense product on a small block.
+
+    The result only depends on the probe geometry and the parameters: the last ones are kept in memory and,
+    if cache_folder is given, saved on disk so they can be reused across runs. The returned arrays are shared
+    and read-only.
+
+    Parameters
+    ----------
+    contact_locations: array
+        The positions of the channels
+    radius_um: float
+        Radius in um for channel sparsity.
+    upsampling_um: float
+        Upsampling resolution for the grid of templates
+    margin_um: float
+        The margin for the grid of fake templates
+    weight_method: dict
+        Parameter that should be provided to the get_convolution_weights() function
+    cache_folder: str | Path | None, default: None
+        Folder to load/save the precomputed weights. If None, weights are only cached in memory.
+
+    Returns
+    -------
+    template_positions: array
+        The positions of the upsampled templates
+    sparse_weights: dict
+        With keys "channel_indices", "template_indices" and "weights", each one a list (one item per
+        main channel) of the channels used, the nearby templates and the weights sub block with shape
+        (nb_weights, num_local_channels, num_local_templates)
+    z_factors: array
+        The z_factors that have been used to generate the weights along the third dimension
+    """
+    contact_locations = np.asarray(contact_locations, dtype="float64")
+    params = dict(radius_um=radius_um, upsampling_um=upsampling_um, margin_um=margin_um, weight_method=weight_method)
+    hasher = hashlib.sha1(contact_locations.tobytes())
+    hasher.update(json.dumps(params, sort_keys=True, default=str).encode())
+    key = hasher.hexdigest()
+
+    if key in _grid_convolution_sparse_weights_cache:
+        _grid_convolution_sparse_weights_cache.move_to_end(key)
+        return _grid_convolution_sparse_weights_cache[key]
+
+    cache_file = None
+    if cache_folder is not None:
+        cache_folder = Path(cache_folder)
+        cache_file = cache_folder / f"grid_convolution_weights_{key}.npz"
+
+    if cache_file is not None and cache_file.exists():
+        with np.load(cache_file) as data:
+            num_channels = contact_locations.shape[0]
+            template_positions = data["template_positions"]
+            z_factors = data["z_factors"]
+            sparse_weights = dict(
+                channel_indices=[data[f"channel_indices_{c}"] for c in range(num_channels)],
+                template_indices=[data[f"template_indices_{c}"] for c in range(num_channels)],
+                weights=[data[f"weights_{c}"] for c in range(num_channels)],
+            )
+    else:
+        template_positions, weights, nearest_template_mask, z_factors = get_grid_convolution_templates_and_weights(
+            contact_locations, radius_um, upsampling_um, margin_um, weight_method
+        )
+        weights_sparsity_mask = weights > 0
+        sparse_weights = dict(channel_indices=[], template_indices=[], weights=[])
+        for main_chan in range(contact_locations.shape[0]):
+            nearest_mask = nearest_template_mask[main_chan, :]
+            channel_mask = np.sum(weights_sparsity_mask[:, :, nearest_mask], axis=(0, 2)) > 0
+            sparse_weights["channel_indices"].append(np.flatnonzero(channel_mask))
+            sparse_weights["template_indices"].append(np.flatnonzero(nearest_mask))
+            sparse_weights["weights"].append(weights[:, channel_mask, :][:, :, nearest_mask])
+
+        if cache_file is not None:
+            cache_folder.mkdir(parents=True, exist_ok=True)
+            to_save = dict(template_positions=template_positions, z_factors=np.asarray(z_factors))
+            for name in ("channel_indices", "template_indices", "weights"):
+                for c, arr in enumerate(sparse_weights[name]):
+                    to_save[f"{name}_{c}"] = arr
+            np.savez(cache_file, **to_save)
+
+    z_factors = np.array(z_factors)
+    for arr in [template_positions, z_factors] + [arr for arrays in sparse_weights.values() for arr in arrays]:
+        arr.flags.writeable = False
+
+    result = (template_positions, sparse_weights, z_factors)
+    _grid_convolution_sparse_weights_cache[key] = result
+    while len(_grid_convolution_sparse_weights_cache) > _grid_convolution_sparse_weights_cache_size:
+        _grid_convolution_sparse_weights_cache.popitem(last=False)
+    return result
+
+
 def get_convolution_weights(
     distances,
     z_list_um=np.linspace(0, 120.0, 5),
@@ -3,7 +3,7 @@ from .preprocessinglist import *
 from .motion import correct_motion, load_motion_info, save_motion_info, get_motion_parameters_preset, get_motion_presets
 
 from .preprocessing_tools import get_spatial_interpolation_kernel
-from .detect_bad_channels import detect_bad_channels
+from .detect_bad_channels import detect_bad_channels, detect_bad_channels_over_time
 from .correct_lsb import correct_lsb
 
 
@@ -4,6 +4,7 @@ import numpy as np
 
 from ..core.core_tools import define_function_from_class
 from .basepreprocessor import BasePreprocessor, BasePreprocessorSegment
+from .elementwise import ElementwisePreprocessorSegment, get_cast_ops, OP_RINT
 from .filter import fix_dtype
 
 
@@ -59,7 +60,7 @@ class AstypeRecording(BasePreprocessor):
         )
 
 
-class AstypeRecordingSegment(BasePreprocessorSegment):
+class AstypeRecordingSegment(ElementwisePreprocessorSegment):
     def __init__(
         self,
         parent_recording_segment,
@@ -70,14 +71,16 @@ class AstypeRecordingSegment(BasePreprocessorSegment):
         self.dtype = dtype
         self.round = round
 
-    def get_traces(self, start_frame, end_frame, channel_indices):
-        if channel_indices is None:
-            channel_indices = slice(None)
-        traces = self.parent_recording_segment.get_traces(start_frame, end_frame, channel_indices)
+    def apply_elementwise(self, traces, channel_indices):
         if self.round:
             np.round(traces, out=traces)
         return traces.astype(self.dtype, copy=False)
 
+    def get_elementwise_ops(self, channel_indices, input_dtype):
+        ops = [(OP_RINT, 0.0, 0.0)] if self.round else []
+        ops += get_cast_ops(np.dtype(self.dtype))
+        return ops, np.dtype(self.dtype)
+
 
 # function for API
 astype = define_function_from_class(source_class=AstypeRecording, name="astype")
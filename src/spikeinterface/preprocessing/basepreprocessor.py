@@ -26,6 +26,18 @@ class BasePreprocessor(BaseRecording):
 
         # self._kwargs have to be handled in subclass
 
+    def get_storage_chunk_size(self):
+        # the storage chunks of the parent stay aligned when the frames are not changed
+        parent = self._parent_recording
+        if self.get_sampling_frequency() != parent.get_sampling_frequency():
+            return None
+        if self.get_num_segments() != parent.get_num_segments():
+            return None
+        for segment_index in range(self.get_num_segments()):
+            if self.get_num_samples(segment_index) != parent.get_num_samples(segment_index):
+                return None
+        return parent.get_storage_chunk_size()
+
 
 class BasePreprocessorSegment(BaseRecordingSegment):
     def __init__(self, parent_recording_segment):
@@ -4,6 +4,7 @@ import numpy as np
 
 from spikeinterface.core.core_tools import define_function_from_class
 from .basepreprocessor import BasePreprocessor, BasePreprocessorSegment
+from .elementwise import ElementwisePreprocessorSegment, get_cast_ops, OP_CLIP_MIN, OP_CLIP_MAX
 
 from ..core import get_random_data_chunks
 
@@ -148,7 +149,7 @@ class BlankSaturationRecording(BasePreprocessor):
         )
 
 
-class ClipRecordingSegment(BasePreprocessorSegment):
+class ClipRecordingSegment(ElementwisePreprocessorSegment):
     def __init__(self, parent_recording_segment, a_min, value_min, a_max, value_max):
         BasePreprocessorSegment.__init__(self, parent_recording_segment)
 
@@ -157,8 +158,7 @@ class ClipRecordingSegment(BasePreprocessorSegment):
         self.a_max = a_max
         self.value_max = value_max
 
-    def get_traces(self, start_frame, end_frame, channel_indices):
-        traces = self.parent_recording_segment.get_traces(start_frame, end_frame, channel_indices)
+    def apply_elementwise(self, traces, channel_indices):
         traces = traces.copy()
 
         if self.a_min is not None:
@@ -168,6 +168,18 @@ class ClipRecordingSegment(BasePreprocessorSegment):
 
         return traces
 
+    def get_elementwise_ops(self, channel_indices, input_dtype):
+        ops = []
+        clips = [(OP_CLIP_MIN, self.a_min, self.value_min), (OP_CLIP_MAX, self.a_max, self.value_max)]
+        for op, threshold, value in clips:
+            if threshold is None:
+                continue
+            # the comparison is done in the dtype numpy would use to compare the traces with the threshold
+            compare_dtype = np.result_type(input_dtype, threshold)
+            threshold = float(np.asarray(threshold).astype(compare_dtype))
+            ops += [(op, threshold, float(value))] + get_cast_ops(input_dtype)
+        return ops, input_dtype
+
 
 clip = define_function_from_class(source_class=ClipRecording, name="clip")
 blank_staturation = define_function_from_class(source_class=BlankSaturationRecording, name="blank_staturation")
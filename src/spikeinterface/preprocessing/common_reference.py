@@ -2,6 +2,13 @@ from __future__ import annotations
 import numpy as np
 from typing import Optional, Literal
 
+try:
+    import numba
+
+    HAVE_NUMBA = True
+except ModuleNotFoundError as err:
+    HAVE_NUMBA = False
+
 from spikeinterface.core.core_tools import define_function_from_class
 
 from .basepreprocessor import BasePreprocessor, BasePreprocessorSegment
@@ -176,13 +183,32 @@ class CommonReferenceRecordingSegment(BasePreprocessorSegment):
         self.dtype = dtype
         self.operator_func = operator = np.mean if self.operator == "average" else np.median
 
+        if self.neighbors is not None:
+            # channels are grouped by number of neighbors so that each group is a dense (channels, neighbors) array
+            num_neighbors = np.array([len(self.neighbors[i]) for i in range(len(self.neighbors))])
+            self.neighbor_groups = []
+            for n in np.unique(num_neighbors):
+                (group_channels,) = np.nonzero(num_neighbors == n)
+                neighbor_inds = np.stack([self.neighbors[i] for i in group_channels])
+                self.neighbor_groups.append((group_channels, neighbor_inds))
+
     def get_traces(self, start_frame, end_frame, channel_indices):
         # Let's do the case with group_indices equal None as that is easy
         if self.group_indices is None:
             # We need all the channels to calculate the reference
             traces = self.parent_recording_segment.get_traces(start_frame, end_frame, slice(None))
 
-            if self.reference == "global":
+            if self.reference == "global" and self.operator == "median":
+                # fast path: partition based median of a working copy and inplace subtraction in float32
+                work_dtype = _get_work_dtype(traces.dtype)
+                if self.ref_channel_indices is None:
+                    work = traces.copy()
+                else:
+                    work = traces[:, self.ref_channel_indices]
+                shift = _inplace_median(work, work_dtype)
+                re_referenced_traces = np.array(traces[:, channel_indices], dtype=work_dtype)
+                re_referenced_traces -= shift[:, np.newaxis]
+            elif self.reference == "global":
                 if self.ref_channel_indices is None:
                     shift = self.operator_func(traces, axis=1, keepdims=True)
                 else:
@@ -193,12 +219,7 @@ class CommonReferenceRecordingSegment(BasePreprocessorSegment):
                 shift = traces[:, self.ref_channel_indices]
                 re_referenced_traces = traces[:, channel_indices] - shift
             else:  # then it must be local
-                channel_indices_array = np.arange(traces.shape[1])[channel_indices]
-                re_referenced_traces = np.zeros((traces.shape[0], len(channel_indices_array)), dtype="float32")
-                for i, channel_index in enumerate(channel_indices_array):
-                    channel_neighborhood = self.neighbors[channel_index]
-                    channel_shift = self.operator_func(traces[:, channel_neighborhood], axis=1)
-                    re_referenced_traces[:, i] = traces[:, channel_index] - channel_shift
+                re_referenced_traces = self._get_local_referenced_traces(traces, channel_indices)
 
             return re_referenced_traces.astype(self.dtype, copy=False)
 
@@ -211,7 +232,9 @@ class CommonReferenceRecordingSegment(BasePreprocessorSegment):
             if channel_indices is not None:
                 sliced_channel_indices = sliced_channel_indices[channel_indices]
 
-            re_referenced_traces = np.zeros((traces.shape[0], sliced_channel_indices.size))
+            re_referenced_traces = np.zeros(
+                (traces.shape[0], sliced_channel_indices.size), dtype=_get_work_dtype(traces.dtype)
+            )
             for group_index, selected_indices_in_group, all_group_indices in self.slice_groups(sliced_channel_indices):
                 (out_indices,) = np.nonzero(np.isin(sliced_channel_indices, selected_indices_in_group))
                 in_group_traces = traces[:, selected_indices_in_group]
@@ -228,6 +251,44 @@ class CommonReferenceRecordingSegment(BasePreprocessorSegment):
 
             return re_referenced_traces.astype(self.dtype, copy=False)
 
+    def _get_local_referenced_traces(self, traces, channel_indices):
+        channel_indices_array = np.arange(traces.shape[1])[channel_indices]
+        num_samples = traces.shape[0]
+        work_dtype = _get_work_dtype(traces.dtype)
+        re_referenced_traces = np.zeros((num_samples, channel_indices_array.size), dtype=work_dtype)
+
+        for group_channels, neighbor_inds in self.neighbor_groups:
+            mask = np.isin(channel_indices_array, group_channels)
+            if not np.any(mask):
+                continue
+            (out_indices,) = np.nonzero(mask)
+            rows = np.searchsorted(group_channels, channel_indices_array[out_indices])
+            neighbor_inds_sel = neighbor_inds[rows]
+
+            if HAVE_NUMBA and self.operator == "median":
+                _local_median_reference_numba(
+                    traces,
+                    channel_indices_array[out_indices],
+                    neighbor_inds_sel,
+                    out_indices,
+                    work_dtype.type(0),
+                    re_referenced_traces,
+                )
+                continue
+
+            # the (samples, channels, neighbors) gathered array is processed by blocks of samples to bound memory
+            step = max(1, _local_reference_block_size // neighbor_inds_sel.size)
+            for i0 in range(0, num_samples, step):
+                i1 = min(i0 + step, num_samples)
+                gathered = traces[i0:i1][:, neighbor_inds_sel]
+                if self.operator == "median":
+                    shift = _inplace_median(gathered, work_dtype)
+                else:
+                    shift = np.mean(gathered, axis=2, dtype=work_dtype)
+                re_referenced_traces[i0:i1, out_indices] = traces[i0:i1, channel_indices_array[out_indices]] - shift
+
+        return re_referenced_traces
+
     def slice_groups(self, channel_indices):
         """
         Slice the channel indices into groups. This is used to apply the common reference to groups of channels.
@@ -260,3 +321,55 @@ class CommonReferenceRecordingSegment(BasePreprocessorSegment):
 
 
 common_reference = define_function_from_class(source_class=CommonReferenceRecording, name="common_reference")
+
+
+# number of gathered items (samples x channels x neighbors) processed at once by the local reference
+_local_reference_block_size = 2**22
+
+
+def _get_work_dtype(dtype):
+    return np.dtype("float64") if np.dtype(dtype) == np.float64 else np.dtype("float32")
+
+
+def _inplace_median(arr, dtype):
+    """
+    Median along the last axis with a partition of `arr`, which is modified inplace.
+    Same result as np.median() but without an internal copy of the array.
+    """
+    n = arr.shape[-1]
+    half = n // 2
+    if n % 2 == 1:
+        arr.partition(half, axis=-1)
+        return arr[..., half].astype(dtype)
+    arr.partition([half - 1, half], axis=-1)
+    return (arr[..., half - 1].astype(dtype) + arr[..., half].astype(dtype)) / dtype.type(2)
+
+
+if HAVE_NUMBA:
+
+    @numba.jit(nopython=True, nogil=True, cache=False)
+    def _local_median_reference_numba(traces, channel_inds, neighbor_inds, out_indices, zero, out):
+        num_samples = traces.shape[0]
+        num_channels, num_neighbors = neighbor_inds.shape
+        half = num_neighbors // 2
+        low = half if num_neighbors % 2 == 1 else half - 1
+        # only the smallest half + 1 values are needed for the median
+        capacity = half + 1
+        smallest = np.zeros((capacity, num_channels), dtype=np.asarray(zero).dtype)
+        values = np.zeros(num_channels, dtype=np.asarray(zero).dtype)
+        for i in range(num_samples):
+            # branchless insertion of each neighbor, vectorized on channels
+            for k in range(num_neighbors):
+                for j in range(num_channels):
+                    values[j] = traces[i, neighbor_inds[j, k]]
+                for p in range(min(k, capacity)):
+                    for j in range(num_channels):
+                        a = smallest[p, j]
+                        smallest[p, j] = min(a, values[j])
+                        values[j] = max(a, values[j])
+                if k < capacity:
+                    for j in range(num_channels):
+                        smallest[k, j] = values[j]
+            for j in range(num_channels):
+                shift = (smallest[low, j] + smallest[half, j]) / 2
+                out[i, out_indices[j]] = traces[i, channel_inds[j]] - shift
@@ -6,6 +6,11 @@ from typing import Literal
 
 from .filter import highpass_filter
 from ..core import get_random_data_chunks, order_channels_by_depth, BaseRecording
+from ..core.job_tools import (
+    ChunkRecordingExecutor,
+    divide_segment_into_chunks,
+    fix_job_kwargs,
+)
 
 
 def detect_bad_channels(
@@ -27,6 +32,7 @@ def detect_bad_channels(
     neighborhood_r2_threshold: float = 0.9,
     neighborhood_r2_radius_um: float = 30.0,
     seed: int | None = None,
+    **job_kwargs,
 ):
     """
     Perform bad channel detection.
@@ -95,6 +101,8 @@ def detect_bad_channels(
         Spatial radius below which two channels are considered neighbors in the neighborhood_r2 method.
     seed : int or None, default: None
         The random seed to extract chunks
+    **job_kwargs : keyword arguments for parallel processing:
+        If given, the random chunks are read in parallel (see `get_random_data_chunks()`)
 
     Returns
     -------
@@ -148,7 +156,7 @@ def detect_bad_channels(
         random_chunk_kwargs["return_scaled"] = False
         random_chunk_kwargs["concatenated"] = False
 
-    random_data = get_random_data_chunks(recording_hp, **random_chunk_kwargs)
+    random_data = get_random_data_chunks(recording_hp, **random_chunk_kwargs, **job_kwargs)
 
     channel_labels = np.zeros(recording.get_num_channels(), dtype="U5")
     channel_labels[:] = "good"
@@ -183,24 +191,21 @@ def detect_bad_channels(
             order_f = None
             order_r = None
 
-        # Create empty channel labels and fill with bad-channel detection estimate for each chunk
-        chunk_channel_labels = np.zeros((recording.get_num_channels(), len(random_data)), dtype=np.int8)
-
-        for i, random_chunk in enumerate(random_data):
-            random_chunk_sorted = random_chunk[:, order_f] if order_f is not None else random_chunk
-            chunk_labels = detect_bad_channels_ibl(
-                raw=random_chunk_sorted,
-                fs=recording.sampling_frequency,
-                psd_hf_threshold=psd_hf_threshold,
-                dead_channel_thr=dead_channel_threshold,
-                noisy_channel_thr=noisy_channel_threshold,
-                outside_channel_thr=outside_channel_threshold,
-                n_neighbors=n_neighbors,
-                nyquist_threshold=nyquist_threshold,
-                welch_window_ms=welch_window_ms,
-                outside_channels_location=outside_channels_location,
-            )
-            chunk_channel_labels[:, i] = chunk_labels[order_r] if order_r is not None else chunk_labels
+        # Fill channel labels with bad-channel detection estimate for each chunk (chunks have the same length
+        # and their features are computed by batch)
+        ibl_kwargs = dict(
+            psd_hf_threshold=psd_hf_threshold,
+            dead_channel_thr=dead_channel_threshold,
+            noisy_channel_thr=noisy_channel_threshold,
+            outside_channel_thr=outside_channel_threshold,
+            n_neighbors=n_neighbors,
+            nyquist_threshold=nyquist_threshold,
+            welch_window_ms=welch_window_ms,
+            outside_channels_location=outside_channels_location,
+        )
+        chunk_channel_labels = _detect_bad_channels_ibl_chunks(
+            random_data, recording.sampling_frequency, order_f, order_r, ibl_kwargs
+        ).T
 
         # Take the mode of the chunk estimates as final result. Convert to binary good / bad channel output.
         mode_channel_labels, _ = scipy.stats.mode(chunk_channel_labels, axis=1, keepdims=False)
@@ -269,6 +274,225 @@ def detect_bad_channels(
     return bad_channel_ids, channel_labels
 
 
+def detect_bad_channels_over_time(
+    recording: BaseRecording,
+    window_duration_s: float = 10.0,
+    chunk_duration_s: float = 0.3,
+    num_chunks_per_window: int | None = None,
+    psd_hf_threshold: float = 0.02,
+    dead_channel_threshold: float = -0.5,
+    noisy_channel_threshold: float = 1.0,
+    outside_channel_threshold: float = -0.75,
+    outside_channels_location: Literal["top", "bottom", "both"] = "top",
+    n_neighbors: int = 11,
+    nyquist_threshold: float = 0.8,
+    welch_window_ms: float = 10.0,
+    highpass_filter_cutoff: float = 300,
+    **job_kwargs,
+):
+    """
+    Time resolved "coherence+psd" bad channel detection over the full recording.
+
+    Contrary to `detect_bad_channels()`, which labels channels once from random chunks, the recording is
+    divided into consecutive windows of `window_duration_s` that are processed in parallel. In each window,
+    the traces are cut in chunks of `chunk_duration_s`, the high frequency PSD and the similarity to the median
+    reference are computed on all chunks at once and each channel gets the most frequent chunk label.
+    This catches channels that are bad only during a part of the recording. The output can be given to
+    `interpolate_bad_channels(recording, bad_channel_masks=..., window_frames=...)`.
+
+    The recording is assumed to be filtered. If not, a highpass filter is applied on the fly.
+
+    Parameters
+    ----------
+    recording : BaseRecording
+        The recording for which bad channels are detected
+    window_duration_s : float, default: 10.0
+        Duration of the windows in which channels are labeled
+    chunk_duration_s : float, default: 0.3
+        Duration of the chunks that vote for the label of the window
+    num_chunks_per_window : int or None, default: None
+        If None, all the chunks of the window are used. Otherwise only `num_chunks_per_window` evenly spaced
+        chunks are read, which analyses a strided subset of the recording
+    psd_hf_threshold : float, default: 0.02
+        An absolute threshold (uV^2/Hz) used as a cutoff for noise channels.
+    dead_channel_threshold : float, default: -0.5
+        Threshold for channel coherence below which channels are labeled as dead
+    noisy_channel_threshold : float, default: 1
+        Threshold for channel coherence above which channels are labeled as noisy (together with psd condition)
+    outside_channel_threshold : float, default: -0.75
+        Threshold for channel coherence above which channels at the edge of the recording are marked as outside
+        of the brain
+    outside_channels_location : "top" | "bottom" | "both", default: "top"
+        Location of the outside channels (see `detect_bad_channels()`)
+    n_neighbors : int, default: 11
+        Number of channel neighbors to compute median filter (needs to be odd)
+    nyquist_threshold : float, default: 0.8
+        Frequency with respect to Nyquist (Fn=1) above which the mean of the PSD is calculated and compared
+        with psd_hf_threshold
+    welch_window_ms : float, default: 10
+        Window size for the scipy.signal.welch that will be converted to nperseg
+    highpass_filter_cutoff : float, default: 300
+        If the recording is not filtered, the cutoff frequency of the highpass filter
+    **job_kwargs : keyword arguments for parallel processing:
+        The windows are processed in parallel ("n_jobs", "mp_context", "max_threads_per_process", "progress_bar")
+
+    Returns
+    -------
+    bad_channel_masks : list of np.array
+        For each segment, a boolean array (num_windows, num_channels) that is True for bad channels
+    channel_labels : list of np.array of str
+        For each segment, the labels (num_windows, num_channels): good/dead/noise/out
+    window_frames : list of np.array
+        For each segment, the (num_windows, 2) start and end frames of the windows
+    """
+    assert recording.has_scaleable_traces(), (
+        "The 'coherence+psd' method uses thresholds assuming the traces are in uV, "
+        "but the recording does not have scaled traces. If the recording is already scaled, "
+        "you need to set gains and offsets: "
+        ">>> recording.set_channel_gains(1); recording.set_channel_offsets(0)"
+    )
+    assert 0 < nyquist_threshold < 1, "nyquist_threshold must be between 0 and 1"
+    assert window_duration_s >= chunk_duration_s, "window_duration_s must be larger than chunk_duration_s"
+
+    if not recording.is_filtered():
+        recording_hp = highpass_filter(recording, freq_min=highpass_filter_cutoff)
+    else:
+        recording_hp = recording
+
+    order_f, order_r = order_channels_by_depth(recording=recording, dimensions=("x", "y"))
+    if np.all(np.diff(order_f) == 1):
+        order_f = None
+        order_r = None
+
+    window_size = int(window_duration_s * recording.sampling_frequency)
+    chunk_size = int(chunk_duration_s * recording.sampling_frequency)
+    window_frames = []
+    recording_slices = []
+    for segment_index in range(recording.get_num_segments()):
+        frames = divide_segment_into_chunks(recording.get_num_samples(segment_index), window_size)
+        if len(frames) > 1 and frames[-1][1] - frames[-1][0] < chunk_size:
+            # a last window shorter than a chunk is merged with the previous one
+            frames = frames[:-2] + [(frames[-2][0], frames[-1][1])]
+        window_frames.append(np.array(frames, dtype="int64").reshape(-1, 2))
+        recording_slices.extend((segment_index, start_frame, end_frame) for start_frame, end_frame in frames)
+
+    ibl_kwargs = dict(
+        psd_hf_threshold=psd_hf_threshold,
+        dead_channel_thr=dead_channel_threshold,
+        noisy_channel_thr=noisy_channel_threshold,
+        outside_channel_thr=outside_channel_threshold,
+        n_neighbors=n_neighbors,
+        nyquist_threshold=nyquist_threshold,
+        welch_window_ms=welch_window_ms,
+        outside_channels_location=outside_channels_location,
+    )
+    job_kwargs = fix_job_kwargs(job_kwargs)
+    # the chunks are the windows, the chunking keys are not used
+    executor_keys = ("n_jobs", "mp_context", "max_threads_per_process", "progress_bar")
+    executor_kwargs = {k: job_kwargs[k] for k in executor_keys if k in job_kwargs}
+    init_args = (recording_hp, chunk_size, num_chunks_per_window, order_f, order_r, ibl_kwargs)
+    executor = ChunkRecordingExecutor(
+        recording_hp,
+        _detect_bad_channels_window,
+        _init_detect_bad_channels_worker,
+        init_args,
+        handle_returns=True,
+        job_name="detect_bad_channels_over_time",
+        chunk_size=window_size,
+        **executor_kwargs,
+    )
+    window_labels = executor.run(recording_slices=recording_slices)
+
+    label_names = np.array(["good", "dead", "noise", "out"])
+    bad_channel_masks = []
+    channel_labels = []
+    i = 0
+    for frames in window_frames:
+        segment_labels = np.array(window_labels[i : i + frames.shape[0]]).reshape(-1, recording.get_num_channels())
+        i += frames.shape[0]
+        bad_channel_masks.append(segment_labels != 0)
+        channel_labels.append(label_names[segment_labels])
+
+    return bad_channel_masks, channel_labels, window_frames
+
+
+def _init_detect_bad_channels_worker(recording, chunk_size, num_chunks_per_window, order_f, order_r, ibl_kwargs):
+    worker_ctx = {}
+    worker_ctx["recording"] = recording
+    worker_ctx["chunk_size"] = chunk_size
+    worker_ctx["num_chunks_per_window"] = num_chunks_per_window
+    worker_ctx["order_f"] = order_f
+    worker_ctx["order_r"] = order_r
+    worker_ctx["ibl_kwargs"] = ibl_kwargs
+    return worker_ctx
+
+
+def _detect_bad_channels_window(segment_index, start_frame, end_frame, worker_ctx):
+    import scipy.stats
+
+    recording = worker_ctx["recording"]
+    chunk_size = min(worker_ctx["chunk_size"], end_frame - start_frame)
+    num_chunks = (end_frame - start_frame) // chunk_size
+    chunk_inds = np.arange(num_chunks)
+    num_chunks_per_window = worker_ctx["num_chunks_per_window"]
+    if num_chunks_per_window is not None and num_chunks_per_window < num_chunks:
+        # strided subset of the window
+        chunk_inds = np.unique(np.round(np.linspace(0, num_chunks - 1, num_chunks_per_window)).astype("int64"))
+
+    if chunk_inds.size == num_chunks:
+        # contiguous chunks are read at once
+        traces = recording.get_traces(
+            start_frame=start_frame,
+            end_frame=start_frame + num_chunks * chunk_size,
+            segment_index=segment_index,
+            return_scaled=True,
+        )
+        chunks = traces.reshape(num_chunks, chunk_size, traces.shape[1])
+    else:
+        chunks = [
+            recording.get_traces(
+                start_frame=start_frame + ind * chunk_size,
+                end_frame=start_frame + (ind + 1) * chunk_size,
+                segment_index=segment_index,
+                return_scaled=True,
+            )
+            for ind in chunk_inds
+        ]
+
+    chunk_labels = _detect_bad_channels_ibl_chunks(
+        chunks, recording.sampling_frequency, worker_ctx["order_f"], worker_ctx["order_r"], worker_ctx["ibl_kwargs"]
+    )
+    window_labels, _ = scipy.stats.mode(chunk_labels, axis=0, keepdims=False)
+    return window_labels.astype("int8")
+
+
+def _detect_bad_channels_ibl_chunks(chunks, fs, order_f, order_r, ibl_kwargs, batch_max_size=2**24):
+    """
+    IBL labels (num_chunks, num_channels) of a list of chunks of the same length.
+    The features are computed by batch of chunks of at most `batch_max_size` values.
+    """
+    ibl_kwargs = ibl_kwargs.copy()
+    nyquist_threshold = ibl_kwargs.pop("nyquist_threshold")
+    welch_window_ms = ibl_kwargs.pop("welch_window_ms")
+
+    num_chunks = len(chunks)
+    num_samples, num_channels = chunks[0].shape
+    batch_size = max(1, batch_max_size // (num_samples * num_channels))
+    labels = np.zeros((num_chunks, num_channels), dtype=np.int8)
+    for batch_start in range(0, num_chunks, batch_size):
+        if isinstance(chunks, np.ndarray):
+            batch = chunks[batch_start : batch_start + batch_size]
+        else:
+            batch = np.stack(chunks[batch_start : batch_start + batch_size])
+        if order_f is not None:
+            batch = batch[:, :, order_f]
+        psd_hf, xcorr = _compute_ibl_features(batch, fs, nyquist_threshold, welch_window_ms)
+        for i in range(batch.shape[0]):
+            chunk_labels = _label_channels_ibl(psd_hf[i], xcorr[i], **ibl_kwargs)
+            labels[batch_start + i] = chunk_labels[order_r] if order_r is not None else chunk_labels
+    return labels
+
+
 # ----------------------------------------------------------------------------------------------
 # IBL Detect Bad Channels
 # ----------------------------------------------------------------------------------------------
@@ -321,24 +545,54 @@ def detect_bad_channels_ibl(
     1d array
         Channels labels: 0: good,  1: dead low coherence / amplitude, 2: noisy, 3: outside of the brain
     """
-    _, nc = raw.shape
-    raw = raw - np.mean(raw, axis=0)[np.newaxis, :]
-    nperseg = int(welch_window_ms * fs / 1000)
+    psd_hf, xcorr = _compute_ibl_features(raw, fs, nyquist_threshold, welch_window_ms)
+    return _label_channels_ibl(
+        psd_hf,
+        xcorr,
+        psd_hf_threshold,
+        dead_channel_thr=dead_channel_thr,
+        noisy_channel_thr=noisy_channel_thr,
+        outside_channel_thr=outside_channel_thr,
+        n_neighbors=n_neighbors,
+        outside_channels_location=outside_channels_location,
+    )
+
+
+def _compute_ibl_features(raw, fs, nyquist_threshold, welch_window_ms):
+    """
+    Mean high frequency PSD and similarity to the median reference of each channel.
+    `raw` can be a (num_samples, num_channels) chunk or a (num_chunks, num_samples, num_channels) stack of chunks
+    of the same length, in which case the features of all chunks are computed at once.
+    """
     import scipy.signal
 
-    fscale, psd = scipy.signal.welch(raw, fs=fs, axis=0, window="hann", nperseg=nperseg)
+    raw = raw - np.mean(raw, axis=-2, keepdims=True)
+    nperseg = int(welch_window_ms * fs / 1000)
+    fscale, psd = scipy.signal.welch(raw, fs=fs, axis=-2, window="hann", nperseg=nperseg)
+    psd_hf = np.mean(psd[..., fscale > (fs / 2 * nyquist_threshold), :], axis=-2)
+
+    # similarity to the median reference
+    ref = np.median(raw, axis=-1, keepdims=True)
+    xcorr = np.sum(raw * ref, axis=-2) / np.sum(ref**2, axis=-2)
+    return psd_hf, xcorr
 
-    # compute similarities
-    ref = np.median(raw, axis=1)
-    xcorr = np.sum(raw * ref[:, np.newaxis], axis=0) / np.sum(ref**2)
+
+def _label_channels_ibl(
+    psd_hf,
+    xcorr,
+    psd_hf_threshold,
+    dead_channel_thr=-0.5,
+    noisy_channel_thr=1.0,
+    outside_channel_thr=-0.75,
+    n_neighbors=11,
+    outside_channels_location="top",
+):
+    nc = xcorr.size
 
     # compute coherence
     xcorr_neighbors = detrend(xcorr, n_neighbors)
     xcorr_distant = xcorr - detrend(xcorr, n_neighbors) - 1
 
-    # make recommendation
-    psd_hf = np.mean(psd[fscale > (fs / 2 * nyquist_threshold), :], axis=0)
-
     ichannels = np.zeros(nc, dtype=int)
     idead = np.where(xcorr_neighbors < dead_channel_thr)[0]
     inoisy = np.where(np.logical_or(psd_hf > psd_hf_threshold, xcorr_neighbors > noisy_channel_thr))[0]
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import numpy as np
+
+try:
+    import numba
+
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+from .basepreprocessor import BasePreprocessorSegment
+
+
+# operations of the fused kernel, applied on a float64 register: p0 and p1 are per channel parameters
+OP_MUL = 0  # v * p0
+OP_ADD = 1  # v + p0
+OP_RINT = 2  # round half to even, like np.round
+OP_ABS = 3  # abs(v)
+OP_CLIP_MIN = 4  # p1 if v <= p0
+OP_CLIP_MAX = 5  # p1 if v >= p0
+OP_TO_FLOAT32 = 6  # rounding to float32
+OP_TO_INT = 7  # truncation and wrap-around in [p0, p0 + p1), like astype() to an integer dtype
+
+# dtypes whose values are exactly represented by the float64 register
+_fusable_dtypes = [
+    np.dtype(dtype) for dtype in ("float32", "float64", "int8", "int16", "int32", "uint8", "uint16", "uint32")
+]
+
+
+def get_cast_ops(dtype):
+    """
+    Operations that reproduce `traces.astype(dtype)` on the register of the fused kernel.
+    """
+    dtype = np.dtype(dtype)
+    if dtype == np.dtype("float32"):
+        return [(OP_TO_FLOAT32, 0.0, 0.0)]
+    elif dtype.kind in "iu":
+        info = np.iinfo(dtype)
+        return [(OP_TO_INT, float(info.min), float(2 ** (dtype.itemsize * 8)))]
+    return []
+
+
+class ElementwisePreprocessorSegment(BasePreprocessorSegment):
+    """
+    Segment of a preprocessor that transforms every sample independently (scale, cast, clip, ...).
+
+    When numba is installed, adjacent elementwise segments (each one being the parent of the next) are fused:
+    the traces of the first non elementwise parent are read once and all the operations are applied by a single
+    kernel that writes into the output buffer, instead of allocating temporary arrays in each stage.
+    The fused kernel gives the same results as the numpy implementation of each stage, intermediate dtypes
+    included.
+
+    Subclasses implement:
+      * `apply_elementwise(traces, channel_indices)`: the numpy implementation of the stage
+      * `get_elementwise_ops(channel_indices, input_dtype)`: the list of `(op, p0, p1)` of the stage
+        and its output dtype
+    """
+
+    def apply_elementwise(self, traces, channel_indices):
+        raise NotImplementedError
+
+    def get_elementwise_ops(self, channel_indices, input_dtype):
+        raise NotImplementedError
+
+    def get_traces(self, start_frame, end_frame, channel_indices):
+        if channel_indices is None:
+            channel_indices = slice(None)
+        stages = [self]
+        parent_segment = self.parent_recording_segment
+        if HAVE_NUMBA:
+            while isinstance(parent_segment, ElementwisePreprocessorSegment):
+                stages.insert(0, parent_segment)
+                parent_segment = parent_segment.parent_recording_segment
+
+        traces = parent_segment.get_traces(start_frame, end_frame, channel_indices)
+
+        fused = None
+        if len(stages) > 1:
+            # a single stage is as fast with numpy
+            fused = _get_fused_ops(stages, channel_indices, traces.dtype, traces.shape[1])
+        if fused is None:
+            for stage in stages:
+                traces = stage.apply_elementwise(traces, channel_indices)
+            return traces
+
+        op_codes, op_params, dtype = fused
+        out = np.empty(traces.shape, dtype=dtype)
+        _apply_elementwise_ops_numba(traces, op_codes, op_params, out)
+        return out
+
+
+def _get_fused_ops(stages, channel_indices, dtype, num_channels):
+    all_ops = []
+    for stage in stages:
+        if np.dtype(dtype) not in _fusable_dtypes:
+            return None
+        ops, dtype = stage.get_elementwise_ops(channel_indices, np.dtype(dtype))
+        all_ops.extend(ops)
+    if np.dtype(dtype) not in _fusable_dtypes:
+        return None
+
+    op_codes = np.array([op[0] for op in all_ops], dtype="int64")
+    op_params = np.zeros((len(all_ops), 2, num_channels), dtype="float64")
+    for i, (_, p0, p1) in enumerate(all_ops):
+        op_params[i, 0, :] = p0
+        op_params[i, 1, :] = p1
+    return op_codes, op_params, np.dtype(dtype)
+
+
+if HAVE_NUMBA:
+
+    @numba.jit(nopython=True, nogil=True, cache=False)
+    def _apply_elementwise_ops_numba(traces, op_codes, op_params, out):
+        num_samples, num_channels = traces.shape
+        # the operations are applied one after the other on a block of samples that stays in the cache,
+        # so that each operation is a simple loop without branches
+        block_size = max(1, 16384 // max(num_channels, 1))
+        block = np.empty((block_size, num_channels), dtype=np.float64)
+        for start in range(0, num_samples, block_size):
+            n = min(block_size, num_samples - start)
+            for i in range(n):
+                for c in range(num_channels):
+                    block[i, c] = traces[start + i, c]
+
+            for k in range(op_codes.size):
+                op = op_codes[k]
+                p0 = op_params[k, 0]
+                p1 = op_params[k, 1]
+                if op == OP_MUL:
+                    for i in range(n):
+                        for c in range(num_channels):
+                            block[i, c] = block[i, c] * p0[c]
+                elif op == OP_ADD:
+                    for i in range(n):
+                        for c in range(num_channels):
+                            block[i, c] = block[i, c] + p0[c]
+                elif op == OP_RINT:
+                    for i in range(n):
+                        for c in range(num_channels):
+                            block[i, c] = np.rint(block[i, c])
+                elif op == OP_ABS:
+                    for i in range(n):
+                        for c in range(num_channels):
+                            block[i, c] = abs(block[i, c])
+                elif op == OP_CLIP_MIN:
+                    for i in range(n):
+                        for c in range(num_channels):
+                            if block[i, c] <= p0[c]:
+                                block[i, c] = p1[c]
+                elif op == OP_CLIP_MAX:
+                    for i in range(n):
+                        for c in range(num_channels):
+                            if block[i, c] >= p0[c]:
+                                block[i, c] = p1[c]
+                elif op == OP_TO_FLOAT32:
+                    for i in range(n):
+                        for c in range(num_channels):
+                            block[i, c] = np.float32(block[i, c])
+                elif op == OP_TO_INT:
+                    # the range of the dtype is the same for all channels
+                    low = p0[0]
+                    high = p0[0] + p1[0]
+                    span = p1[0]
+                    # values in (low - 1, high) are truncated in the range: a cast is enough (much faster than
+                    # np.trunc()), the wrap-around is only done for blocks with values outside of the range
+                    num_outside = 0
+                    for i in range(n):
+                        for c in range(num_channels):
+                            v = block[i, c]
+                            num_outside += not (v > low - 1.0 and v < high)
+                    if num_outside == 0:
+                        for i in range(n):
+                            for c in range(num_channels):
+                                block[i, c] = np.float64(np.int64(block[i, c]))
+                    else:
+                        for i in range(n):
+                            for c in range(num_channels):
+                                v = block[i, c]
+                                if abs(v) < 2.0**62:
+                                    v = np.float64(np.int64(v))
+                                if v < low or v >= high:
+                                    v = low + (v - low) % span
+                                block[i, c] = v
+
+            for i in range(n):
+                for c in range(num_channels):
+                    out[start + i, c] = block[i, c]
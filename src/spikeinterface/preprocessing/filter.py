@@ -168,31 +168,7 @@ class FilterRecordingSegment(BasePreprocessorSegment):
             add_reflect_padding=self.add_reflect_padding,
         )
 
-        traces_dtype = traces_chunk.dtype
-        # if uint --> force int
-        if traces_dtype.kind == "u":
-            traces_chunk = traces_chunk.astype("float32")
-
-        import scipy.signal
-
-        if self.direction == "forward-backward":
-            if self.filter_mode == "sos":
-                filtered_traces = scipy.signal.sosfiltfilt(self.coeff, traces_chunk, axis=0)
-            elif self.filter_mode == "ba":
-                b, a = self.coeff
-                filtered_traces = scipy.signal.filtfilt(b, a, traces_chunk, axis=0)
-        else:
-            if self.direction == "backward":
-                traces_chunk = np.flip(traces_chunk, axis=0)
-
-            if self.filter_mode == "sos":
-                filtered_traces = scipy.signal.sosfilt(self.coeff, traces_chunk, axis=0)
-            elif self.filter_mode == "ba":
-                b, a = self.coeff
-                filtered_traces = scipy.signal.lfilter(b, a, traces_chunk, axis=0)
-
-            if self.direction == "backward":
-                filtered_traces = np.flip(filtered_traces, axis=0)
+        filtered_traces = apply_filter_to_traces(traces_chunk, self.coeff, self.filter_mode, self.direction)
 
         if right_margin > 0:
             filtered_traces = filtered_traces[left_margin:-right_margin, :]
@@ -398,6 +374,39 @@ bandpass_filter.__doc__ = bandpass_filter.__doc__.format(_common_filter_docs)
 highpass_filter.__doc__ = highpass_filter.__doc__.format(_common_filter_docs)
 
 
+def apply_filter_to_traces(traces_chunk, coeff, filter_mode, direction):
+    """
+    Filter a (num_samples, num_channels) chunk along time with "sos" or "ba" coefficients.
+    Unsigned traces are cast to float32 before filtering.
+    """
+    import scipy.signal
+
+    # if uint --> force int
+    if traces_chunk.dtype.kind == "u":
+        traces_chunk = traces_chunk.astype("float32")
+
+    if direction == "forward-backward":
+        if filter_mode == "sos":
+            filtered_traces = scipy.signal.sosfiltfilt(coeff, traces_chunk, axis=0)
+        elif filter_mode == "ba":
+            b, a = coeff
+            filtered_traces = scipy.signal.filtfilt(b, a, traces_chunk, axis=0)
+    else:
+        if direction == "backward":
+            traces_chunk = np.flip(traces_chunk, axis=0)
+
+        if filter_mode == "sos":
+            filtered_traces = scipy.signal.sosfilt(coeff, traces_chunk, axis=0)
+        elif filter_mode == "ba":
+            b, a = coeff
+            filtered_traces = scipy.signal.lfilter(b, a, traces_chunk, axis=0)
+
+        if direction == "backward":
+            filtered_traces = np.flip(filtered_traces, axis=0)
+
+    return filtered_traces
+
+
 def fix_dtype(recording, dtype):
     if dtype is None:
         dtype = recording.get_dtype()
@@ -0,0 +1,440 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+
+from spikeinterface.core.job_tools import (
+    ChunkRecordingExecutor,
+    _shared_job_kwargs_doc,
+    divide_segment_into_chunks,
+    fix_job_kwargs,
+)
+
+from .basepreprocessor import BasePreprocessor
+from .filter import apply_filter_to_traces, fix_dtype
+from ..core import BaseRecordingSegment, get_chunk_with_margin
+
+
+_filter_bank_docs = """bands : dict
+        Dict of band_name: band_params, band_params being a dict with keys:
+            * "band" : float or list of 2 floats, the cutoff frequencies in Hz
+            * "btype" : "bandpass" | "highpass" | "lowpass", default: "bandpass"
+            * "decimation_factor" : int, default: 1. The filtered traces are decimated by array slicing, the
+              upper cutoff frequency must be below the Nyquist frequency of the decimated band
+            * "filter_order" : int, default: `filter_order`
+            * "margin_ms" : float, default: `margin_ms`
+        For instance for a Neuropixels 1.0 wideband recording at 30kHz:
+        `dict(ap=dict(band=[300., 6000.]), lfp=dict(band=[0.5, 300.], decimation_factor=12))`
+    filter_order : int, default: 5
+        The default order of the filters
+    ftype : str, default: "butter"
+        Filter type for `scipy.signal.iirfilter` e.g. "butter", "cheby1"
+    margin_ms : float, default: 5.0
+        The default margin in ms on border to avoid border effect
+    dtype : dtype or None, default: None
+        The dtype of the returned traces. If None, the dtype of the parent recording is used
+    direction : "forward" | "backward" | "forward-backward", default: "forward-backward"
+        Direction of filtering"""
+
+
+class FilterBankRecording(BasePreprocessor):
+    """
+    One band of a filter bank: the traces of the parent recording filtered (and optionally decimated) with the
+    parameters of `bands[band_name]`.
+
+    The band recordings returned by `filter_bank()` share the reading of the parent traces: the last chunk read
+    (with the largest margin of all bands) is kept, so that reading the same time range from several bands
+    reads the raw traces only once. Use `write_filter_bank()` to save all bands in a single pass over the
+    parent recording.
+
+    The output of a band is the same as `bandpass_filter()` (or `highpass_filter()`) with the same parameters,
+    followed by `decimate()` when "decimation_factor" is larger than 1.
+
+    Parameters
+    ----------
+    recording : Recording
+        The recording extractor to be filtered
+    {}
+    band_name : str
+        The band of `bands` given by this recording
+
+    Returns
+    -------
+    filter_bank_recording : FilterBankRecording
+        The filtered recording extractor object of the band
+    """
+
+    def __init__(
+        self,
+        recording,
+        bands,
+        band_name,
+        filter_order=5,
+        ftype="butter",
+        margin_ms=5.0,
+        dtype=None,
+        direction="forward-backward",
+    ):
+        fs = recording.get_sampling_frequency()
+        assert band_name in bands, f"band_name {band_name} is not in bands {list(bands.keys())}"
+        assert direction in ("forward", "backward", "forward-backward"), f"Unknown direction {direction}"
+        band_params = _get_band_params(bands, fs, filter_order, ftype, margin_ms)
+        coeff, margin, decimation_factor = band_params[band_name]
+        # the parent traces are read with the largest margin so that they can be shared by all bands
+        bank_margin = max(params[1] for params in band_params.values())
+        dtype = fix_dtype(recording, dtype)
+
+        BasePreprocessor.__init__(self, recording, sampling_frequency=fs / decimation_factor, dtype=dtype)
+        self.annotate(is_filtered=True)
+
+        if "offset_to_uV" in self.get_property_keys():
+            self.set_channel_offsets(0)
+
+        self._decimation_factor = decimation_factor
+        for parent_segment in recording._recording_segments:
+            self.add_recording_segment(
+                FilterBankRecordingSegment(
+                    FilterBankReader(parent_segment, bank_margin),
+                    coeff,
+                    margin,
+                    decimation_factor,
+                    dtype,
+                    direction,
+                )
+            )
+
+        self._kwargs = dict(
+            recording=recording,
+            bands=bands,
+            band_name=band_name,
+            filter_order=filter_order,
+            ftype=ftype,
+            margin_ms=margin_ms,
+            dtype=dtype.str,
+            direction=direction,
+        )
+
+    def _share_reader(self, other):
+        # the segments of both recordings read the parent traces with the same reader
+        for segment, other_segment in zip(self._recording_segments, other._recording_segments):
+            segment.reader = other_segment.reader
+
+
+class FilterBankReader:
+    """
+    Read the chunks of a parent segment with margin and keep the last one, so that several bands can be
+    computed from a single read.
+    """
+
+    def __init__(self, parent_recording_segment, margin):
+        self.parent_recording_segment = parent_recording_segment
+        self.margin = margin
+        self._last_chunk = None
+
+    def get_chunk(self, start_frame, end_frame, channel_indices):
+        key = (start_frame, end_frame, _channel_indices_key(channel_indices))
+        # a single assignment of a tuple keeps the cache consistent when segments are read by threads
+        last_chunk = self._last_chunk
+        if last_chunk is not None and last_chunk[0] == key:
+            return last_chunk[1]
+        chunk = get_chunk_with_margin(
+            self.parent_recording_segment, start_frame, end_frame, channel_indices, self.margin
+        )
+        self._last_chunk = (key, chunk)
+        return chunk
+
+
+def _channel_indices_key(channel_indices):
+    if channel_indices is None:
+        return None
+    elif isinstance(channel_indices, slice):
+        return (channel_indices.start, channel_indices.stop, channel_indices.step)
+    return np.asarray(channel_indices).tobytes()
+
+
+class FilterBankRecordingSegment(BaseRecordingSegment):
+    def __init__(self, reader, coeff, margin, decimation_factor, dtype, direction):
+        parent_segment = reader.parent_recording_segment
+        if decimation_factor == 1:
+            BaseRecordingSegment.__init__(self, **parent_segment.get_times_kwargs())
+        else:
+            # like in DecimateRecording, the time vector is replaced by the time of the first sample
+            if parent_segment.time_vector is not None:
+                t_start = float(parent_segment.time_vector[0])
+            else:
+                t_start = parent_segment.t_start
+            BaseRecordingSegment.__init__(
+                self, sampling_frequency=parent_segment.sampling_frequency / decimation_factor, t_start=t_start
+            )
+        self.reader = reader
+        self.coeff = coeff
+        self.margin = margin
+        self.decimation_factor = decimation_factor
+        self.dtype = dtype
+        self.direction = direction
+
+    def get_num_samples(self):
+        parent_num_samples = self.reader.parent_recording_segment.get_num_samples()
+        return int(np.ceil(parent_num_samples / self.decimation_factor))
+
+    def get_traces(self, start_frame, end_frame, channel_indices):
+        parent_num_samples = self.reader.parent_recording_segment.get_num_samples()
+        parent_start_frame = start_frame * self.decimation_factor
+        parent_end_frame = min(end_frame * self.decimation_factor, parent_num_samples)
+
+        traces_chunk, left_margin, right_margin = self.reader.get_chunk(
+            parent_start_frame, parent_end_frame, channel_indices
+        )
+        # only keep the margin of this band, so that the output does not depend on the other bands
+        band_left_margin = min(left_margin, self.margin)
+        band_right_margin = min(right_margin, self.margin)
+        num_samples = traces_chunk.shape[0]
+        traces_chunk = traces_chunk[left_margin - band_left_margin : num_samples - right_margin + band_right_margin]
+
+        filtered_traces = apply_filter_to_traces(traces_chunk, self.coeff, "sos", self.direction)
+        filtered_traces = filtered_traces[band_left_margin : filtered_traces.shape[0] - band_right_margin]
+
+        if self.decimation_factor > 1:
+            # the band is low-passed below the decimated Nyquist frequency so that slicing does not alias
+            filtered_traces = filtered_traces[:: self.decimation_factor]
+
+        if np.issubdtype(self.dtype, np.integer):
+            filtered_traces = filtered_traces.round()
+
+        return filtered_traces.astype(self.dtype)
+
+
+def _get_band_params(bands, sampling_frequency, filter_order, ftype, margin_ms):
+    import scipy.signal
+
+    band_params = {}
+    for band_name, params in bands.items():
+        assert "band" in params, f"The band {band_name} needs a 'band' key with the cutoff frequencies"
+        band = params["band"]
+        btype = params.get("btype", "bandpass")
+        assert btype in ("bandpass", "highpass", "lowpass"), "'btype' must be 'bandpass', 'highpass' or 'lowpass'"
+        decimation_factor = params.get("decimation_factor", 1)
+        if not isinstance(decimation_factor, (int, np.integer)) or decimation_factor <= 0:
+            raise ValueError(f"Expecting strictly positive integer for 'decimation_factor' of band {band_name}")
+        decimation_factor = int(decimation_factor)
+        if decimation_factor > 1:
+            if btype == "highpass":
+                raise ValueError(f"The highpass band {band_name} cannot be decimated")
+            upper_freq = band if btype == "lowpass" else band[1]
+            nyquist = sampling_frequency / decimation_factor / 2.0
+            if upper_freq >= nyquist:
+                raise ValueError(
+                    f"The upper frequency of band {band_name} ({upper_freq}Hz) must be below the Nyquist "
+                    f"frequency of the decimated band ({nyquist}Hz)"
+                )
+
+        coeff = scipy.signal.iirfilter(
+            params.get("filter_order", filter_order),
+            band,
+            fs=sampling_frequency,
+            analog=False,
+            btype=btype,
+            ftype=ftype,
+            output="sos",
+        )
+        margin = int(params.get("margin_ms", margin_ms) * sampling_frequency / 1000.0)
+        band_params[band_name] = (coeff, margin, decimation_factor)
+
+    return band_params
+
+
+def filter_bank(
+    recording,
+    bands,
+    filter_order=5,
+    ftype="butter",
+    margin_ms=5.0,
+    dtype=None,
+    direction="forward-backward",
+):
+    """
+    Filter a recording with a bank of filters, for instance to get the AP and the decimated LFP bands of a
+    wideband recording.
+
+    The band recordings share the reading of the parent traces: when the same time range is read from
+    several bands, the raw traces are read only once. Use `write_filter_bank()` to save all bands in a single
+    pass over the parent recording.
+
+    Parameters
+    ----------
+    recording : Recording
+        The recording extractor to be filtered
+    {}
+
+    Returns
+    -------
+    band_recordings : dict
+        Dict of band_name: FilterBankRecording
+    """
+    band_recordings = {}
+    for band_name in bands:
+        band_recordings[band_name] = FilterBankRecording(
+            recording,
+            bands,
+            band_name,
+            filter_order=filter_order,
+            ftype=ftype,
+            margin_ms=margin_ms,
+            dtype=dtype,
+            direction=direction,
+        )
+    band_names = list(bands.keys())
+    for band_name in band_names[1:]:
+        band_recordings[band_name]._share_reader(band_recordings[band_names[0]])
+    return band_recordings
+
+
+def write_filter_bank(
+    recording,
+    folder,
+    bands,
+    filter_order=5,
+    ftype="butter",
+    margin_ms=5.0,
+    dtype=None,
+    direction="forward-backward",
+    overwrite=False,
+    verbose=False,
+    **job_kwargs,
+):
+    """
+    Filter a recording with a bank of filters and save every band in a binary folder `folder / band_name`,
+    reading the parent traces only once.
+
+    All bands are computed from the same chunk of raw traces in a single `ChunkRecordingExecutor` pass. The
+    chunk size is rounded up to a multiple of the decimation factors so that the chunks of decimated bands
+    start on a decimated sample.
+
+    Parameters
+    ----------
+    recording : Recording
+        The recording extractor to be filtered
+    folder : str or Path
+        The folder containing one binary folder per band
+    {}
+    overwrite : bool, default: False
+        If True, existing band folders are deleted before saving
+    verbose : bool, default: False
+        The verbosity of the ChunkRecordingExecutor
+    {}
+
+    Returns
+    -------
+    band_recordings : dict
+        Dict of band_name: BinaryFolderRecording
+    """
+    from spikeinterface.core import BinaryFolderRecording, BinaryRecordingExtractor
+
+    job_kwargs = fix_job_kwargs(job_kwargs)
+    folder = Path(folder)
+    filter_kwargs = dict(filter_order=filter_order, ftype=ftype, margin_ms=margin_ms, dtype=dtype, direction=direction)
+    band_recordings = filter_bank(recording, bands, **filter_kwargs)
+
+    file_paths = {}
+    for band_name, band_recording in band_recordings.items():
+        band_folder = folder / band_name
+        if overwrite and band_folder.is_dir():
+            import shutil
+
+            shutil.rmtree(band_folder)
+        assert not band_folder.exists(), f"folder {band_folder} already exists, use overwrite=True"
+        band_folder.mkdir(parents=True, exist_ok=False)
+
+        if band_recording.check_serializability("json"):
+            band_recording.dump_to_json(file_path=band_folder / "provenance.json", relative_to=band_folder)
+        band_recording.save_metadata_to_folder(band_folder)
+
+        file_paths[band_name] = []
+        for segment_index in range(band_recording.get_num_segments()):
+            file_path = band_folder / f"traces_cached_seg{segment_index}.raw"
+            num_frames = band_recording.get_num_frames(segment_index=segment_index)
+            file_size_bytes = num_frames * band_recording.get_num_channels() * band_recording.get_dtype().itemsize
+            with open(file_path, "wb+") as f:
+                if file_size_bytes > 0:
+                    f.seek(file_size_bytes - 1)
+                    f.write(b"\0")
+            file_paths[band_name].append(file_path)
+
+    func = _write_filter_bank_chunk
+    init_func = _init_filter_bank_worker
+    init_args = (recording, bands, filter_kwargs, file_paths)
+    executor = ChunkRecordingExecutor(
+        recording, func, init_func, init_args, job_name="write_filter_bank", verbose=verbose, **job_kwargs
+    )
+
+    # chunks of decimated bands must start on a decimated sample
+    decimation_lcm = int(np.lcm.reduce([rec._decimation_factor for rec in band_recordings.values()]))
+    chunk_size = executor.chunk_size
+    if chunk_size is not None:
+        chunk_size = int(np.ceil(chunk_size / decimation_lcm)) * decimation_lcm
+    recording_slices = []
+    for segment_index in range(recording.get_num_segments()):
+        num_frames = recording.get_num_samples(segment_index)
+        chunks = divide_segment_into_chunks(num_frames, chunk_size)
+        recording_slices.extend((segment_index, start_frame, end_frame) for start_frame, end_frame in chunks)
+    executor.run(recording_slices=recording_slices)
+
+    saved_recordings = {}
+    for band_name, band_recording in band_recordings.items():
+        band_folder = folder / band_name
+        binary_recording = BinaryRecordingExtractor(
+            file_paths=file_paths[band_name],
+            sampling_frequency=band_recording.get_sampling_frequency(),
+            num_channels=band_recording.get_num_channels(),
+            dtype=band_recording.get_dtype(),
+            t_starts=band_recording._get_t_starts(),
+            channel_ids=band_recording.get_channel_ids(),
+            time_axis=0,
+            file_offset=0,
+            is_filtered=True,
+            gain_to_uV=band_recording.get_channel_gains(),
+            offset_to_uV=band_recording.get_channel_offsets(),
+        )
+        binary_recording.dump(band_folder / "binary.json", relative_to=band_folder)
+        saved_recording = BinaryFolderRecording(folder_path=band_folder)
+        band_recording.copy_metadata(saved_recording)
+        saved_recording.dump_to_json(file_path=band_folder / "si_folder.json", relative_to=band_folder)
+        saved_recordings[band_name] = saved_recording
+
+    return saved_recordings
+
+
+# used by write_filter_bank + ChunkRecordingExecutor
+def _init_filter_bank_worker(recording, bands, filter_kwargs, file_paths):
+    worker_ctx = {}
+    # the bands are rebuilt in each worker so that they share the same reader
+    worker_ctx["band_recordings"] = filter_bank(recording, bands, **filter_kwargs)
+    worker_ctx["memmaps"] = {}
+    for band_name, band_recording in worker_ctx["band_recordings"].items():
+        worker_ctx["memmaps"][band_name] = []
+        for segment_index, file_path in enumerate(file_paths[band_name]):
+            shape = (band_recording.get_num_frames(segment_index=segment_index), band_recording.get_num_channels())
+            memmap_array = np.memmap(file_path, dtype=band_recording.get_dtype(), mode="r+", shape=shape)
+            worker_ctx["memmaps"][band_name].append(memmap_array)
+    return worker_ctx
+
+
+# used by write_filter_bank + ChunkRecordingExecutor
+def _write_filter_bank_chunk(segment_index, start_frame, end_frame, worker_ctx):
+    for band_name, band_recording in worker_ctx["band_recordings"].items():
+        decimation_factor = band_recording._decimation_factor
+        # start_frame is a multiple of the decimation factor and end_frame too, except at the end of the segment
+        band_start_frame = start_frame // decimation_factor
+        band_end_frame = -(-end_frame // decimation_factor)
+        traces = band_recording.get_traces(
+            start_frame=band_start_frame, end_frame=band_end_frame, segment_index=segment_index
+        )
+        memmap_array = worker_ctx["memmaps"][band_name][segment_index]
+        memmap_array[band_start_frame:band_end_frame, :] = traces
+        memmap_array[band_start_frame:band_end_frame, :].flush()
+
+
+FilterBankRecording.__doc__ = FilterBankRecording.__doc__.format(_filter_bank_docs)
+filter_bank.__doc__ = filter_bank.__doc__.format(_filter_bank_docs)
+write_filter_bank.__doc__ = write_filter_bank.__doc__.format(_filter_bank_docs, _shared_job_kwargs_doc)
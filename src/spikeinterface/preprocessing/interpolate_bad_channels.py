@@ -34,6 +34,14 @@ class InterpolateBadChannelsRecording(BasePreprocessor):
     weights : np.array or None, default: None
         The weights to give to bad_channel_ids at interpolation.
         If None, weights are automatically computed
+    bad_channel_masks : list of np.array or None, default: None
+        Time resolved bad channels: for each segment, a boolean array (num_windows, num_channels) that is True
+        for the channels to interpolate in each window (see `detect_bad_channels_over_time()`).
+        The `bad_channel_ids` (if any) are interpolated in all windows. Samples outside of the windows
+        are not modified.
+    window_frames : list of np.array or None, default: None
+        For each segment, the (num_windows, 2) start and end frames of the windows of `bad_channel_masks`.
+        Windows must be sorted and not overlap.
 
     Returns
     -------
@@ -41,9 +49,21 @@ class InterpolateBadChannelsRecording(BasePreprocessor):
         The recording object with interpolated bad channels
     """
 
-    def __init__(self, recording, bad_channel_ids, sigma_um=None, p=1.3, weights=None):
+    def __init__(
+        self,
+        recording,
+        bad_channel_ids=None,
+        sigma_um=None,
+        p=1.3,
+        weights=None,
+        bad_channel_masks=None,
+        window_frames=None,
+    ):
         BasePreprocessor.__init__(self, recording)
 
+        if bad_channel_ids is None:
+            assert bad_channel_masks is not None, "bad_channel_ids or bad_channel_masks must be given"
+            bad_channel_ids = []
         bad_channel_ids = np.array(bad_channel_ids)
         self.check_inputs(recording, bad_channel_ids)
 
@@ -55,20 +75,64 @@ class InterpolateBadChannelsRecording(BasePreprocessor):
         if sigma_um is None:
             sigma_um = estimate_recommended_sigma_um(recording)
 
-        if weights is None:
+        if bad_channel_masks is None:
+            if weights is None:
+                locations = recording.get_channel_locations()
+                locations_good = locations[self._good_channel_idxs]
+                locations_bad = locations[self._bad_channel_idxs]
+                weights = preprocessing_tools.get_kriging_channel_weights(locations_good, locations_bad, sigma_um, p)
+
+            for parent_segment in recording._recording_segments:
+                rec_segment = InterpolateBadChannelsSegment(
+                    parent_segment, self._good_channel_idxs, self._bad_channel_idxs, weights
+                )
+                self.add_recording_segment(rec_segment)
+        else:
+            assert weights is None, "weights can not be given with time resolved bad_channel_masks"
+            assert window_frames is not None, "window_frames must be given with bad_channel_masks"
+            num_segments = recording.get_num_segments()
+            assert len(bad_channel_masks) == len(window_frames) == num_segments, "One mask per segment is needed"
+
+            bad_channel_masks = [np.asarray(masks, dtype=bool) for masks in bad_channel_masks]
+            window_frames = [np.asarray(frames, dtype="int64").reshape(-1, 2) for frames in window_frames]
+            static_mask = ~self._good_channel_idxs
+            all_masks = np.concatenate([masks | static_mask for masks in bad_channel_masks], axis=0)
+            # the weights are computed once per distinct set of bad channels
+            patterns, pattern_inds = np.unique(all_masks, axis=0, return_inverse=True)
+            pattern_inds = pattern_inds.reshape(-1)
             locations = recording.get_channel_locations()
-            locations_good = locations[self._good_channel_idxs]
-            locations_bad = locations[self._bad_channel_idxs]
-            weights = preprocessing_tools.get_kriging_channel_weights(locations_good, locations_bad, sigma_um, p)
-
-        for parent_segment in recording._recording_segments:
-            rec_segment = InterpolateBadChannelsSegment(
-                parent_segment, self._good_channel_idxs, self._bad_channel_idxs, weights
-            )
-            self.add_recording_segment(rec_segment)
+            interpolations = []
+            for pattern in patterns:
+                if not np.any(pattern):
+                    interpolations.append(None)
+                    continue
+                good_idxs = np.flatnonzero(~pattern)
+                bad_idxs = np.flatnonzero(pattern)
+                pattern_weights = preprocessing_tools.get_kriging_channel_weights(
+                    locations[good_idxs], locations[bad_idxs], sigma_um, p
+                )
+                interpolations.append((good_idxs, bad_idxs, pattern_weights))
+
+            i = 0
+            for segment_index, parent_segment in enumerate(recording._recording_segments):
+                masks = bad_channel_masks[segment_index]
+                frames = window_frames[segment_index]
+                assert masks.shape == (frames.shape[0], recording.get_num_channels()), "Wrong bad_channel_masks shape"
+                assert np.all(frames[:, 1] >= frames[:, 0]), "Windows must end after they start"
+                assert np.all(frames[1:, 0] >= frames[:-1, 1]), "Windows must be sorted and not overlap"
+                segment_interpolations = [interpolations[k] for k in pattern_inds[i : i + frames.shape[0]]]
+                i += frames.shape[0]
+                rec_segment = InterpolateBadChannelsOverTimeSegment(parent_segment, frames, segment_interpolations)
+                self.add_recording_segment(rec_segment)
 
         self._kwargs = dict(
-            recording=recording, bad_channel_ids=bad_channel_ids, p=p, sigma_um=sigma_um, weights=weights
+            recording=recording,
+            bad_channel_ids=bad_channel_ids,
+            p=p,
+            sigma_um=sigma_um,
+            weights=weights,
+            bad_channel_masks=bad_channel_masks,
+            window_frames=window_frames,
         )
 
     def check_inputs(self, recording, bad_channel_ids):
@@ -103,6 +167,38 @@ class InterpolateBadChannelsSegment(BasePreprocessorSegment):
         return traces[:, channel_indices]
 
 
+class InterpolateBadChannelsOverTimeSegment(BasePreprocessorSegment):
+    def __init__(self, parent_recording_segment, window_frames, interpolations):
+        BasePreprocessorSegment.__init__(self, parent_recording_segment)
+
+        self._window_frames = window_frames
+        # for each window: None or (good_channel_indices, bad_channel_indices, weights)
+        self._interpolations = interpolations
+
+    def get_traces(self, start_frame, end_frame, channel_indices):
+        if channel_indices is None:
+            channel_indices = slice(None)
+
+        traces = self.parent_recording_segment.get_traces(start_frame, end_frame, slice(None))
+
+        first = np.searchsorted(self._window_frames[:, 1], start_frame, side="right")
+        last = np.searchsorted(self._window_frames[:, 0], end_frame, side="left")
+        copied = False
+        for k in range(first, last):
+            if self._interpolations[k] is None:
+                continue
+            if not copied:
+                traces = traces.copy()
+                copied = True
+            good_channel_indices, bad_channel_indices, weights = self._interpolations[k]
+            window_start = max(self._window_frames[k, 0], start_frame) - start_frame
+            window_end = min(self._window_frames[k, 1], end_frame) - start_frame
+            window_traces = traces[window_start:window_end]
+            window_traces[:, bad_channel_indices] = window_traces[:, good_channel_indices] @ weights
+
+        return traces[:, channel_indices]
+
+
 def estimate_recommended_sigma_um(recording):
     """
     Get the most common distance between channels on the y-axis
@@ -5,13 +5,15 @@ import numpy as np
 from spikeinterface.core.core_tools import define_function_from_class
 
 from .basepreprocessor import BasePreprocessor, BasePreprocessorSegment
+from .elementwise import ElementwisePreprocessorSegment, get_cast_ops, OP_MUL, OP_ADD, OP_RINT
 
 from .filter import fix_dtype
 
 from ..core import get_random_data_chunks
+from ..core.recording_tools import split_random_chunk_kwargs
 
 
-class ScaleRecordingSegment(BasePreprocessorSegment):
+class ScaleRecordingSegment(ElementwisePreprocessorSegment):
     # use by NormalizeByQuantileRecording/ScaleRecording/CenterRecording
 
     def __init__(self, parent_recording_segment, gain, offset, dtype):
@@ -20,13 +22,11 @@ class ScaleRecordingSegment(BasePreprocessorSegment):
         self.offset = offset
         self._dtype = dtype
 
-    def get_traces(self, start_frame, end_frame, channel_indices) -> np.ndarray:
+    def apply_elementwise(self, traces, channel_indices) -> np.ndarray:
         # TODO when we are sure that BaseExtractors get_traces allocate their own buffer instead of just passing
         # It along we should remove copies in preprocessors including the one in the next line
 
-        scaled_traces = self.parent_recording_segment.get_traces(start_frame, end_frame, channel_indices).astype(
-            "float32", copy=True
-        )
+        scaled_traces = traces.astype("float32", copy=True)
         scaled_traces *= self.gain[:, channel_indices]  # in-place
         scaled_traces += self.offset[:, channel_indices]  # in-place
 
@@ -35,6 +35,16 @@ class ScaleRecordingSegment(BasePreprocessorSegment):
 
         return scaled_traces.astype(self._dtype, copy=False)
 
+    def get_elementwise_ops(self, channel_indices, input_dtype):
+        # the traces are scaled in float32
+        ops = get_cast_ops("float32")
+        ops += [(OP_MUL, self.gain[0, channel_indices], 0.0)] + get_cast_ops("float32")
+        ops += [(OP_ADD, self.offset[0, channel_indices], 0.0)] + get_cast_ops("float32")
+        if np.issubdtype(self._dtype, np.integer):
+            ops.append((OP_RINT, 0.0, 0.0))
+        ops += get_cast_ops(self._dtype)
+        return ops, np.dtype(self._dtype)
+
 
 class NormalizeByQuantileRecording(BasePreprocessor):
     """
@@ -60,7 +70,8 @@ class NormalizeByQuantileRecording(BasePreprocessor):
         If "by_channel" each channel is rescaled independently.
     dtype : str or np.dtype, default: "float32"
         The dtype of the output traces
-    **random_chunk_kwargs : Keyword arguments for `spikeinterface.core.get_random_data_chunk()` function
+    **random_chunk_kwargs : Keyword arguments for `spikeinterface.core.get_random_data_chunk()` function.
+        Job keyword arguments (e.g. n_jobs) can be given to read the random chunks in parallel.
 
     Returns
     -------
@@ -118,6 +129,7 @@ class NormalizeByQuantileRecording(BasePreprocessor):
             mode=mode,
             dtype=np.dtype(self._dtype).str,
         )
+        random_chunk_kwargs, _ = split_random_chunk_kwargs(random_chunk_kwargs)
         self._kwargs.update(random_chunk_kwargs)
 
 
@@ -192,7 +204,8 @@ class CenterRecording(BasePreprocessor):
         The method used to center the traces
     dtype : str or np.dtype, default: "float32"
         The dtype of the output traces
-    **random_chunk_kwargs : Keyword arguments for `spikeinterface.core.get_random_data_chunk()` function
+    **random_chunk_kwargs : Keyword arguments for `spikeinterface.core.get_random_data_chunk()` function.
+        Job keyword arguments (e.g. n_jobs) can be given to read the random chunks in parallel.
 
     Returns
     -------
@@ -222,6 +235,7 @@ class CenterRecording(BasePreprocessor):
             mode=mode,
             dtype=np.dtype(self._dtype).str,
         )
+        random_chunk_kwargs, _ = split_random_chunk_kwargs(random_chunk_kwargs)
         self._kwargs.update(random_chunk_kwargs)
 
 
@@ -247,7 +261,8 @@ class ZScoreRecording(BasePreprocessor):
         Apply a scaling factor to fit the integer range.
         This is used when the dtype is an integer, so that the output is scaled.
         For example, a value of `int_scale=200` will scale the zscore value to a standard deviation of 200.
-    **random_chunk_kwargs : Keyword arguments for `spikeinterface.core.get_random_data_chunk()` function
+    **random_chunk_kwargs : Keyword arguments for `spikeinterface.core.get_random_data_chunk()` function.
+        Job keyword arguments (e.g. n_jobs) can be given to read the random chunks in parallel.
 
     Returns
     -------
@@ -322,6 +337,7 @@ class ZScoreRecording(BasePreprocessor):
         self._kwargs = dict(
             recording=recording, dtype=np.dtype(self._dtype).str, mode=mode, gain=gain.tolist(), offset=offset.tolist()
         )
+        random_chunk_kwargs, _ = split_random_chunk_kwargs(random_chunk_kwargs)
         self._kwargs.update(random_chunk_kwargs)
 
 
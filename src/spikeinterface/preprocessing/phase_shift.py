@@ -2,6 +2,13 @@ from __future__ import annotations
 
 import numpy as np
 
+try:
+    import numba
+
+    HAVE_NUMBA = True
+except ModuleNotFoundError as err:
+    HAVE_NUMBA = False
+
 from spikeinterface.core.core_tools import define_function_from_class
 
 from ..core import get_chunk_with_margin
@@ -33,6 +40,15 @@ class PhaseShiftRecording(BasePreprocessor):
         we can externally provide one.
     dtype : None | str | dtype, default: None
         Dtype of input and output `recording` objects.
+    method : "fft" | "fir", default: "fft"
+        * "fft" : the shift is applied in the frequency domain on each chunk with a tapered margin of `margin_ms`
+        * "fir" : the shift is applied with a short windowed-sinc fractional delay filter per channel
+          (see `get_fractional_delay_kernels()`). The margin is the filter half width, so `margin_ms`
+          is not used, and the result does not depend on the chunking. With the default filter, the
+          error compared to the "fft" method is below 0.1% of the signal RMS (-60 dB) up to 80% of the
+          Nyquist frequency, and the filter attenuates the band above.
+    fir_half_width : int, default: 16
+        Number of samples on each side of the fractional delay filter when method="fir"
 
 
     Returns
@@ -41,7 +57,7 @@ class PhaseShiftRecording(BasePreprocessor):
         The phase shifted recording object
     """
 
-    def __init__(self, recording, margin_ms=40.0, inter_sample_shift=None, dtype=None):
+    def __init__(self, recording, margin_ms=40.0, inter_sample_shift=None, dtype=None, method="fft", fir_half_width=16):
         if inter_sample_shift is None:
             assert "inter_sample_shift" in recording.get_property_keys(), "'inter_sample_shift' is not a property!"
             sample_shifts = recording.get_property("inter_sample_shift")
@@ -51,7 +67,13 @@ class PhaseShiftRecording(BasePreprocessor):
             ), "the 'inter_sample_shift' must be same size at the num_channels "
             sample_shifts = np.asarray(inter_sample_shift)
 
-        margin = int(margin_ms * recording.get_sampling_frequency() / 1000.0)
+        assert method in ("fft", "fir"), f"method must be 'fft' or 'fir', not {method}"
+        if method == "fir":
+            kernels, kernel_offset = get_fractional_delay_kernels(sample_shifts, half_width=fir_half_width)
+            margin = max(kernel_offset + kernels.shape[0] - 1, -kernel_offset, 0)
+        else:
+            kernels, kernel_offset = None, None
+            margin = int(margin_ms * recording.get_sampling_frequency() / 1000.0)
 
         if dtype is None:
             dtype = recording.get_dtype()
@@ -64,27 +86,42 @@ class PhaseShiftRecording(BasePreprocessor):
 
         BasePreprocessor.__init__(self, recording, dtype=dtype)
         for parent_segment in recording._recording_segments:
-            rec_segment = PhaseShiftRecordingSegment(parent_segment, sample_shifts, margin, dtype, tmp_dtype)
+            rec_segment = PhaseShiftRecordingSegment(
+                parent_segment, sample_shifts, margin, dtype, tmp_dtype, kernels, kernel_offset
+            )
             self.add_recording_segment(rec_segment)
 
         # for dumpability
         if inter_sample_shift is not None:
             inter_sample_shift = list(inter_sample_shift)
-        self._kwargs = dict(recording=recording, margin_ms=float(margin_ms), inter_sample_shift=inter_sample_shift)
+        self._kwargs = dict(
+            recording=recording,
+            margin_ms=float(margin_ms),
+            inter_sample_shift=inter_sample_shift,
+            method=method,
+            fir_half_width=int(fir_half_width),
+        )
 
 
 class PhaseShiftRecordingSegment(BasePreprocessorSegment):
-    def __init__(self, parent_recording_segment, sample_shifts, margin, dtype, tmp_dtype):
+    def __init__(
+        self, parent_recording_segment, sample_shifts, margin, dtype, tmp_dtype, kernels=None, kernel_offset=None
+    ):
         BasePreprocessorSegment.__init__(self, parent_recording_segment)
         self.sample_shifts = sample_shifts
         self.margin = margin
         self.dtype = dtype
         self.tmp_dtype = tmp_dtype
+        self.kernels = kernels
+        self.kernel_offset = kernel_offset
 
     def get_traces(self, start_frame, end_frame, channel_indices):
         if channel_indices is None:
             channel_indices = slice(None)
 
+        if self.kernels is not None:
+            return self._get_traces_fir(start_frame, end_frame, channel_indices)
+
         # this return a copy with margin  + taper on border always
         traces_chunk, left_margin, right_margin = get_chunk_with_margin(
             self.parent_recording_segment,
@@ -106,6 +143,25 @@ class PhaseShiftRecordingSegment(BasePreprocessorSegment):
 
         return traces_shift
 
+    def _get_traces_fir(self, start_frame, end_frame, channel_indices):
+        # the margin is exact, zeros outside the segment
+        traces_chunk, left_margin, _ = get_chunk_with_margin(
+            self.parent_recording_segment,
+            start_frame,
+            end_frame,
+            channel_indices,
+            self.margin,
+            add_zeros=True,
+        )
+        traces_chunk = traces_chunk.astype("float32", copy=False)
+        num_samples = traces_chunk.shape[0] - 2 * self.margin
+        traces_shift = apply_fractional_delay(
+            traces_chunk, self.kernels[:, channel_indices], self.kernel_offset, left_margin, num_samples
+        )
+        if np.issubdtype(self.dtype, np.integer):
+            traces_shift = traces_shift.round()
+        return traces_shift.astype(self.dtype, copy=False)
+
 
 # function for API
 phase_shift = define_function_from_class(source_class=PhaseShiftRecording, name="phase_shift")
@@ -213,3 +269,78 @@ def apply_fshift_ibl(w, s, axis=0, ns=None):
         W = np.real(irfft(W, ns, axis=axis))
         W = W.astype(w.dtype)
     return W
+
+
+def get_fractional_delay_kernels(shift_samples, half_width=16, beta=8.0):
+    """
+    Compute Kaiser windowed-sinc fractional delay filters, one per channel.
+
+    The shifted signal is `y[n] = sum_k kernels[k, c] * x[n - k - kernel_offset, c]`, which approximates
+    `x(n - shift)` as `apply_frequency_shift()` does. The integer part of the shift only moves the kernel
+    (`kernel_offset`), the fractional part is interpolated by the sinc. Each kernel is normalized to a
+    unit sum so that the DC gain is exact.
+
+    Parameters
+    ----------
+    shift_samples : array
+        The shift of each channel in samples
+    half_width : int, default: 16
+        The number of taps on each side of the fractional delay
+    beta : float, default: 8.0
+        The beta of the Kaiser window
+
+    Returns
+    -------
+    kernels : np.array
+        The kernels with shape (2 * half_width, num_channels) in float32
+    kernel_offset : int
+        The delay of the first tap in samples (can be negative)
+    """
+    shift_samples = np.asarray(shift_samples, dtype="float64")
+    integer_shifts = np.floor(shift_samples).astype("int64")
+    kernel_offset = int(integer_shifts.min()) - half_width + 1
+    num_taps = int(integer_shifts.max() - integer_shifts.min()) + 2 * half_width
+
+    # delay of each tap relative to the shift of each channel
+    taps = kernel_offset + np.arange(num_taps)
+    x = taps[:, np.newaxis] - shift_samples[np.newaxis, :]
+    in_window = np.abs(x) < half_width
+    window = np.i0(beta * np.sqrt(np.clip(1 - (x / half_width) ** 2, 0, None))) / np.i0(beta)
+    kernels = np.where(in_window, np.sinc(x) * window, 0.0)
+    kernels /= np.sum(kernels, axis=0, keepdims=True)
+    return kernels.astype("float32"), kernel_offset
+
+
+def apply_fractional_delay(traces, kernels, kernel_offset, first_sample, num_samples):
+    """
+    Apply per channel FIR kernels (see `get_fractional_delay_kernels()`) to traces with margin.
+
+    The output sample `n` (0 <= n < num_samples) is computed from the input sample `first_sample + n`
+    and its neighbours. A numba kernel is used when numba is installed, otherwise the loop is done on
+    the taps so every operation is vectorized on all channels.
+    """
+    kernels = np.ascontiguousarray(kernels, dtype=traces.dtype)
+    if HAVE_NUMBA:
+        out = np.empty((num_samples, traces.shape[1]), dtype=traces.dtype)
+        _apply_fractional_delay_numba(traces, kernels, first_sample - kernel_offset, out)
+        return out
+
+    out = np.zeros((num_samples, traces.shape[1]), dtype=traces.dtype)
+    for k in range(kernels.shape[0]):
+        start = first_sample - k - kernel_offset
+        out += kernels[k] * traces[start : start + num_samples]
+    return out
+
+
+if HAVE_NUMBA:
+
+    @numba.jit(nopython=True, nogil=True, cache=False)
+    def _apply_fractional_delay_numba(traces, kernels, first, out):
+        num_samples, num_channels = out.shape
+        for n in range(num_samples):
+            for c in range(num_channels):
+                out[n, c] = 0.0
+            for k in range(kernels.shape[0]):
+                i = first + n - k
+                for c in range(num_channels):
+                    out[n, c] += kernels[k, c] * traces[i, c]
@@ -14,6 +14,7 @@ from .filter import (
     highpass_filter,
     causal_filter,
 )
+from .filter_bank import FilterBankRecording, filter_bank, write_filter_bank
 from .filter_gaussian import GaussianFilterRecording, gaussian_filter
 from .normalize_scale import (
     NormalizeByQuantileRecording,
@@ -51,6 +52,7 @@ preprocessers_full_list = [
     BandpassFilterRecording,
     HighpassFilterRecording,
     NotchFilterRecording,
+    FilterBankRecording,
     GaussianFilterRecording,
     # gain offset stuff
     NormalizeByQuantileRecording,
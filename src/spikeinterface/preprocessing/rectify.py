@@ -5,6 +5,7 @@ import numpy as np
 from spikeinterface.core.core_tools import define_function_from_class
 
 from .basepreprocessor import BasePreprocessor, BasePreprocessorSegment
+from .elementwise import ElementwisePreprocessorSegment, get_cast_ops, OP_ABS
 
 
 class RectifyRecording(BasePreprocessor):
@@ -17,14 +18,17 @@ class RectifyRecording(BasePreprocessor):
         self._kwargs = dict(recording=recording)
 
 
-class RectifyRecordingSegment(BasePreprocessorSegment):
+class RectifyRecordingSegment(ElementwisePreprocessorSegment):
     def __init__(self, parent_recording_segment):
         BasePreprocessorSegment.__init__(self, parent_recording_segment)
 
-    def get_traces(self, start_frame, end_frame, channel_indices):
-        traces = self.parent_recording_segment.get_traces(start_frame, end_frame, channel_indices)
+    def apply_elementwise(self, traces, channel_indices):
         return np.abs(traces)
 
+    def get_elementwise_ops(self, channel_indices, input_dtype):
+        # abs() wraps around for the minimum of signed integers, like np.abs
+        return [(OP_ABS, 0.0, 0.0)] + get_cast_ops(input_dtype), input_dtype
+
 
 # function for API
 rectify = define_function_from_class(source_class=RectifyRecording, name="rectify")
@@ -7,7 +7,7 @@ import numpy as np
 from spikeinterface.core.core_tools import define_function_from_class
 
 from .basepreprocessor import BasePreprocessor, BasePreprocessorSegment
-from spikeinterface.core import NumpySorting, estimate_templates
+from spikeinterface.core import NumpySorting, estimate_templates, IntervalSet
 
 
 class RemoveArtifactsRecording(BasePreprocessor):
@@ -84,6 +84,9 @@ class RemoveArtifactsRecording(BasePreprocessor):
         can be allowed to minimize the residuals
     waveforms_kwargs : None
         Deprecated and ignored
+    **job_kwargs : keyword arguments for parallel processing:
+        For modes "median" and "average", the artifacts are estimated once at construction with
+        `estimate_templates()` using these job kwargs (e.g. n_jobs)
 
     Returns
     -------
@@ -105,6 +108,7 @@ class RemoveArtifactsRecording(BasePreprocessor):
         scale_amplitude=False,
         time_jitter=0,
         waveforms_kwargs=None,
+        **job_kwargs,
     ):
         if waveforms_kwargs is not None:
             warnings("remove_artifacts() waveforms_kwargs is deprecated and ignored")
@@ -181,6 +185,7 @@ class RemoveArtifactsRecording(BasePreprocessor):
                     nafter=nafter,
                     operator=mode,
                     return_scaled=False,
+                    **job_kwargs,
                 )
                 artifacts = {}
                 for i, label in enumerate(sorting.unit_ids):
@@ -226,6 +231,14 @@ class RemoveArtifactsRecording(BasePreprocessor):
 
 
 class RemoveArtifactsRecordingSegment(BasePreprocessorSegment):
+    """
+    The triggers are sorted at construction so that the artifacts of a chunk are found with a binary search.
+    In "zeros" mode, the artifact periods are an `IntervalSet` and are all zeroed by `_remove_zeros()`, also the
+    periods of triggers outside of the chunk, so that the result does not depend on the chunking.
+    Artifacts that are far enough from the other ones and from the chunk borders (so that their result does not
+    depend on the order in which artifacts are processed) are handled all at once, the other ones one by one.
+    """
+
     def __init__(
         self,
         parent_recording_segment,
@@ -241,19 +254,64 @@ class RemoveArtifactsRecordingSegment(BasePreprocessorSegment):
     ):
         BasePreprocessorSegment.__init__(self, parent_recording_segment)
 
-        self.triggers = np.asarray(triggers, dtype="int64")
+        triggers = np.asarray(triggers, dtype="int64")
+        order = np.argsort(triggers, kind="stable")
+        self.triggers = triggers[order]
         self.pad = pad
         self.mode = mode
         self.artifacts = artifacts
         if self.artifacts is not None:
             for key, value in self.artifacts.items():
                 self.artifacts[key] = np.array(value)
-        self.labels = np.asarray(labels)
+        self.labels = np.asarray(labels)[order] if len(labels) > 0 else np.asarray(labels)
         self.fit_samples = fit_samples
         self.scale_amplitude = scale_amplitude
         self.time_pad = time_pad
         self.sparsity = sparsity
 
+        pad_before, pad_after = (0, 0) if pad is None else pad
+        if mode == "zeros":
+            self._periods = IntervalSet(self.triggers - pad_before, self.triggers + pad_after + 1)
+        elif mode in ("linear", "cubic"):
+            # the gap and the samples used for the fit, relative to the trigger
+            self._pre_end = -pad_before - 1
+            self._post_start = pad_after + 1
+            self._gap_offsets = np.arange(self._pre_end + 1, self._post_start)
+            pre_idx = self._pre_end - self.fit_samples[::-1]
+            post_idx = self._post_start + self.fit_samples
+            self._fit_offsets = np.hstack((pre_idx, post_idx))
+            self._fit_windows = [
+                np.arange(idx - 3, idx + 1) if idx == pre_idx[-1] else np.arange(idx - 2, idx + 3) for idx in pre_idx
+            ] + [np.arange(idx, idx + 4) if idx == post_idx[0] else np.arange(idx - 2, idx + 3) for idx in post_idx]
+            if mode == "linear":
+                # only the closest fit points on each side are used by the linear interpolation of the gap
+                self._support = (self._pre_end - 3, self._post_start + 3)
+            else:
+                support = np.concatenate(self._fit_windows)
+                self._support = (min(support.min(), self._pre_end + 1), max(support.max(), self._post_start - 1))
+            # two artifacts closer than this interact (the fit samples of one are in the gap of the other)
+            self._min_distance = (
+                max(self._support[1] - self._gap_offsets[0], self._gap_offsets[-1] - self._support[0]) + 1
+            )
+            if mode == "cubic" and len(self._fit_offsets) >= 5:
+                import scipy.interpolate
+
+                # the spline is linear in the fit values: its values on the gap are a fixed combination of them
+                interp_function = scipy.interpolate.interp1d(
+                    self._fit_offsets,
+                    np.eye(len(self._fit_offsets)),
+                    kind="cubic",
+                    axis=0,
+                    bounds_error=False,
+                    fill_value="extrapolate",
+                )
+                self._cubic_kernel = interp_function(self._gap_offsets)
+            else:
+                self._cubic_kernel = None
+        elif mode in ("average", "median"):
+            self._support = (-pad_before - time_pad, pad_after + time_pad)
+            self._min_distance = pad_before + pad_after + 2 * time_pad
+
     def get_traces(self, start_frame, end_frame, channel_indices):
         if self.mode in ["average", "median"]:
             traces = self.parent_recording_segment.get_traces(start_frame, end_frame, slice(None))
@@ -261,186 +319,267 @@ class RemoveArtifactsRecordingSegment(BasePreprocessorSegment):
             traces = self.parent_recording_segment.get_traces(start_frame, end_frame, channel_indices)
         traces = traces.copy()
 
-        mask = (self.triggers >= start_frame) & (self.triggers < end_frame)
-        triggers = self.triggers[mask] - start_frame
-        labels = self.labels[mask]
+        if self.mode == "zeros":
+            self._remove_zeros(traces, start_frame, end_frame)
+            return traces
+
+        i0, i1 = np.searchsorted(self.triggers, [start_frame, end_frame], side="left")
+        triggers = self.triggers[i0:i1] - start_frame
+        labels = self.labels[i0:i1]
+
+        if triggers.size == 0:
+            if self.mode in ["average", "median"]:
+                traces = traces[:, channel_indices]
+            return traces
+
+        if self.mode in ["linear", "cubic"]:
+            isolated = self._get_isolated(triggers, traces.shape[0])
+            for trig in triggers[~isolated]:
+                self._interpolate_artifact(traces, trig)
+            self._interpolate_isolated_artifacts(traces, triggers[isolated])
+        elif self.mode in ["average", "median"]:
+            isolated = self._get_isolated(triggers, traces.shape[0])
+            for label, trig in zip(labels[~isolated], triggers[~isolated]):
+                self._subtract_artifact(traces, trig, label)
+            for label in np.unique(labels[isolated]):
+                self._subtract_isolated_artifacts(traces, triggers[isolated & (labels == label)], label)
+            traces = traces[:, channel_indices]
+
+        return traces
+
+    def _get_isolated(self, triggers, num_samples):
+        """
+        Mask of the artifacts that do not interact with another artifact nor with the chunk borders.
+        """
+        distances = np.diff(triggers)
+        isolated = (triggers + self._support[0] > 0) & (triggers + self._support[1] < num_samples - 1)
+        isolated[1:] &= distances >= self._min_distance
+        isolated[:-1] &= distances >= self._min_distance
+        return isolated
+
+    def _remove_zeros(self, traces, start_frame, end_frame):
+        """
+        Zero the artifact periods overlapping the chunk, including the ones of triggers outside of the chunk.
+        """
+        first, last = self._periods.find_overlapping(start_frame, end_frame)
+        if last > first:
+            traces[self._periods.get_mask(start_frame, end_frame), :] = 0
+
+    def _interpolate_isolated_artifacts(self, traces, triggers):
+        if triggers.size == 0:
+            return
+        gap_idx = triggers[:, None] + self._gap_offsets[None, :]
+        if self.mode == "linear":
+            pre_idx = triggers + self._pre_end
+            post_idx = triggers + self._post_start
+            pre_vals = np.median(traces[pre_idx[:, None] + np.arange(-3, 1)], axis=1)
+            post_vals = np.median(traces[post_idx[:, None] + np.arange(0, 4)], axis=1)
+            # same float64 computation as scipy.interpolate.interp1d()
+            slope = (post_vals - pre_vals).astype("float64") / (self._post_start - self._pre_end)
+            values = slope[:, None, :] * (self._gap_offsets - self._pre_end)[None, :, None] + pre_vals[:, None, :]
+        else:
+            fit_vals = np.stack(
+                [np.median(traces[triggers[:, None] + window], axis=1) for window in self._fit_windows], axis=1
+            )
+            values = np.einsum("gf,afc->agc", self._cubic_kernel, fit_vals)
+        traces[gap_idx] = values
+
+    def _interpolate_artifact(self, traces, trig):
+        import scipy.interpolate
 
         pad = self.pad
+        if pad is None:
+            pre_data_end_idx = trig - 1
+            post_data_start_idx = trig + 1
+        else:
+            pre_data_end_idx = trig - pad[0] - 1
+            post_data_start_idx = trig + pad[1] + 1
 
-        if self.mode == "zeros":
-            for trig in triggers:
-                if pad is None:
-                    traces[trig, :] = 0
-                else:
-                    if trig - pad[0] > 0 and trig + pad[1] < end_frame - start_frame:
-                        traces[trig - pad[0] : trig + pad[1] + 1, :] = 0
-                    elif trig - pad[0] <= 0 and trig + pad[1] >= end_frame - start_frame:
-                        traces[:] = 0
-                    elif trig - pad[0] <= 0:
-                        traces[: trig + pad[1], :] = 0
-                    elif trig + pad[1] >= end_frame - start_frame:
-                        traces[trig - pad[0] :, :] = 0
-        elif self.mode in ["linear", "cubic"]:
-            import scipy.interpolate
+        # Generate fit points from the sample points determined
+        # pre_idx = pre_data_end_idx - self.rev_fit_samples + 1
+        pre_idx = pre_data_end_idx - self.fit_samples[::-1]
+        post_idx = post_data_start_idx + self.fit_samples
+
+        # Get indices of the gap to fill
+        gap_idx = np.arange(pre_data_end_idx + 1, post_data_start_idx + 0)
+
+        # Make sure we are not going out of bounds
+        gap_idx = gap_idx[gap_idx >= 0]
+        gap_idx = gap_idx[gap_idx < traces.shape[0]]
+
+        # correct for out of bounds indices on both sides:
+        if np.max(post_idx) >= traces.shape[0]:
+            post_idx = post_idx[post_idx < traces.shape[0]]
+
+        if np.min(pre_idx) < 0:
+            pre_idx = pre_idx[pre_idx >= 0]
 
+        # fit x values
+        all_idx = np.hstack((pre_idx, post_idx))
+
+        # fit y values
+        interp_traces = traces[all_idx, :]
+
+        # Get the median value from 5 samples around each fit point
+        # for robustness to noise / small fluctuations
+        pre_vals = []  #  np.zeros((0, traces.shape[1]), dtype=traces.dtype)1
+        for idx in iter(pre_idx):
+            if idx == pre_idx[-1]:
+                idxs = np.arange(idx - 3, idx + 1)
+            else:
+                idxs = np.arange(idx - 2, idx + 3)
+            if np.min(idxs) < 0:
+                idxs = idxs[idxs >= 0]
+            median_vals = np.median(traces[idxs, :], axis=0, keepdims=True)
+            pre_vals.append(median_vals)
+        post_vals = []
+        for idx in iter(post_idx):
+            if idx == post_idx[0]:
+                idxs = np.arange(idx, idx + 4)
+            else:
+                idxs = np.arange(idx - 2, idx + 3)
+            if np.max(idxs) >= traces.shape[0]:
+                idxs = idxs[idxs < traces.shape[0]]
+            median_vals = np.median(traces[idxs, :], axis=0, keepdims=True)
+            post_vals.append(median_vals)
+
+        if len(all_idx) > 0:
+            interp_traces = np.concatenate(pre_vals + post_vals, axis=0)
+
+        if self.mode == "cubic" and len(all_idx) >= 5:
+            # Enough fit points present on either side to do cubic spline fit:
+            interp_function = scipy.interpolate.interp1d(
+                all_idx, interp_traces, kind="cubic", axis=0, bounds_error=False, fill_value="extrapolate"
+            )
+            traces[gap_idx, :] = interp_function(gap_idx)
+        elif self.mode == "linear" and len(all_idx) >= 2:
+            # Enough fit points present for a linear fit
+            interp_function = scipy.interpolate.interp1d(
+                all_idx, interp_traces, kind="linear", axis=0, bounds_error=False, fill_value="extrapolate"
+            )
+            traces[gap_idx, :] = interp_function(gap_idx)
+        elif len(pre_idx) > len(post_idx):
+            # not enough fit points, fill with nearest neighbour on side with the most data points
+            traces[gap_idx, :] = np.repeat(traces[[pre_idx[-1]], :], len(gap_idx), axis=0)
+        elif len(post_idx) > len(pre_idx):
+            # not enough fit points, fill with nearest neighbour on side with the most data points
+            traces[gap_idx, :] = np.repeat(traces[[post_idx[0]], :], len(gap_idx), axis=0)
+        elif len(all_idx) > 0:
+            # not enough fit points, both sides tied for most data points, fill with last pre value
+            traces[gap_idx, :] = np.repeat(traces[[pre_idx[-1]], :], len(gap_idx), axis=0)
+        else:
+            # No data to interpolate from on either side of gap;
+            # Fill with zeros
+            traces[gap_idx, :] = 0
+
+    def _subtract_isolated_artifacts(self, traces, triggers, label):
+        if triggers.size == 0:
+            return
+        pad = self.pad
+        mask = self.sparsity[label] if self.sparsity is not None else slice(None)
+        artifact = self.artifacts[label]
+        if artifact.shape[0] != pad[0] + pad[1]:
+            # user given artifacts of another duration
             for trig in triggers:
-                if pad is None:
-                    pre_data_end_idx = trig - 1
-                    post_data_start_idx = trig + 1
-                else:
-                    pre_data_end_idx = trig - pad[0] - 1
-                    post_data_start_idx = trig + pad[1] + 1
-
-                # Generate fit points from the sample points determined
-                # pre_idx = pre_data_end_idx - self.rev_fit_samples + 1
-                pre_idx = pre_data_end_idx - self.fit_samples[::-1]
-                post_idx = post_data_start_idx + self.fit_samples
-
-                # Get indices of the gap to fill
-                gap_idx = np.arange(pre_data_end_idx + 1, post_data_start_idx + 0)
-
-                # Make sure we are not going out of bounds
-                gap_idx = gap_idx[gap_idx >= 0]
-                gap_idx = gap_idx[gap_idx < traces.shape[0]]
-
-                # correct for out of bounds indices on both sides:
-                if np.max(post_idx) >= traces.shape[0]:
-                    post_idx = post_idx[post_idx < traces.shape[0]]
-
-                if np.min(pre_idx) < 0:
-                    pre_idx = pre_idx[pre_idx >= 0]
-
-                # fit x values
-                all_idx = np.hstack((pre_idx, post_idx))
-
-                # fit y values
-                interp_traces = traces[all_idx, :]
-
-                # Get the median value from 5 samples around each fit point
-                # for robustness to noise / small fluctuations
-                pre_vals = []  #  np.zeros((0, traces.shape[1]), dtype=traces.dtype)1
-                for idx in iter(pre_idx):
-                    if idx == pre_idx[-1]:
-                        idxs = np.arange(idx - 3, idx + 1)
-                    else:
-                        idxs = np.arange(idx - 2, idx + 3)
-                    if np.min(idxs) < 0:
-                        idxs = idxs[idxs >= 0]
-                    median_vals = np.median(traces[idxs, :], axis=0, keepdims=True)
-                    pre_vals.append(median_vals)
-                post_vals = []
-                for idx in iter(post_idx):
-                    if idx == post_idx[0]:
-                        idxs = np.arange(idx, idx + 4)
-                    else:
-                        idxs = np.arange(idx - 2, idx + 3)
-                    if np.max(idxs) >= traces.shape[0]:
-                        idxs = idxs[idxs < traces.shape[0]]
-                    median_vals = np.median(traces[idxs, :], axis=0, keepdims=True)
-                    post_vals.append(median_vals)
-
-                if len(all_idx) > 0:
-                    interp_traces = np.concatenate(pre_vals + post_vals, axis=0)
-
-                if self.mode == "cubic" and len(all_idx) >= 5:
-                    # Enough fit points present on either side to do cubic spline fit:
-                    interp_function = scipy.interpolate.interp1d(
-                        all_idx, interp_traces, kind="cubic", axis=0, bounds_error=False, fill_value="extrapolate"
-                    )
-                    traces[gap_idx, :] = interp_function(gap_idx)
-                elif self.mode == "linear" and len(all_idx) >= 2:
-                    # Enough fit points present for a linear fit
-                    interp_function = scipy.interpolate.interp1d(
-                        all_idx, interp_traces, kind="linear", axis=0, bounds_error=False, fill_value="extrapolate"
-                    )
-                    traces[gap_idx, :] = interp_function(gap_idx)
-                elif len(pre_idx) > len(post_idx):
-                    # not enough fit points, fill with nearest neighbour on side with the most data points
-                    traces[gap_idx, :] = np.repeat(traces[[pre_idx[-1]], :], len(gap_idx), axis=0)
-                elif len(post_idx) > len(pre_idx):
-                    # not enough fit points, fill with nearest neighbour on side with the most data points
-                    traces[gap_idx, :] = np.repeat(traces[[post_idx[0]], :], len(gap_idx), axis=0)
-                elif len(all_idx) > 0:
-                    # not enough fit points, both sides tied for most data points, fill with last pre value
-                    traces[gap_idx, :] = np.repeat(traces[[pre_idx[-1]], :], len(gap_idx), axis=0)
-                else:
-                    # No data to interpolate from on either side of gap;
-                    # Fill with zeros
-                    traces[gap_idx, :] = 0
+                self._subtract_artifact(traces, trig, label)
+            return
 
-        elif self.mode in ["average", "median"]:
-            for label, trig in zip(labels, triggers):
-                if self.sparsity is not None:
-                    mask = self.sparsity[label]
-                else:
-                    mask = None
-                artifact_duration = len(self.artifacts[label])
-                if self.time_pad > 0:
-                    jitters = np.arange(-self.time_pad, self.time_pad, 1)
-                else:
-                    jitters = np.array([0])
-
-                nb_jitters = len(jitters)
-                best_amplitudes = np.zeros(nb_jitters, dtype=np.float32)
-
-                for count, padding in enumerate(jitters):
-                    t_trig = trig + padding
-
-                    if t_trig - pad[0] >= 0 and t_trig + pad[1] < end_frame - start_frame:
-                        trace_slice = slice(t_trig - pad[0], t_trig + pad[1])
-                        artifact_slice = slice(0, artifact_duration)
-                    elif t_trig - pad[0] < 0:
-                        trace_slice = slice(0, t_trig + pad[1])
-                        duration = t_trig + pad[1]
-                        artifact_slice = slice(artifact_duration - duration, artifact_duration)
-                    elif t_trig + pad[1] >= end_frame - start_frame:
-                        trace_slice = slice(t_trig - pad[0], end_frame - start_frame)
-                        duration = (end_frame - start_frame) - (t_trig - pad[0])
-                        artifact_slice = slice(0, duration)
-
-                    trace_slice_values = traces[trace_slice]
-                    if mask is not None:
-                        trace_slice_values = trace_slice_values[:, mask]
-
-                    artifact_slice_values = self.artifacts[label][artifact_slice]
-
-                    norm = np.linalg.norm(trace_slice_values) * np.linalg.norm(artifact_slice_values)
-                    best_amplitudes[count] = (
-                        np.dot(trace_slice_values.flatten(), artifact_slice_values.flatten()) / norm
-                    )
-
-                if nb_jitters > 0:
-                    idx_best_jitter = np.argmax(best_amplitudes)
-                    t_trig = trig + jitters[idx_best_jitter]
-
-                    if t_trig - pad[0] >= 0 and t_trig + pad[1] < end_frame - start_frame:
-                        trace_slice = slice(t_trig - pad[0], t_trig + pad[1])
-                        artifact_slice = slice(0, artifact_duration)
-                    elif t_trig - pad[0] < 0:
-                        trace_slice = slice(0, t_trig + pad[1])
-                        duration = t_trig + pad[1]
-                        artifact_slice = slice(artifact_duration - duration, artifact_duration)
-                    elif t_trig + pad[1] >= end_frame - start_frame:
-                        trace_slice = slice(t_trig - pad[0], end_frame - start_frame)
-                        duration = (end_frame - start_frame) - (t_trig - pad[0])
-                        artifact_slice = slice(0, duration)
-                else:
-                    idx_best_jitter = 0
-
-                if self.scale_amplitude:
-                    best_amp = best_amplitudes[idx_best_jitter]
-                else:
-                    best_amp = 1
-
-                if mask is not None:
-                    traces[trace_slice][:, mask] -= (best_amp * self.artifacts[label][artifact_slice]).astype(
-                        traces.dtype
-                    )
-                else:
-                    traces[trace_slice] -= (best_amp * self.artifacts[label][artifact_slice]).astype(traces.dtype)
-            traces = traces[:, channel_indices]
+        window = np.arange(-pad[0], pad[1])
+        if self.time_pad > 0:
+            jitters = np.arange(-self.time_pad, self.time_pad, 1)
+        else:
+            jitters = np.array([0])
+
+        artifact_norm = np.linalg.norm(artifact)
+        best_amplitudes = np.zeros((triggers.size, jitters.size), dtype=np.float32)
+        if jitters.size > 1 or self.scale_amplitude:
+            flat_artifact = artifact.reshape(-1)
+            for count, jitter in enumerate(jitters):
+                snippets = traces[(triggers + jitter)[:, None] + window][:, :, mask].reshape(triggers.size, -1)
+                norm = np.linalg.norm(snippets, axis=1) * artifact_norm
+                best_amplitudes[:, count] = (snippets @ flat_artifact) / norm
+        best_jitters = np.argmax(best_amplitudes, axis=1)
+
+        if self.scale_amplitude:
+            best_amp = best_amplitudes[np.arange(triggers.size), best_jitters]
+        else:
+            best_amp = np.ones(triggers.size, dtype=artifact.dtype)
 
-        return traces
+        sample_idx = (triggers + jitters[best_jitters])[:, None] + window
+        subtracted = (best_amp[:, None, None] * artifact[None, :, :]).astype(traces.dtype)
+        if isinstance(mask, slice):
+            traces[sample_idx] -= subtracted
+        else:
+            channel_idx = np.flatnonzero(mask)
+            traces[sample_idx[:, :, None], channel_idx] -= subtracted
+
+    def _subtract_artifact(self, traces, trig, label):
+        pad = self.pad
+        num_samples = traces.shape[0]
+        if self.sparsity is not None:
+            mask = self.sparsity[label]
+        else:
+            mask = None
+        artifact_duration = len(self.artifacts[label])
+        if self.time_pad > 0:
+            jitters = np.arange(-self.time_pad, self.time_pad, 1)
+        else:
+            jitters = np.array([0])
+
+        nb_jitters = len(jitters)
+        best_amplitudes = np.zeros(nb_jitters, dtype=np.float32)
+
+        for count, padding in enumerate(jitters):
+            t_trig = trig + padding
+
+            if t_trig - pad[0] >= 0 and t_trig + pad[1] < num_samples:
+                trace_slice = slice(t_trig - pad[0], t_trig + pad[1])
+                artifact_slice = slice(0, artifact_duration)
+            elif t_trig - pad[0] < 0:
+                trace_slice = slice(0, t_trig + pad[1])
+                duration = t_trig + pad[1]
+                artifact_slice = slice(artifact_duration - duration, artifact_duration)
+            elif t_trig + pad[1] >= num_samples:
+                trace_slice = slice(t_trig - pad[0], num_samples)
+                duration = num_samples - (t_trig - pad[0])
+                artifact_slice = slice(0, duration)
+
+            trace_slice_values = traces[trace_slice]
+            if mask is not None:
+                trace_slice_values = trace_slice_values[:, mask]
+
+            artifact_slice_values = self.artifacts[label][artifact_slice]
+
+            norm = np.linalg.norm(trace_slice_values) * np.linalg.norm(artifact_slice_values)
+            best_amplitudes[count] = np.dot(trace_slice_values.flatten(), artifact_slice_values.flatten()) / norm
+
+        if nb_jitters > 0:
+            idx_best_jitter = np.argmax(best_amplitudes)
+            t_trig = trig + jitters[idx_best_jitter]
+
+            if t_trig - pad[0] >= 0 and t_trig + pad[1] < num_samples:
+                trace_slice = slice(t_trig - pad[0], t_trig + pad[1])
+                artifact_slice = slice(0, artifact_duration)
+            elif t_trig - pad[0] < 0:
+                trace_slice = slice(0, t_trig + pad[1])
+                duration = t_trig + pad[1]
+                artifact_slice = slice(artifact_duration - duration, artifact_duration)
+            elif t_trig + pad[1] >= num_samples:
+                trace_slice = slice(t_trig - pad[0], num_samples)
+                duration = num_samples - (t_trig - pad[0])
+                artifact_slice = slice(0, duration)
+        else:
+            idx_best_jitter = 0
+
+        if self.scale_amplitude:
+            best_amp = best_amplitudes[idx_best_jitter]
+        else:
+            best_amp = 1
+
+        if mask is not None:
+            traces[trace_slice][:, mask] -= (best_amp * self.artifacts[label][artifact_slice]).astype(traces.dtype)
+        else:
+            traces[trace_slice] -= (best_amp * self.artifacts[label][artifact_slice]).astype(traces.dtype)
 
 
 # function for API
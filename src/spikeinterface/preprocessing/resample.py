@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import numpy as np
 import warnings
+from fractions import Fraction
 
 from spikeinterface.core.core_tools import (
     define_function_from_class,
@@ -17,10 +18,15 @@ class ResampleRecording(BasePreprocessor):
     """
     Resample the recording extractor traces.
 
-    If the original sampling rate is multiple of the resample_rate, it will use
-    the signal.decimate method from scipy. In other cases, it uses signal.resample. In the
-    later case, the resulting signal can have issues on the edges, mainly on the
-    rightmost.
+    With method="fft" (default), each chunk (with margin) is resampled with signal.decimate from scipy if the
+    original sampling rate is multiple of the resample_rate, and with signal.resample in other cases. In the
+    later case, the resulting signal can have issues on the edges, mainly on the rightmost.
+
+    With method="polyphase", the traces are resampled by the rational ratio up / down with a
+    polyphase FIR filter (the same anti-aliasing filter as `scipy.signal.resample_poly`). The margin of each
+    chunk is given exactly by the filter length, so the output does not depend on the chunking: traces
+    computed by chunks are identical to the traces computed at once, and equal to `resample_poly` applied to
+    the whole signal (zero padding on the edges).
 
     Parameters
     ----------
@@ -28,12 +34,20 @@ class ResampleRecording(BasePreprocessor):
         The recording extractor to be re-referenced
     resample_rate : int
         The resampling frequency
-    margin_ms : float, default: 100.0
-        Margin in ms for computations, will be used to decrease edge effects.
+    margin_ms : float or None, default: None
+        Margin in ms for computations, will be used to decrease edge effects. Only used with method="fft"
+        (None means 100 ms). The margin of the "polyphase" method is the half length of the filter, so
+        margin_ms must not be given with this method.
     dtype : dtype or None, default: None
         The dtype of the returned traces. If None, the dtype of the parent recording is used.
     skip_checks : bool, default: False
         If True, checks on sampling frequencies and cutoff filter frequencies are skipped
+    method : "fft" | "polyphase", default: "fft"
+        The resampling engine
+    max_denominator : int, default: 1000
+        With method="polyphase", the ratio between the sampling frequencies must be a fraction up / down with
+        up and down lower or equal to max_denominator (the filter length is proportional to max(up, down)).
+        Otherwise the "fft" method is used.
 
     Returns
     -------
@@ -46,9 +60,11 @@ class ResampleRecording(BasePreprocessor):
         self,
         recording,
         resample_rate,
-        margin_ms=100.0,
+        margin_ms=None,
         dtype=None,
         skip_checks=False,
+        method="fft",
+        max_denominator=1000,
     ):
         # Floating point resampling rates can lead to unexpected results, avoid actively
         msg = "Non integer resampling rates can lead to unexpected results."
@@ -63,22 +79,44 @@ class ResampleRecording(BasePreprocessor):
         if skip_checks:
             assert check_nyquist(recording, resample_rate), "The requested resample rate would induce errors!"
 
+        assert method in ("polyphase", "fft"), f"method must be 'polyphase' or 'fft', not {method}"
+        if method == "polyphase" and margin_ms is not None:
+            raise ValueError("margin_ms is not used with method='polyphase', the margin is given by the filter length")
+
         # Get a margin to avoid issues later
-        margin = int(margin_ms * recording.get_sampling_frequency() / 1000)
+        margin = int((100.0 if margin_ms is None else margin_ms) * recording.get_sampling_frequency() / 1000)
+
+        if method == "polyphase":
+            ratio = get_resample_ratio(self._orig_samp_freq, resample_rate, max_denominator=max_denominator)
+            if ratio is None:
+                warnings.warn(
+                    f"The ratio {resample_rate} / {self._orig_samp_freq} is not a fraction with terms lower than "
+                    f"max_denominator={max_denominator}, the 'fft' method is used"
+                )
+                method = "fft"
+            else:
+                filter_bank = PolyphaseFilterBank(*ratio)
 
         BasePreprocessor.__init__(self, recording, sampling_frequency=resample_rate, dtype=dtype)
         # in case there was a time_vector, it will be dropped for sanity.
         for parent_segment in recording._recording_segments:
             parent_segment.time_vector = None
-            self.add_recording_segment(
-                ResampleRecordingSegment(
+            if method == "polyphase":
+                rec_segment = PolyphaseResampleRecordingSegment(
+                    parent_segment,
+                    resample_rate,
+                    filter_bank,
+                    dtype,
+                )
+            else:
+                rec_segment = ResampleRecordingSegment(
                     parent_segment,
                     resample_rate,
                     recording.get_sampling_frequency(),
                     margin,
                     dtype,
                 )
-            )
+            self.add_recording_segment(rec_segment)
 
         self._kwargs = dict(
             recording=recording,
@@ -86,6 +124,8 @@ class ResampleRecording(BasePreprocessor):
             margin_ms=margin_ms,
             dtype=dtype,
             skip_checks=skip_checks,
+            method=method,
+            max_denominator=max_denominator,
         )
 
 
@@ -154,9 +194,105 @@ class ResampleRecordingSegment(BaseRecordingSegment):
         return resampled_traces.astype(self._dtype)
 
 
+class PolyphaseFilterBank:
+    """
+    Anti-aliasing FIR filter for a rational resampling ratio up / down, with the bookkeeping needed to
+    compute any range of output samples exactly.
+
+    The filter is the one of `scipy.signal.resample_poly`: a Kaiser windowed sinc of half length
+    10 * max(up, down) (in the upsampled domain) with a cutoff at the lowest of the two Nyquist frequencies.
+    It is padded with leading zeros so that its center falls on an output sample, which makes the output
+    sample `n` equal to the output `n + delay` of `scipy.signal.upfirdn` on the whole signal.
+    `scipy.signal.upfirdn` evaluates only the non zero taps of each phase (polyphase decomposition) and
+    processes all channels at once.
+    """
+
+    def __init__(self, up, down, window=("kaiser", 5.0)):
+        from scipy import signal
+
+        self.up = int(up)
+        self.down = int(down)
+        max_rate = max(self.up, self.down)
+        half_len = 10 * max_rate
+        h = signal.firwin(2 * half_len + 1, 1.0 / max_rate, window=window) * self.up
+        pre_pad = (self.down - half_len % self.down) % self.down
+        self.filter = np.concatenate([np.zeros(pre_pad), h])
+        self.delay = (half_len + pre_pad) // self.down
+
+    def get_num_samples(self, parent_num_samples):
+        return (int(parent_num_samples) * self.up) // self.down
+
+    def get_parent_range(self, start_frame, end_frame):
+        """
+        Range of parent samples needed to compute the output samples [start_frame, end_frame).
+        The first parent sample is a multiple of `down`, so that the upfirdn phases are always the same.
+        """
+        first = -((len(self.filter) - 1 - (start_frame + self.delay) * self.down) // self.up)
+        parent_start = (first // self.down) * self.down
+        parent_end = ((end_frame - 1 + self.delay) * self.down) // self.up + 1
+        return parent_start, parent_end
+
+    def apply(self, parent_traces, parent_start, start_frame, end_frame):
+        from scipy import signal
+
+        h = self.filter.astype(parent_traces.dtype, copy=False)
+        out = signal.upfirdn(h, parent_traces, up=self.up, down=self.down, axis=0)
+        first = start_frame + self.delay - (parent_start // self.down) * self.up
+        return out[first : first + end_frame - start_frame]
+
+
+class PolyphaseResampleRecordingSegment(BaseRecordingSegment):
+    def __init__(
+        self,
+        parent_recording_segment,
+        resample_rate,
+        filter_bank,
+        dtype,
+    ):
+        BaseRecordingSegment.__init__(
+            self,
+            sampling_frequency=resample_rate,
+            t_start=parent_recording_segment.t_start,
+        )
+        self._parent_segment = parent_recording_segment
+        self._filter_bank = filter_bank
+        self._dtype = dtype
+
+    def get_num_samples(self):
+        return self._filter_bank.get_num_samples(self._parent_segment.get_num_samples())
+
+    def get_traces(self, start_frame, end_frame, channel_indices):
+        parent_start, parent_end = self._filter_bank.get_parent_range(start_frame, end_frame)
+        parent_num_samples = self._parent_segment.get_num_samples()
+
+        # the margin is exact: zeros outside the parent signal, as resample_poly
+        traces = self._parent_segment.get_traces(
+            max(parent_start, 0), min(parent_end, parent_num_samples), channel_indices
+        )
+        traces = traces.astype(np.float32, copy=False)
+        left_pad = max(-parent_start, 0)
+        right_pad = max(parent_end - parent_num_samples, 0)
+        if left_pad > 0 or right_pad > 0:
+            traces = np.pad(traces, [(left_pad, right_pad), (0, 0)], mode="constant")
+
+        resampled_traces = self._filter_bank.apply(traces, parent_start, start_frame, end_frame)
+        return resampled_traces.astype(self._dtype, copy=False)
+
+
 resample = define_function_from_class(source_class=ResampleRecording, name="resample")
 
 
+def get_resample_ratio(parent_rate, resample_rate, max_denominator=1000):
+    """
+    Return the integers (up, down) such that resample_rate / parent_rate == up / down,
+    or None if up or down would be bigger than max_denominator.
+    """
+    ratio = Fraction(resample_rate) / Fraction(parent_rate)
+    if ratio.numerator > max_denominator or ratio.denominator > max_denominator:
+        return None
+    return ratio.numerator, ratio.denominator
+
+
 # Some helpers to do checks
 def check_nyquist(recording, resample_rate):
     # Check that the original and requested sampling rates will not induce aliasing
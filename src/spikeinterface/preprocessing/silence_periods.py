@@ -5,7 +5,7 @@ import numpy as np
 from spikeinterface.core.core_tools import define_function_from_class
 from .basepreprocessor import BasePreprocessor, BasePreprocessorSegment
 
-from ..core import get_random_data_chunks, get_noise_levels
+from ..core import get_random_data_chunks, get_noise_levels, IntervalSet
 from ..core.generate import NoiseGeneratorRecording
 
 
@@ -22,7 +22,8 @@ class SilencedPeriodsRecording(BasePreprocessor):
     recording : RecordingExtractor
         The recording extractor to silance periods
     list_periods : list of lists/arrays
-        One list per segment of tuples (start_frame, end_frame) to silence
+        One list per segment of tuples (start_frame, end_frame) to silence.
+        Overlapping periods are merged.
     noise_levels : array
         Noise levels if already computed
     seed : int | None, default: None
@@ -65,9 +66,6 @@ class SilencedPeriodsRecording(BasePreprocessor):
         for periods in list_periods:
             if len(periods) > 0:
                 assert np.all(np.diff(np.array(periods), axis=1) > 0), "t_stops should be larger than t_starts"
-                assert np.all(
-                    periods[i][1] < periods[i + 1][0] for i in np.arange(len(periods) - 1)
-                ), "Intervals should not overlap"
 
         if mode in ["noise"]:
             if noise_levels is None:
@@ -89,9 +87,7 @@ class SilencedPeriodsRecording(BasePreprocessor):
 
         BasePreprocessor.__init__(self, recording)
         for seg_index, parent_segment in enumerate(recording._recording_segments):
-            periods = list_periods[seg_index]
-            periods = np.asarray(periods, dtype="int64")
-            periods = np.sort(periods, axis=0)
+            periods = IntervalSet.from_periods(list_periods[seg_index])
             rec_segment = SilencedPeriodsRecordingSegment(parent_segment, periods, mode, noise_generator, seg_index)
             self.add_recording_segment(rec_segment)
 
@@ -101,6 +97,7 @@ class SilencedPeriodsRecording(BasePreprocessor):
 class SilencedPeriodsRecordingSegment(BasePreprocessorSegment):
     def __init__(self, parent_recording_segment, periods, mode, noise_generator, seg_index):
         BasePreprocessorSegment.__init__(self, parent_recording_segment)
+        # IntervalSet of the periods to silence
         self.periods = periods
         self.mode = mode
         self.seg_index = seg_index
@@ -110,25 +107,14 @@ class SilencedPeriodsRecordingSegment(BasePreprocessorSegment):
         traces = self.parent_recording_segment.get_traces(start_frame, end_frame, channel_indices)
         traces = traces.copy()
 
-        if len(self.periods) > 0:
-            new_interval = np.array([start_frame, end_frame])
-            lower_index = np.searchsorted(self.periods[:, 1], new_interval[0])
-            upper_index = np.searchsorted(self.periods[:, 0], new_interval[1])
-
-            if upper_index > lower_index:
-                periods_in_interval = self.periods[lower_index:upper_index]
-
-                for period in periods_in_interval:
-                    onset = max(0, period[0] - start_frame)
-                    offset = min(period[1] - start_frame, end_frame)
-
-                    if self.mode == "zeros":
-                        traces[onset:offset, :] = 0
-                    elif self.mode == "noise":
-                        noise = self.noise_generator.get_traces(self.seg_index, start_frame, end_frame)[
-                            :, channel_indices
-                        ]
-                        traces[onset:offset, :] = noise[onset:offset]
+        first, last = self.periods.find_overlapping(start_frame, end_frame)
+        if last > first:
+            mask = self.periods.get_mask(start_frame, end_frame)
+            if self.mode == "zeros":
+                traces[mask, :] = 0
+            elif self.mode == "noise":
+                noise = self.noise_generator.get_traces(self.seg_index, start_frame, end_frame)[:, channel_indices]
+                traces[mask, :] = noise[mask]
 
         return traces
 
@@ -1,7 +1,7 @@
 import operator
 import pytest
 
-from spikeinterface.core import generate_recording
+from spikeinterface.core import generate_recording, NumpyRecording
 
 from spikeinterface.preprocessing import common_reference
 
@@ -157,6 +157,52 @@ def test_common_reference_groups(recording):
     assert np.allclose(traces[:, 1], 0)
 
 
+@pytest.mark.parametrize("operator", ["median", "average"])
+@pytest.mark.parametrize("use_numba", [True, False])
+@pytest.mark.parametrize("dtype", ["float32", "float64"])
+def test_common_reference_local_vectorized(operator, use_numba, dtype, monkeypatch):
+    import sys
+
+    common_reference_module = sys.modules["spikeinterface.preprocessing.common_reference"]
+    if use_numba and not common_reference_module.HAVE_NUMBA:
+        pytest.skip("numba is not installed")
+    monkeypatch.setattr(common_reference_module, "HAVE_NUMBA", use_numba)
+    # small blocks to test the block loop
+    monkeypatch.setattr(common_reference_module, "_local_reference_block_size", 1000)
+
+    recording = generate_recording(durations=[0.5], num_channels=32, seed=0)
+    recording = NumpyRecording(recording.get_traces().astype(dtype), recording.sampling_frequency)
+    recording.set_probe(generate_recording(durations=[0.5], num_channels=32, seed=0).get_probe(), in_place=True)
+    rec_local = common_reference(recording, reference="local", local_radius=(0, 60), operator=operator)
+    neighbors = rec_local._recording_segments[0].neighbors
+    assert len(np.unique([len(n) for n in neighbors.values()])) > 1
+
+    traces = recording.get_traces()
+    operator_func = np.median if operator == "median" else np.mean
+    expected = np.stack(
+        [traces[:, i] - operator_func(traces[:, neighbors[i]], axis=1) for i in range(traces.shape[1])], axis=1
+    )
+    # float64 traces are referenced in float64
+    atol, rtol = (1e-4, 1e-5) if dtype == "float32" else (1e-10, 0)
+    assert rec_local.get_traces().dtype == dtype
+    assert np.allclose(rec_local.get_traces(), expected, atol=atol, rtol=rtol)
+
+    channel_ids = recording.channel_ids[[5, 1, 20]]
+    traces_sub = rec_local.get_traces(channel_ids=channel_ids, start_frame=100, end_frame=2000)
+    assert np.allclose(traces_sub, expected[100:2000, [5, 1, 20]], atol=atol, rtol=rtol)
+
+
+def test_common_reference_global_median_int():
+    recording = generate_recording(durations=[0.5], num_channels=6, seed=0)
+    traces = (recording.get_traces() * 100).astype("int16")
+    recording = NumpyRecording(traces, recording.sampling_frequency)
+    rec_cmr = common_reference(recording, reference="global", operator="median")
+    expected = (traces - np.median(traces, axis=1, keepdims=True)).astype("int16")
+    assert np.array_equal(rec_cmr.get_traces(), expected)
+    # the parent traces are not modified by the inplace operations
+    assert np.array_equal(recording.get_traces(), traces)
+
+
 if __name__ == "__main__":
     recording = _generate_test_recording()
     test_common_reference(recording)
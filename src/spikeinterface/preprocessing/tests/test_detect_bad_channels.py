@@ -5,7 +5,7 @@ from spikeinterface import NumpyRecording, get_random_data_chunks
 from probeinterface import generate_linear_probe
 
 from spikeinterface.core import generate_recording
-from spikeinterface.preprocessing import detect_bad_channels, highpass_filter
+from spikeinterface.preprocessing import detect_bad_channels, detect_bad_channels_over_time, highpass_filter
 
 try:
     # WARNING : this is not this package https://pypi.org/project/neurodsp/
@@ -98,6 +98,41 @@ def test_detect_bad_channels_extremes(outside_channels_location):
         )
 
 
+def test_detect_bad_channels_over_time():
+    num_channels = 32
+    sampling_frequency = 30000.0
+    duration = 12.0
+    num_timepoints = int(sampling_frequency * duration)
+
+    rng = np.random.default_rng(seed=0)
+    traces = rng.standard_normal((num_timepoints, num_channels)).astype("float32")
+    traces += 3 * rng.standard_normal((num_timepoints, 1)).astype("float32")
+    # channel 10 is dead only between 4s and 8s
+    dead_slice = slice(int(4 * sampling_frequency), int(8 * sampling_frequency))
+    traces[dead_slice, 10] *= 0.01
+
+    rec = NumpyRecording([traces], sampling_frequency)
+    rec.set_channel_gains(1)
+    rec.set_channel_offsets(0)
+    probe = generate_linear_probe(num_elec=num_channels)
+    probe.set_device_channel_indices(np.arange(num_channels))
+    rec.set_probe(probe, in_place=True)
+
+    bad_channel_masks, channel_labels, window_frames = detect_bad_channels_over_time(rec, window_duration_s=2.0)
+    assert len(bad_channel_masks) == 1
+    assert bad_channel_masks[0].shape == (6, num_channels)
+    assert np.array_equal(window_frames[0][:, 0], np.arange(6) * int(2 * sampling_frequency))
+    assert np.array_equal(np.flatnonzero(bad_channel_masks[0].any(axis=0)), [10])
+    assert np.array_equal(bad_channel_masks[0][:, 10], [False, False, True, True, False, False])
+    assert np.all(channel_labels[0][2:4, 10] == "dead")
+
+    # strided subset of each window and parallel processing
+    bad_channel_masks_strided, _, _ = detect_bad_channels_over_time(
+        rec, window_duration_s=2.0, num_chunks_per_window=3, n_jobs=2, progress_bar=False
+    )
+    assert np.array_equal(bad_channel_masks_strided[0], bad_channel_masks[0])
+
+
 @pytest.mark.skipif(not HAVE_NPIX, reason="ibl-neuropixel is not installed")
 @pytest.mark.parametrize("num_channels", [32, 64, 384])
 def test_detect_bad_channels_ibl(num_channels):
@@ -0,0 +1,66 @@
+import pytest
+
+import numpy as np
+from spikeinterface.core import NumpyRecording
+
+from spikeinterface.preprocessing import astype, clip, rectify, scale, unsigned_to_signed, zscore, center
+import spikeinterface.preprocessing.elementwise as elementwise
+
+
+def _make_recording(dtype):
+    rng = np.random.default_rng(0)
+    traces = rng.normal(0, 300, size=(3000, 8))
+    dtype = np.dtype(dtype)
+    if dtype.kind == "u":
+        traces += 2 ** (dtype.itemsize * 8 - 1)
+    if dtype.kind in "iu":
+        traces = np.clip(traces, np.iinfo(dtype).min, np.iinfo(dtype).max)
+    traces = traces.astype(dtype)
+    # extreme values to test the wrap-around of integer casts
+    if dtype == np.dtype("int16"):
+        traces[0, :2] = [-32768, 32767]
+    return NumpyRecording([traces], 30000.0)
+
+
+chains = {
+    "scale_clip_astype": lambda rec: astype(
+        clip(scale(rec, gain=0.195, offset=2.5, dtype="float32"), a_min=-50.3, a_max=40.7), "int16"
+    ),
+    "scale_scale": lambda rec: scale(scale(rec, gain=1.0, offset=-3, dtype="int32"), gain=0.5, dtype="int32"),
+    "clip_overlapping": lambda rec: clip(clip(rec, a_min=-100.7, a_max=-200.2), a_min=0.5),
+    "rectify_astype": lambda rec: astype(rectify(rec), "float32"),
+    "center_zscore": lambda rec: zscore(center(rec, seed=0), seed=0),
+    "astype_round": lambda rec: astype(scale(rec, gain=0.1, offset=0.05), "int16", round=True),
+}
+
+
+@pytest.mark.skipif(not elementwise.HAVE_NUMBA, reason="numba is not installed")
+@pytest.mark.parametrize("dtype", ["int16", "int32", "float32", "float64"])
+@pytest.mark.parametrize("chain", list(chains.keys()))
+def test_fused_elementwise_chain(dtype, chain, monkeypatch):
+    recording = chains[chain](_make_recording(dtype))
+    channel_ids = recording.channel_ids[[1, 4, 5]]
+
+    fused_traces = recording.get_traces(start_frame=10, end_frame=2500, channel_ids=channel_ids)
+    monkeypatch.setattr(elementwise, "HAVE_NUMBA", False)
+    traces = recording.get_traces(start_frame=10, end_frame=2500, channel_ids=channel_ids)
+
+    assert fused_traces.dtype == traces.dtype == recording.get_dtype()
+    np.testing.assert_array_equal(fused_traces, traces)
+
+
+@pytest.mark.skipif(not elementwise.HAVE_NUMBA, reason="numba is not installed")
+@pytest.mark.parametrize("dtype", ["uint8", "uint16"])
+def test_fused_unsigned_to_signed(dtype, monkeypatch):
+    rec = _make_recording(dtype)
+    recordings = [
+        unsigned_to_signed(rec),
+        unsigned_to_signed(rec, bit_depth=7),
+        scale(unsigned_to_signed(rec), gain=0.195, dtype="int16"),
+    ]
+    fused_traces = [recording.get_traces() for recording in recordings]
+    monkeypatch.setattr(elementwise, "HAVE_NUMBA", False)
+    for recording, fused in zip(recordings, fused_traces):
+        traces = recording.get_traces()
+        assert fused.dtype == traces.dtype
+        np.testing.assert_array_equal(fused, traces)
@@ -208,6 +208,22 @@ def test_filter_unsigned():
     rec3 = notch_filter(rec, freq=300.0, q=10, dtype="float32")
 
 
+def test_filter_storage_chunk_size(tmp_path):
+    from spikeinterface.core import ZarrRecordingExtractor
+    from spikeinterface.core.job_tools import ensure_chunk_size
+    from spikeinterface.preprocessing import common_reference, decimate
+
+    recording = generate_recording(num_channels=4, durations=[2.0], seed=0)
+    ZarrRecordingExtractor.write_recording(recording, tmp_path / "rec.zarr", chunk_size=7000)
+    rec_zarr = ZarrRecordingExtractor(tmp_path / "rec.zarr")
+
+    # preprocessors that keep the frames forward the storage chunks of the source
+    rec_f = common_reference(bandpass_filter(rec_zarr))
+    assert rec_f.get_storage_chunk_size() == 7000
+    assert ensure_chunk_size(rec_f, chunk_duration="1s") == 28000
+    assert decimate(rec_f, 2).get_storage_chunk_size() is None
+
+
 @pytest.mark.skip("OpenCL not tested")
 def test_filter_opencl():
     rec = generate_recording(
@@ -0,0 +1,92 @@
+import pytest
+
+import numpy as np
+from spikeinterface.core import generate_recording
+
+from spikeinterface.preprocessing import bandpass_filter, decimate, filter_bank, write_filter_bank
+
+
+bands = dict(ap=dict(band=[300.0, 6000.0]), lfp=dict(band=[0.5, 300.0], decimation_factor=12, margin_ms=50.0))
+
+
+def test_filter_bank():
+    recording = generate_recording(num_channels=4, durations=[2.0, 1.5], seed=0)
+    band_recordings = filter_bank(recording, bands)
+
+    ap = band_recordings["ap"]
+    lfp = band_recordings["lfp"]
+    assert ap.get_sampling_frequency() == recording.get_sampling_frequency()
+    assert lfp.get_sampling_frequency() == recording.get_sampling_frequency() / 12
+    ap_ref = bandpass_filter(recording, freq_min=300.0, freq_max=6000.0)
+    lfp_ref = decimate(bandpass_filter(recording, freq_min=0.5, freq_max=300.0, margin_ms=50.0), 12)
+
+    for segment_index in range(recording.get_num_segments()):
+        assert lfp.get_num_samples(segment_index) == lfp_ref.get_num_samples(segment_index)
+        for start_frame, end_frame in [(0, 12000), (12000, 24000), (24000, None)]:
+            traces = ap.get_traces(segment_index=segment_index, start_frame=start_frame, end_frame=end_frame)
+            traces_ref = ap_ref.get_traces(segment_index=segment_index, start_frame=start_frame, end_frame=end_frame)
+            np.testing.assert_allclose(traces, traces_ref, rtol=1e-5, atol=1e-5)
+
+            lfp_start = start_frame // 12
+            lfp_end = None if end_frame is None else end_frame // 12
+            traces = lfp.get_traces(segment_index=segment_index, start_frame=lfp_start, end_frame=lfp_end)
+            traces_ref = lfp_ref.get_traces(segment_index=segment_index, start_frame=lfp_start, end_frame=lfp_end)
+            np.testing.assert_allclose(traces, traces_ref, rtol=1e-5, atol=1e-5)
+
+    # the bands share the reading of the raw traces
+    num_reads = 0
+    parent_segment = recording._recording_segments[0]
+    original_get_traces = parent_segment.get_traces
+
+    def counting_get_traces(*args, **kwargs):
+        nonlocal num_reads
+        num_reads += 1
+        return original_get_traces(*args, **kwargs)
+
+    parent_segment.get_traces = counting_get_traces
+    ap.get_traces(segment_index=0, start_frame=6000, end_frame=18000, channel_ids=recording.channel_ids[:2])
+    lfp.get_traces(segment_index=0, start_frame=500, end_frame=1500, channel_ids=recording.channel_ids[:2])
+    assert num_reads == 1
+    lfp.get_traces(segment_index=0, start_frame=500, end_frame=1500)
+    assert num_reads == 2
+    parent_segment.get_traces = original_get_traces
+
+    # the band recordings can be serialized on their own
+    lfp_loaded = lfp.clone()
+    np.testing.assert_array_equal(
+        lfp_loaded.get_traces(segment_index=1, start_frame=100, end_frame=900),
+        lfp.get_traces(segment_index=1, start_frame=100, end_frame=900),
+    )
+
+    with pytest.raises(ValueError):
+        filter_bank(recording, dict(lfp=dict(band=[0.5, 2000.0], decimation_factor=12)))
+
+
+def test_write_filter_bank(create_cache_folder):
+    cache_folder = create_cache_folder
+    recording = generate_recording(num_channels=4, durations=[2.0, 1.005], seed=0)
+    band_recordings = filter_bank(recording, bands, dtype="float32")
+
+    saved_recordings = write_filter_bank(
+        recording, cache_folder / "filter_bank", bands, dtype="float32", chunk_size=10000, n_jobs=1
+    )
+    for band_name, saved_recording in saved_recordings.items():
+        band_recording = band_recordings[band_name]
+        assert saved_recording.get_sampling_frequency() == band_recording.get_sampling_frequency()
+        assert saved_recording.is_filtered()
+        # the chunks are rounded to a multiple of the decimation factor: 10008 frames
+        band_chunk_size = 10008 // band_recording._decimation_factor
+        for segment_index in range(recording.get_num_segments()):
+            num_samples = band_recording.get_num_samples(segment_index)
+            for start_frame in range(0, num_samples, band_chunk_size):
+                end_frame = min(start_frame + band_chunk_size, num_samples)
+                traces = saved_recording.get_traces(
+                    segment_index=segment_index, start_frame=start_frame, end_frame=end_frame
+                )
+                traces_ref = band_recording.get_traces(
+                    segment_index=segment_index, start_frame=start_frame, end_frame=end_frame
+                )
+                np.testing.assert_array_equal(traces, traces_ref)
+
+    with pytest.raises(AssertionError):
+        write_filter_bank(recording, cache_folder / "filter_bank", bands, n_jobs=1)
@@ -171,6 +171,34 @@ def test_output_values():
     assert np.allclose(si_interpolated[:, 0], expected_ts, rtol=0, atol=1e-06)
 
 
+def test_interpolate_bad_channels_over_time():
+    recording = generate_recording(num_channels=8, durations=[1.0, 0.5])
+    recording = spre.scale(recording, dtype="float32")
+    static = spre.interpolate_bad_channels(recording, recording.channel_ids[[2]], sigma_um=20, p=1.3)
+
+    # channel 2 is bad in the second window of the first segment only
+    window_frames = [np.array([[0, 10000], [10000, 20000], [20000, 30000]]), np.array([[0, 15000]])]
+    bad_channel_masks = [np.zeros((3, 8), dtype=bool), np.zeros((1, 8), dtype=bool)]
+    bad_channel_masks[0][1, 2] = True
+    interpolated = spre.interpolate_bad_channels(
+        recording, sigma_um=20, p=1.3, bad_channel_masks=bad_channel_masks, window_frames=window_frames
+    )
+
+    traces = interpolated.get_traces(segment_index=0)
+    original = recording.get_traces(segment_index=0)
+    expected = static.get_traces(segment_index=0)
+    assert np.array_equal(traces[:10000], original[:10000])
+    assert np.allclose(traces[10000:20000], expected[10000:20000])
+    assert np.array_equal(traces[20000:], original[20000:])
+    assert np.array_equal(interpolated.get_traces(segment_index=1), recording.get_traces(segment_index=1))
+
+    # chunks across window borders
+    sub_traces = interpolated.get_traces(
+        segment_index=0, start_frame=9000, end_frame=21000, channel_ids=recording.channel_ids[[2]]
+    )
+    assert np.array_equal(sub_traces[:, 0], traces[9000:21000, 2])
+
+
 # -------------------------------------------------------------------------------
 # Test Utils
 # -------------------------------------------------------------------------------
@@ -2,7 +2,7 @@ import pytest
 from pathlib import Path
 
 from spikeinterface import set_global_tmp_folder
-from spikeinterface.core import generate_recording
+from spikeinterface.core import generate_recording, load_extractor
 
 from spikeinterface.preprocessing import normalize_by_quantile, scale, center, zscore
 
@@ -51,6 +51,13 @@ def test_center():
     rec2 = center(rec, mode="median")
     rec2.get_traces(segment_index=0)
 
+    # job kwargs are not kept in the provenance, the random chunk parameters are
+    rec2 = center(rec, mode="median", chunk_size=5000, n_jobs=2, progress_bar=False)
+    assert "n_jobs" not in rec2._kwargs and "progress_bar" not in rec2._kwargs
+    assert rec2._kwargs["chunk_size"] == 5000
+    rec3 = load_extractor(rec2.to_dict())
+    np.testing.assert_array_equal(rec3.get_traces(segment_index=0), rec2.get_traces(segment_index=0))
+
 
 def test_zscore():
     seed = 0
@@ -93,5 +93,36 @@ def test_phase_shift():
     # ~ plt.show()
 
 
+def test_phase_shift_fir():
+    from scipy.signal import butter, filtfilt
+    from spikeinterface.preprocessing.phase_shift import apply_frequency_shift
+
+    sampling_frequency = 30000.0
+    rng = np.random.default_rng(seed=0)
+    # noise band limited at 80% of Nyquist
+    b, a = butter(8, 0.8, btype="low")
+    traces = filtfilt(b, a, rng.normal(size=(int(sampling_frequency * 2), 4)), axis=0).astype("float32")
+    inter_sample_shift = [0.0, 0.25, 0.92, 2.4]
+    rec = NumpyRecording([traces], sampling_frequency)
+
+    rec_fir = phase_shift(rec, inter_sample_shift=inter_sample_shift, method="fir")
+    traces_fir = rec_fir.get_traces()
+    assert traces_fir.dtype == traces.dtype
+
+    # documented error bound against the fft path (far from the borders)
+    traces_fft = apply_frequency_shift(traces.astype("float64"), np.array(inter_sample_shift))
+    sl = slice(1000, -1000)
+    error = np.sqrt(np.mean((traces_fir[sl] - traces_fft[sl]) ** 2)) / np.sqrt(np.mean(traces_fft[sl] ** 2))
+    assert error < 0.001
+
+    # the margin is exact so the chunking has no effect
+    rec_chunked = rec_fir.save(format="memory", chunk_size=777, n_jobs=1, progress_bar=False)
+    assert np.array_equal(rec_chunked.get_traces(), traces_fir)
+
+    traces_slice = rec_fir.get_traces(start_frame=100, end_frame=300, channel_ids=rec.channel_ids[[1, 3]])
+    assert np.array_equal(traces_slice, traces_fir[100:300, [1, 3]])
+
+
 if __name__ == "__main__":
     test_phase_shift()
+    test_phase_shift_fir()
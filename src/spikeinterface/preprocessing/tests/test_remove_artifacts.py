@@ -85,5 +85,42 @@ def test_remove_artifacts():
     )
 
 
+@pytest.mark.parametrize("mode", ["zeros", "linear", "cubic", "average", "median", "sparse"])
+def test_remove_artifacts_batched(mode, monkeypatch):
+    from spikeinterface.preprocessing.remove_artifacts import RemoveArtifactsRecordingSegment
+
+    rec = generate_recording(durations=[5.0], num_channels=8, seed=0)
+    rec.annotate(is_filtered=True)
+    rng = np.random.default_rng(0)
+    # unsorted triggers, isolated ones and overlapping ones
+    triggers = np.concatenate([np.arange(1000, 140000, 400), [20, 60100, 60110, 149990]])
+    triggers = rng.permutation(triggers)
+    labels = rng.choice(["a", "b"], size=triggers.size)
+
+    kwargs = dict(ms_before=0.5, ms_after=2.0, mode=mode)
+    if mode in ("average", "median"):
+        kwargs.update(list_labels=[labels], time_jitter=0.1, scale_amplitude=True)
+    elif mode == "sparse":
+        num_samples = int(0.5 * rec.sampling_frequency / 1000) + int(2.0 * rec.sampling_frequency / 1000)
+        sparsity = {"a": np.arange(8) < 4, "b": np.arange(8) >= 2}
+        artifacts = {label: rng.normal(size=(num_samples, np.sum(mask))) for label, mask in sparsity.items()}
+        kwargs.update(list_labels=[labels], mode="median", artifacts=artifacts, sparsity=sparsity)
+
+    rec_batched = remove_artifacts(rec, [triggers], **kwargs)
+    traces_batched = rec_batched.get_traces(start_frame=0, end_frame=150000)
+    traces_chunk = rec_batched.get_traces(start_frame=60000, end_frame=60200)
+
+    # process every artifact one by one
+    monkeypatch.setattr(
+        RemoveArtifactsRecordingSegment, "_get_isolated", lambda self, triggers, n: np.zeros(triggers.size, dtype=bool)
+    )
+    rec_loop = remove_artifacts(rec, [triggers], **kwargs)
+    traces_loop = rec_loop.get_traces(start_frame=0, end_frame=150000)
+
+    assert not np.array_equal(traces_batched, rec.get_traces(start_frame=0, end_frame=150000))
+    np.testing.assert_allclose(traces_batched, traces_loop, rtol=0, atol=1e-5)
+    np.testing.assert_allclose(traces_chunk, rec_loop.get_traces(start_frame=60000, end_frame=60200), rtol=0, atol=1e-5)
+
+
 if __name__ == "__main__":
     test_remove_artifacts()
@@ -1,3 +1,5 @@
+import pytest
+
 from spikeinterface.preprocessing import resample
 from spikeinterface.core import NumpyRecording
 
@@ -210,6 +212,44 @@ def test_resample_by_chunks():
                     plt.show()
 
 
+def test_resample_polyphase():
+    from scipy.signal import resample_poly
+
+    sampling_frequency = 30000.0
+    rng = np.random.default_rng(seed=0)
+    traces = rng.normal(size=(int(sampling_frequency * 2) + 17, 3)).astype("float32")
+    parent_rec = NumpyRecording(traces, sampling_frequency)
+
+    for resample_rate, up, down in [(2500, 1, 12), (7000, 7, 30), (45000, 3, 2)]:
+        rec = resample(parent_rec, resample_rate, method="polyphase")
+        full_traces = rec.get_traces()
+
+        # same as resample_poly on the whole signal
+        ref_traces = resample_poly(traces.astype("float64"), up, down, axis=0)
+        assert full_traces.shape[0] == rec.get_num_samples() == traces.shape[0] * up // down
+        assert np.allclose(full_traces, ref_traces[: full_traces.shape[0]], atol=1e-5)
+
+        # chunk invariant: the margin is exact
+        for chunk_size in (7, 1000):
+            num_samples = rec.get_num_samples()
+            chunked_traces = np.concatenate(
+                [
+                    rec.get_traces(start_frame=start, end_frame=min(start + chunk_size, num_samples))
+                    for start in range(0, num_samples, chunk_size)
+                ]
+            )
+            assert np.array_equal(chunked_traces, full_traces)
+
+        sub_traces = rec.get_traces(start_frame=100, end_frame=200, channel_ids=rec.channel_ids[[0, 2]])
+        assert np.array_equal(sub_traces, full_traces[100:200, [0, 2]])
+
+    # the fft engine stays the default and the polyphase margin is fixed by the filter
+    assert resample(parent_rec, 2500)._kwargs["method"] == "fft"
+    with pytest.raises(ValueError):
+        resample(parent_rec, 2500, method="polyphase", margin_ms=50.0)
+
+
 if __name__ == "__main__":
     test_resample_freq_domain()
     test_resample_by_chunks()
+    test_resample_polyphase()
@@ -46,5 +46,28 @@ def test_whiten(create_cache_folder):
     assert np.linalg.norm(W1) > np.linalg.norm(W2)
 
 
+def test_whiten_local_sparse():
+    rec = generate_recording(num_channels=32, durations=[2.0], seed=2205)
+
+    rec_local = whiten(rec, mode="local", radius_um=40.0, apply_mean=True, n_jobs=2, progress_bar=False)
+    W = np.array(rec_local._kwargs["W"])
+    M = np.array(rec_local._kwargs["M"])
+    assert rec_local._recording_segments[0].W_sparse is not None
+
+    # same random chunks with serial reading
+    W_serial, _ = compute_whitening_matrix(rec, "local", {}, apply_mean=True, radius_um=40.0)
+    np.testing.assert_allclose(W, W_serial)
+
+    traces = rec.get_traces()
+    expected = (traces - M) @ W
+    np.testing.assert_allclose(rec_local.get_traces(), expected, rtol=1e-4, atol=1e-4)
+
+    channel_ids = rec.channel_ids[[3, 17, 5]]
+    np.testing.assert_allclose(
+        rec_local.get_traces(channel_ids=channel_ids), expected[:, [3, 17, 5]], rtol=1e-4, atol=1e-4
+    )
+
+
 if __name__ == "__main__":
     test_whiten()
+    test_whiten_local_sparse()
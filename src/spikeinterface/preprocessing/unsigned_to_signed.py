@@ -4,6 +4,7 @@ import numpy as np
 
 from ..core.core_tools import define_function_from_class
 from .basepreprocessor import BasePreprocessor, BasePreprocessorSegment
+from .elementwise import ElementwisePreprocessorSegment, get_cast_ops, OP_ADD
 
 
 class UnsignedToSignedRecording(BasePreprocessor):
@@ -42,16 +43,13 @@ class UnsignedToSignedRecording(BasePreprocessor):
         )
 
 
-class UnsignedToSignedRecordingSegment(BasePreprocessorSegment):
+class UnsignedToSignedRecordingSegment(ElementwisePreprocessorSegment):
     def __init__(self, parent_recording_segment, dtype_signed, bit_depth):
         BasePreprocessorSegment.__init__(self, parent_recording_segment)
         self.dtype_signed = dtype_signed
         self.bit_depth = bit_depth
 
-    def get_traces(self, start_frame, end_frame, channel_indices):
-        if channel_indices is None:
-            channel_indices = slice(None)
-        traces = self.parent_recording_segment.get_traces(start_frame, end_frame, channel_indices)
+    def apply_elementwise(self, traces, channel_indices):
         # if uint --> take care of offset
         traces_dtype = traces.dtype
         if self.bit_depth is not None:
@@ -64,6 +62,11 @@ class UnsignedToSignedRecordingSegment(BasePreprocessorSegment):
         traces = traces.astype(signed_dtype, copy=False) - offset
         return traces.astype(self.dtype_signed, copy=False)
 
+    def get_elementwise_ops(self, channel_indices, input_dtype):
+        nbits = self.bit_depth if self.bit_depth is not None else input_dtype.itemsize * 8
+        ops = [(OP_ADD, -float(2 ** (nbits - 1)), 0.0)] + get_cast_ops(self.dtype_signed)
+        return ops, np.dtype(self.dtype_signed)
+
 
 # function for API
 unsigned_to_signed = define_function_from_class(source_class=UnsignedToSignedRecording, name="unsigned_to_signed")
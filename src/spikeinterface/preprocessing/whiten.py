@@ -6,6 +6,7 @@ from .basepreprocessor import BasePreprocessor, BasePreprocessorSegment
 from spikeinterface.core.core_tools import define_function_from_class
 
 from ..core import get_random_data_chunks, get_channel_distances
+from ..core.recording_tools import split_random_chunk_kwargs
 from .filter import fix_dtype
 from ..core.globals import get_global_job_kwargs
 
@@ -47,7 +48,8 @@ class WhitenRecording(BasePreprocessor):
     regularize_kwargs : {'method' : 'GraphicalLassoCV'}
         Dictionary of the parameters that could be provided to the method of sklearn, if
         the covariance matrix needs to be regularized.
-    **random_chunk_kwargs : Keyword arguments for `spikeinterface.core.get_random_data_chunk()` function
+    **random_chunk_kwargs : Keyword arguments for `spikeinterface.core.get_random_data_chunk()` function.
+        Job keyword arguments (e.g. n_jobs) can be given to read the random chunks in parallel.
 
     Returns
     -------
@@ -110,6 +112,7 @@ class WhitenRecording(BasePreprocessor):
             M=M.tolist() if M is not None else None,
             W=W.tolist(),
         )
+        random_chunk_kwargs, _ = split_random_chunk_kwargs(random_chunk_kwargs)
         self._kwargs.update(random_chunk_kwargs)
 
 
@@ -121,6 +124,16 @@ class WhitenRecordingSegment(BasePreprocessorSegment):
         self.dtype = dtype
         self.int_scale = int_scale
 
+        # a local whitening matrix is only non zero in the neighborhood of each channel: it is applied as a
+        # sparse matrix (column c holds the weights of the neighbors of channel c)
+        if np.count_nonzero(W) <= sparse_whitening_max_density * W.size:
+            import scipy.sparse
+
+            sparse_dtype = "float64" if np.dtype(dtype) == np.float64 else "float32"
+            self.W_sparse = scipy.sparse.csc_matrix(W.astype(sparse_dtype))
+        else:
+            self.W_sparse = None
+
     def get_traces(self, start_frame, end_frame, channel_indices):
         traces = self.parent_recording_segment.get_traces(start_frame, end_frame, slice(None))
         traces_dtype = traces.dtype
@@ -129,11 +142,14 @@ class WhitenRecordingSegment(BasePreprocessorSegment):
             traces = traces.astype("float32")
 
         if self.M is not None:
-            whiten_traces = (traces - self.M) @ self.W
-        else:
-            whiten_traces = traces @ self.W
+            traces = traces - self.M
 
-        whiten_traces = whiten_traces[:, channel_indices]
+        # only the requested channels are computed
+        if self.W_sparse is not None:
+            W_sparse = self.W_sparse[:, channel_indices]
+            whiten_traces = traces.astype(W_sparse.dtype, copy=False) @ W_sparse
+        else:
+            whiten_traces = traces @ self.W[:, channel_indices]
 
         if self.int_scale is not None:
             whiten_traces *= self.int_scale
@@ -144,6 +160,9 @@ class WhitenRecordingSegment(BasePreprocessorSegment):
 # function for API
 whiten = define_function_from_class(source_class=WhitenRecording, name="whiten")
 
+# maximum fraction of non zero coefficients to apply the whitening matrix as a sparse matrix
+sparse_whitening_max_density = 0.25
+
 
 def compute_whitening_matrix(
     recording, mode, random_chunk_kwargs, apply_mean, radius_um=None, eps=None, regularize=False, regularize_kwargs=None
@@ -197,7 +216,9 @@ def compute_whitening_matrix(
         data = random_data
 
     if not regularize:
-        cov = data.T @ data
+        # float64 to use BLAS and to avoid integer overflow
+        data_float = data.astype("float64", copy=False)
+        cov = data_float.T @ data_float
         cov = cov / data.shape[0]
     else:
         import sklearn.covariance
@@ -86,7 +86,7 @@ class TracePaddedRecordingSegment(BasePreprocessorSegment):
 
         # This avoids an extra memory allocation if we are within the confines of the old traces
         end_of_original_traces = self.num_samples_in_original_segment + self.padding_start
-        if start_frame > self.padding_start and end_frame < end_of_original_traces:
+        if start_frame >= self.padding_start and end_frame <= end_of_original_traces:
             return self.get_original_traces_shifted(start_frame, end_frame, channel_indices)
 
         # We start with the full padded traces and fill in the original traces if necessary
@@ -160,6 +160,7 @@ class ZeroChannelPaddedRecording(BaseRecording):
             assert max(channel_mapping) < num_channels, (
                 "The new mapping cannot exceed total number of channels " "in the zero-chanenl-padded recording."
             )
+            self.channel_mapping = np.asarray(channel_mapping)
         else:
             if "locations" in recording.get_property_keys() or "contact_vector" in recording.get_property_keys():
                 self.channel_mapping = np.argsort(recording.get_channel_locations()[:, 1])
@@ -169,7 +170,9 @@ class ZeroChannelPaddedRecording(BaseRecording):
         self.parent_recording = recording
         self.num_channels = num_channels
         for segment in recording._recording_segments:
-            recording_segment = ZeroChannelPaddedRecordingSegment(segment, self.num_channels, self.channel_mapping)
+            recording_segment = ZeroChannelPaddedRecordingSegment(
+                segment, self.num_channels, self.channel_mapping, self.get_dtype()
+            )
             self.add_recording_segment(recording_segment)
 
         # only copy relevant metadata and properties
@@ -186,18 +189,26 @@ class ZeroChannelPaddedRecording(BaseRecording):
 
 
 class ZeroChannelPaddedRecordingSegment(BasePreprocessorSegment):
-    def __init__(self, recording_segment: BaseRecordingSegment, num_channels: int, channel_mapping: list):
+    def __init__(self, recording_segment: BaseRecordingSegment, num_channels: int, channel_mapping: list, dtype=None):
         BasePreprocessorSegment.__init__(self, recording_segment)
         self.parent_recording_segment = recording_segment
         self.num_channels = num_channels
         self.channel_mapping = channel_mapping
+        self.dtype = dtype
+        # index of the parent channel of each padded channel, -1 for the zero channels
+        self._parent_channel_indices = np.full(num_channels, -1, dtype="int64")
+        self._parent_channel_indices[np.asarray(channel_mapping)] = channel_mapping
 
     def get_traces(self, start_frame, end_frame, channel_indices):
-        traces = np.zeros((end_frame - start_frame, self.num_channels))
-        traces[:, self.channel_mapping] = self.parent_recording_segment.get_traces(
-            start_frame=start_frame, end_frame=end_frame, channel_indices=self.channel_mapping
+        parent_channel_indices = self._parent_channel_indices[channel_indices]
+        (from_parent,) = np.nonzero(parent_channel_indices >= 0)
+        parent_traces = self.parent_recording_segment.get_traces(
+            start_frame=start_frame, end_frame=end_frame, channel_indices=parent_channel_indices[from_parent]
         )
-        return traces[:, channel_indices]
+        dtype = parent_traces.dtype if self.dtype is None else self.dtype
+        traces = np.zeros((end_frame - start_frame, parent_channel_indices.size), dtype=dtype)
+        traces[:, from_parent] = parent_traces
+        return traces
 
 
 # function for API
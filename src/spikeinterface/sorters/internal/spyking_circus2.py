@@ -15,7 +15,6 @@ from spikeinterface.sortingcomponents.tools import cache_preprocessing
 from spikeinterface.core.basesorting import minimum_spike_dtype
 from spikeinterface.core.sparsity import compute_sparsity
 from spikeinterface.core.sortinganalyzer import create_sorting_analyzer
-from spikeinterface.curation.auto_merge import get_potential_auto_merge
 from spikeinterface.core.analyzer_extension_core import ComputeTemplates
 from spikeinterface.core.sparsity import ChannelSparsity
 
@@ -381,6 +380,7 @@ def create_sorting_analyzer_with_templates(sorting, recording, templates, remove
 def final_cleaning_circus(recording, sorting, templates, **merging_kwargs):
 
     from spikeinterface.core.sorting_tools import apply_merges_to_sorting
+    from spikeinterface.curation.auto_merge import get_potential_auto_merge
 
     sa = create_sorting_analyzer_with_templates(sorting, recording, templates)
 
@@ -12,8 +12,6 @@ try:
 except:
     HAVE_HDBSCAN = False
 
-import random, string
-from spikeinterface.core import get_global_tmp_folder
 from spikeinterface.core.basesorting import minimum_spike_dtype
 from spikeinterface.core.waveform_tools import estimate_templates
 from .clustering_tools import remove_duplicates_via_matching
@@ -24,6 +22,11 @@ from spikeinterface.sortingcomponents.waveforms.temporal_pca import TemporalPCAP
 from spikeinterface.core.template import Templates
 from spikeinterface.core.sparsity import compute_sparsity
 from spikeinterface.sortingcomponents.tools import remove_empty_templates
+from spikeinterface.sortingcomponents.clustering.partition import (
+    partition_clustering,
+    create_tmp_folder,
+    remove_tmp_folder,
+)
 import pickle, json
 from spikeinterface.core.node_pipeline import (
     run_node_pipeline,
@@ -81,94 +84,58 @@ class CircusClustering:
         ms_after = params["ms_after"]
         nbefore = int(ms_before * fs / 1000.0)
         nafter = int(ms_after * fs / 1000.0)
-        if params["tmp_folder"] is None:
-            name = "".join(random.choices(string.ascii_uppercase + string.digits, k=8))
-            tmp_folder = get_global_tmp_folder() / name
-        else:
-            tmp_folder = Path(params["tmp_folder"]).absolute()
-
-        tmp_folder.mkdir(parents=True, exist_ok=True)
-
-        # SVD for time compression
-        few_peaks = select_peaks(peaks, recording=recording, method="uniform", n_peaks=10000, margin=(nbefore, nafter))
-        few_wfs = extract_waveform_at_max_channel(
-            recording, few_peaks, ms_before=ms_before, ms_after=ms_after, **params["job_kwargs"]
-        )
-
-        wfs = few_wfs[:, :, 0]
-        from sklearn.decomposition import TruncatedSVD
-
-        tsvd = TruncatedSVD(params["n_svd"][0])
-        tsvd.fit(wfs)
-
-        model_folder = tmp_folder / "tsvd_model"
+        tmp_folder, is_temporary = create_tmp_folder(params["tmp_folder"])
 
-        model_folder.mkdir(exist_ok=True)
-        with open(model_folder / "pca_model.pkl", "wb") as f:
-            pickle.dump(tsvd, f)
+        try:
+            # SVD for time compression
+            few_peaks = select_peaks(
+                peaks, recording=recording, method="uniform", n_peaks=10000, margin=(nbefore, nafter)
+            )
+            few_wfs = extract_waveform_at_max_channel(
+                recording, few_peaks, ms_before=ms_before, ms_after=ms_after, **params["job_kwargs"]
+            )
 
-        model_params = {
-            "ms_before": ms_before,
-            "ms_after": ms_after,
-            "sampling_frequency": float(fs),
-        }
+            wfs = few_wfs[:, :, 0]
+            from sklearn.decomposition import TruncatedSVD
 
-        with open(model_folder / "params.json", "w") as f:
-            json.dump(model_params, f)
+            tsvd = TruncatedSVD(params["n_svd"][0])
+            tsvd.fit(wfs)
 
-        # features
-        node0 = PeakRetriever(recording, peaks)
+            model_folder = tmp_folder / "tsvd_model"
 
-        radius_um = params["radius_um"]
-        node1 = ExtractSparseWaveforms(
-            recording,
-            parents=[node0],
-            return_output=False,
-            ms_before=ms_before,
-            ms_after=ms_after,
-            radius_um=radius_um,
-        )
+            model_folder.mkdir(exist_ok=True)
+            with open(model_folder / "pca_model.pkl", "wb") as f:
+                pickle.dump(tsvd, f)
 
-        node2 = TemporalPCAProjection(
-            recording, parents=[node0, node1], return_output=True, model_folder_path=model_folder
-        )
+            model_params = {
+                "ms_before": ms_before,
+                "ms_after": ms_after,
+                "sampling_frequency": float(fs),
+            }
 
-        pipeline_nodes = [node0, node1, node2]
+            with open(model_folder / "params.json", "w") as f:
+                json.dump(model_params, f)
 
-        if len(params["recursive_kwargs"]) == 0:
+            # features
+            node0 = PeakRetriever(recording, peaks)
 
-            all_pc_data = run_node_pipeline(
+            radius_um = params["radius_um"]
+            node1 = ExtractSparseWaveforms(
                 recording,
-                pipeline_nodes,
-                params["job_kwargs"],
-                job_name="extracting features",
+                parents=[node0],
+                return_output=False,
+                ms_before=ms_before,
+                ms_after=ms_after,
+                radius_um=radius_um,
             )
 
-            peak_labels = -1 * np.ones(len(peaks), dtype=int)
-            nb_clusters = 0
-            for c in np.unique(peaks["channel_index"]):
-                mask = peaks["channel_index"] == c
-                sub_data = all_pc_data[mask]
-                sub_data = sub_data.reshape(len(sub_data), -1)
-
-                if all_pc_data.shape[1] > params["n_svd"][1]:
-                    tsvd = TruncatedSVD(params["n_svd"][1])
-                else:
-                    tsvd = TruncatedSVD(all_pc_data.shape[1])
-
-                hdbscan_data = tsvd.fit_transform(sub_data)
-                try:
-                    clustering = hdbscan.hdbscan(hdbscan_data, **d["hdbscan_kwargs"])
-                    local_labels = clustering[0]
-                except Exception:
-                    local_labels = np.zeros(len(hdbscan_data))
-                valid_clusters = local_labels > -1
-                if np.sum(valid_clusters) > 0:
-                    local_labels[valid_clusters] += nb_clusters
-                    peak_labels[mask] = local_labels
-                    nb_clusters += len(np.unique(local_labels[valid_clusters]))
-        else:
+            node2 = TemporalPCAProjection(
+                recording, parents=[node0, node1], return_output=True, model_folder_path=model_folder
+            )
 
+            pipeline_nodes = [node0, node1, node2]
+
+            # features are written to disk and each worker memmaps only the peaks it clusters
             features_folder = tmp_folder / "tsvd_features"
             features_folder.mkdir(exist_ok=True)
 
@@ -183,33 +150,46 @@ class CircusClustering:
                 names=["sparse_tsvd"],
             )
 
-            sparse_mask = node1.neighbours_mask
-            neighbours_mask = get_channel_distances(recording) < radius_um
-
-            # np.save(features_folder / "sparse_mask.npy", sparse_mask)
-            np.save(features_folder / "peaks.npy", peaks)
-
-            original_labels = peaks["channel_index"]
-            from spikeinterface.sortingcomponents.clustering.split import split_clusters
-
-            peak_labels, _ = split_clusters(
-                original_labels,
-                recording,
-                features_folder,
-                method="local_feature_clustering",
-                method_kwargs=dict(
-                    clusterer="hdbscan",
-                    feature_name="sparse_tsvd",
-                    neighbours_mask=neighbours_mask,
-                    waveforms_sparse_mask=sparse_mask,
-                    min_size_split=50,
-                    clusterer_kwargs=d["hdbscan_kwargs"],
-                    n_pca_features=params["n_svd"][1],
-                    scale_n_pca_by_depth=True,
-                ),
-                **params["recursive_kwargs"],
-                **job_kwargs,
-            )
+            if len(params["recursive_kwargs"]) == 0:
+                # peaks are partitioned by main channel and each partition is clustered in parallel
+                peak_labels = partition_clustering(
+                    peaks["channel_index"],
+                    features_folder,
+                    "sparse_tsvd",
+                    method="hdbscan",
+                    method_kwargs=dict(n_components=params["n_svd"][1], clusterer_kwargs=d["hdbscan_kwargs"]),
+                    **job_kwargs,
+                )
+            else:
+                sparse_mask = node1.neighbours_mask
+                neighbours_mask = get_channel_distances(recording) < radius_um
+
+                # np.save(features_folder / "sparse_mask.npy", sparse_mask)
+                np.save(features_folder / "peaks.npy", peaks)
+
+                original_labels = peaks["channel_index"]
+                from spikeinterface.sortingcomponents.clustering.split import split_clusters
+
+                peak_labels, _ = split_clusters(
+                    original_labels,
+                    recording,
+                    features_folder,
+                    method="local_feature_clustering",
+                    method_kwargs=dict(
+                        clusterer="hdbscan",
+                        feature_name="sparse_tsvd",
+                        neighbours_mask=neighbours_mask,
+                        waveforms_sparse_mask=sparse_mask,
+                        min_size_split=50,
+                        clusterer_kwargs=d["hdbscan_kwargs"],
+                        n_pca_features=params["n_svd"][1],
+                        scale_n_pca_by_depth=True,
+                    ),
+                    **params["recursive_kwargs"],
+                    **job_kwargs,
+                )
+        finally:
+            remove_tmp_folder(tmp_folder, is_temporary)
 
         non_noise = peak_labels > -1
         labels, inverse = np.unique(peak_labels[non_noise], return_inverse=True)
@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+from pathlib import Path
+import random, string
+import shutil
+from multiprocessing import get_context
+from threadpoolctl import threadpool_limits
+from tqdm.auto import tqdm
+
+import numpy as np
+
+from spikeinterface.core import get_global_tmp_folder
+from spikeinterface.core.job_tools import get_poolexecutor, fix_job_kwargs
+
+from .tools import FeaturesLoader, features_to_shared_memory, features_from_shared_memory
+
+
+def partition_clustering(
+    partition_labels,
+    features_dict_or_folder,
+    feature_name,
+    method="hdbscan",
+    method_kwargs={},
+    **job_kwargs,
+):
+    """
+    Cluster peaks independently in each partition (for instance all peaks sharing the same main channel)
+    in a pool of workers, and stitch the local labels into global labels.
+
+    Memory is bounded by the size of the largest partition in each worker:
+      * when features are given as a folder of npy files (see run_node_pipeline(gather_mode="npy")),
+        workers memmap the files and only read the rows of the partition they cluster.
+      * when features are given as a dict and n_jobs > 1, arrays are placed once in shared memory and
+        workers attach to them without copy.
+
+    The stitching is deterministic: local labels are offset following the sorted partition labels,
+    whatever the order in which workers finish.
+
+    Parameters
+    ----------
+    partition_labels: numpy.array
+        The partition of every peak. Partition -1 is not clustered.
+    features_dict_or_folder: dict or folder
+        A dictionary of features precomputed with peak_pipeline or a folder containing npy files for features
+    feature_name: str
+        The name of the feature to cluster
+    method: str, default: "hdbscan"
+        The method name
+    method_kwargs: dict, default: dict()
+        The method option
+
+    Returns
+    -------
+    peak_labels: numpy.ndarray
+        The labels of peaks, -1 being noise.
+    """
+    job_kwargs = fix_job_kwargs(job_kwargs)
+    n_jobs = job_kwargs["n_jobs"]
+    mp_context = job_kwargs.get("mp_context", None)
+    progress_bar = job_kwargs["progress_bar"]
+    max_threads_per_process = job_kwargs.get("max_threads_per_process", 1)
+
+    shms = []
+    if isinstance(features_dict_or_folder, dict) and n_jobs > 1:
+        features_to_workers, shms = features_to_shared_memory({feature_name: features_dict_or_folder[feature_name]})
+        features_in_shm = True
+    else:
+        features_to_workers = features_dict_or_folder
+        features_in_shm = False
+
+    partitions = np.setdiff1d(np.unique(partition_labels), [-1])
+    # one sort instead of one mask per partition
+    order = np.argsort(partition_labels, kind="stable")
+    bounds = np.searchsorted(partition_labels[order], partitions, side="left")
+    bounds = np.append(bounds, np.searchsorted(partition_labels[order], partitions[-1:], side="right"))
+
+    Executor = get_poolexecutor(n_jobs)
+    all_local_labels = {}
+    try:
+        with Executor(
+            max_workers=n_jobs,
+            initializer=partition_worker_init,
+            mp_context=get_context(method=mp_context),
+            initargs=(
+                features_to_workers,
+                features_in_shm,
+                feature_name,
+                method,
+                method_kwargs,
+                max_threads_per_process,
+            ),
+        ) as pool:
+            jobs = []
+            for i, partition in enumerate(partitions):
+                peak_indices = order[bounds[i] : bounds[i + 1]]
+                jobs.append(pool.submit(partition_function_wrapper, partition, peak_indices))
+
+            if progress_bar:
+                iterator = tqdm(jobs, desc=f"partition_clustering with {method}", total=len(jobs))
+            else:
+                iterator = jobs
+
+            for res in iterator:
+                partition, local_labels = res.result()
+                all_local_labels[partition] = local_labels
+    finally:
+        for shm in shms:
+            shm.close()
+            shm.unlink()
+
+    peak_labels = -1 * np.ones(partition_labels.size, dtype="int64")
+    nb_clusters = 0
+    for i, partition in enumerate(partitions):
+        peak_indices = order[bounds[i] : bounds[i + 1]]
+        local_labels = all_local_labels[partition]
+        valid_clusters = local_labels > -1
+        if np.sum(valid_clusters) > 0:
+            _, inverse = np.unique(local_labels[valid_clusters], return_inverse=True)
+            peak_labels[peak_indices[valid_clusters]] = inverse + nb_clusters
+            nb_clusters += np.max(inverse) + 1
+
+    return peak_labels
+
+
+def create_tmp_folder(tmp_folder=None):
+    """
+    Create the folder where a clustering method writes its features (or models).
+
+    Parameters
+    ----------
+    tmp_folder: str | Path | None, default: None
+        The folder to use. If None, a folder with a random name is created in the global tmp folder.
+
+    Returns
+    -------
+    tmp_folder: Path
+        The folder, created if needed
+    is_temporary: bool
+        True when the folder has been named here, and so must be removed with `remove_tmp_folder()`
+    """
+    if tmp_folder is None:
+        name = "".join(random.choices(string.ascii_uppercase + string.digits, k=8))
+        tmp_folder = get_global_tmp_folder() / name
+        is_temporary = True
+    else:
+        tmp_folder = Path(tmp_folder).absolute()
+        is_temporary = False
+    tmp_folder.mkdir(parents=True, exist_ok=True)
+    return tmp_folder, is_temporary
+
+
+def remove_tmp_folder(tmp_folder, is_temporary):
+    """
+    Remove a folder given by `create_tmp_folder()` if it is temporary, a folder given by the user is kept.
+    """
+    if is_temporary:
+        shutil.rmtree(tmp_folder, ignore_errors=True)
+
+
+global _ctx
+
+
+def partition_worker_init(
+    features_to_workers, features_in_shm, feature_name, method, method_kwargs, max_threads_per_process
+):
+    global _ctx
+    _ctx = {}
+
+    if features_in_shm:
+        # keep a reference on the SharedMemory objects to keep the buffers alive
+        features, _ctx["shms"] = features_from_shared_memory(features_to_workers)
+    else:
+        features = FeaturesLoader.from_dict_or_folder(features_to_workers)
+
+    _ctx["features"] = features[feature_name]
+    _ctx["method_class"] = partition_methods_dict[method]
+    _ctx["method_kwargs"] = method_kwargs
+    _ctx["max_threads_per_process"] = max_threads_per_process
+
+
+def partition_function_wrapper(partition, peak_indices):
+    global _ctx
+    # peak_indices are sorted so memmap reads are sequential
+    sub_features = np.asarray(_ctx["features"][peak_indices])
+    with threadpool_limits(limits=_ctx["max_threads_per_process"]):
+        local_labels = _ctx["method_class"].cluster(sub_features, **_ctx["method_kwargs"])
+    return partition, local_labels
+
+
+class HdbscanPartitionClustering:
+    """
+    Flatten the features of the partition, optionally reduce them with a TruncatedSVD,
+    and run hdbscan.
+    """
+
+    name = "hdbscan"
+
+    @staticmethod
+    def cluster(features, n_components=None, clusterer_kwargs={"min_cluster_size": 25}):
+        import hdbscan
+
+        features = features.reshape(features.shape[0], -1)
+        if n_components is not None and features.shape[1] > n_components:
+            from sklearn.decomposition import TruncatedSVD
+
+            tsvd = TruncatedSVD(n_components)
+            features = tsvd.fit_transform(features)
+
+        try:
+            clustering = hdbscan.hdbscan(features, **clusterer_kwargs)
+            local_labels = clustering[0]
+        except Exception:
+            local_labels = np.zeros(features.shape[0], dtype="int64")
+
+        return local_labels
+
+
+partition_methods_list = [
+    HdbscanPartitionClustering,
+]
+partition_methods_dict = {e.name: e for e in partition_methods_list}
@@ -54,6 +54,7 @@ class RandomProjectionClustering:
         "random_seed": 42,
         "noise_levels": None,
         "smoothing_kwargs": {"window_length_ms": 0.25},
+        "partition_by_channel": False,
         "tmp_folder": None,
         "job_kwargs": {},
         "verbose": True,
@@ -112,12 +113,45 @@ class RandomProjectionClustering:
 
         pipeline_nodes = [node0, node1, node2, node3]
 
-        hdbscan_data = run_node_pipeline(
-            recording, pipeline_nodes, job_kwargs=job_kwargs, job_name="extracting features"
-        )
-
-        clustering = hdbscan.hdbscan(hdbscan_data, **d["hdbscan_kwargs"])
-        peak_labels = clustering[0]
+        if params["partition_by_channel"]:
+            # memory bounded: features are written to disk and peaks are clustered independently
+            # (and in parallel) for each main channel
+            from spikeinterface.sortingcomponents.clustering.partition import (
+                partition_clustering,
+                create_tmp_folder,
+                remove_tmp_folder,
+            )
+
+            tmp_folder, is_temporary = create_tmp_folder(params["tmp_folder"])
+            features_folder = tmp_folder / "random_projections_features"
+            features_folder.mkdir(exist_ok=True)
+
+            _ = run_node_pipeline(
+                recording,
+                pipeline_nodes,
+                job_kwargs=job_kwargs,
+                job_name="extracting features",
+                gather_mode="npy",
+                gather_kwargs=dict(exist_ok=True),
+                folder=features_folder,
+                names=["random_projections"],
+            )
+            peak_labels = partition_clustering(
+                peaks["channel_index"],
+                features_folder,
+                "random_projections",
+                method="hdbscan",
+                method_kwargs=dict(clusterer_kwargs=d["hdbscan_kwargs"]),
+                **job_kwargs,
+            )
+            remove_tmp_folder(tmp_folder, is_temporary)
+        else:
+            hdbscan_data = run_node_pipeline(
+                recording, pipeline_nodes, job_kwargs=job_kwargs, job_name="extracting features"
+            )
+
+            clustering = hdbscan.hdbscan(hdbscan_data, **d["hdbscan_kwargs"])
+            peak_labels = clustering[0]
 
         labels = np.unique(peak_labels)
         labels = labels[labels >= 0]
@@ -9,7 +9,7 @@ import numpy as np
 
 from spikeinterface.core.job_tools import get_poolexecutor, fix_job_kwargs
 
-from .tools import aggregate_sparse_features, FeaturesLoader
+from .tools import aggregate_sparse_features, FeaturesLoader, features_to_shared_memory, features_from_shared_memory
 
 try:
     import numba
@@ -71,58 +71,80 @@ def split_clusters(
     peak_labels = peak_labels.copy()
     split_count = np.zeros(peak_labels.size, dtype=int)
 
+    shms = []
+    if isinstance(features_dict_or_folder, dict) and n_jobs > 1:
+        # features in memory are shared with the workers instead of being pickled for each of them
+        features_to_workers, shms = features_to_shared_memory(features_dict_or_folder)
+        features_in_shm = True
+    else:
+        features_to_workers = features_dict_or_folder
+        features_in_shm = False
+
     Executor = get_poolexecutor(n_jobs)
 
-    with Executor(
-        max_workers=n_jobs,
-        initializer=split_worker_init,
-        mp_context=get_context(method=mp_context),
-        initargs=(recording, features_dict_or_folder, original_labels, method, method_kwargs, max_threads_per_process),
-    ) as pool:
-        labels_set = np.setdiff1d(peak_labels, [-1])
-        current_max_label = np.max(labels_set) + 1
-
-        jobs = []
-        for label in labels_set:
-            peak_indices = np.flatnonzero(peak_labels == label)
-            if peak_indices.size > 0:
-                jobs.append(pool.submit(split_function_wrapper, peak_indices, 1))
-
-        if progress_bar:
-            iterator = tqdm(jobs, desc=f"split_clusters with {method}", total=len(labels_set))
-        else:
-            iterator = jobs
-
-        for res in iterator:
-            is_split, local_labels, peak_indices = res.result()
-            if not is_split:
-                continue
-
-            mask = local_labels >= 0
-            peak_labels[peak_indices[mask]] = local_labels[mask] + current_max_label
-            peak_labels[peak_indices[~mask]] = local_labels[~mask]
-
-            split_count[peak_indices] += 1
-
-            current_max_label += np.max(local_labels[mask]) + 1
-
-            if recursive:
-                recursion_level = np.max(split_count[peak_indices])
-                if recursive_depth is not None:
-                    # stop reccursivity when recursive_depth is reach
-                    extra_ball = recursion_level < recursive_depth
-                else:
-                    # reccurssive always
-                    extra_ball = True
-
-                if extra_ball:
-                    new_labels_set = np.setdiff1d(peak_labels[peak_indices], [-1])
-                    for label in new_labels_set:
-                        peak_indices = np.flatnonzero(peak_labels == label)
-                        if peak_indices.size > 0:
-                            jobs.append(pool.submit(split_function_wrapper, peak_indices, recursion_level))
-                            if progress_bar:
-                                iterator.total += 1
+    try:
+        with Executor(
+            max_workers=n_jobs,
+            initializer=split_worker_init,
+            mp_context=get_context(method=mp_context),
+            initargs=(
+                recording,
+                features_to_workers,
+                features_in_shm,
+                original_labels,
+                method,
+                method_kwargs,
+                max_threads_per_process,
+            ),
+        ) as pool:
+            labels_set = np.setdiff1d(peak_labels, [-1])
+            current_max_label = np.max(labels_set) + 1
+
+            jobs = []
+            for label in labels_set:
+                peak_indices = np.flatnonzero(peak_labels == label)
+                if peak_indices.size > 0:
+                    jobs.append(pool.submit(split_function_wrapper, peak_indices, 1))
+
+            if progress_bar:
+                iterator = tqdm(jobs, desc=f"split_clusters with {method}", total=len(labels_set))
+            else:
+                iterator = jobs
+
+            for res in iterator:
+                is_split, local_labels, peak_indices = res.result()
+                if not is_split:
+                    continue
+
+                mask = local_labels >= 0
+                peak_labels[peak_indices[mask]] = local_labels[mask] + current_max_label
+                peak_labels[peak_indices[~mask]] = local_labels[~mask]
+
+                split_count[peak_indices] += 1
+
+                current_max_label += np.max(local_labels[mask]) + 1
+
+                if recursive:
+                    recursion_level = np.max(split_count[peak_indices])
+                    if recursive_depth is not None:
+                        # stop reccursivity when recursive_depth is reach
+                        extra_ball = recursion_level < recursive_depth
+                    else:
+                        # reccurssive always
+                        extra_ball = True
+
+                    if extra_ball:
+                        new_labels_set = np.setdiff1d(peak_labels[peak_indices], [-1])
+                        for label in new_labels_set:
+                            peak_indices = np.flatnonzero(peak_labels == label)
+                            if peak_indices.size > 0:
+                                jobs.append(pool.submit(split_function_wrapper, peak_indices, recursion_level))
+                                if progress_bar:
+                                    iterator.total += 1
+    finally:
+        for shm in shms:
+            shm.close()
+            shm.unlink()
 
     if returns_split_count:
         return peak_labels, split_count
@@ -134,19 +156,22 @@ global _ctx
 
 
 def split_worker_init(
-    recording, features_dict_or_folder, original_labels, method, method_kwargs, max_threads_per_process
+    recording, features_to_workers, features_in_shm, original_labels, method, method_kwargs, max_threads_per_process
 ):
     global _ctx
     _ctx = {}
 
     _ctx["recording"] = recording
-    features_dict_or_folder
     _ctx["original_labels"] = original_labels
     _ctx["method"] = method
     _ctx["method_kwargs"] = method_kwargs
     _ctx["method_class"] = split_methods_dict[method]
     _ctx["max_threads_per_process"] = max_threads_per_process
-    _ctx["features"] = FeaturesLoader.from_dict_or_folder(features_dict_or_folder)
+    if features_in_shm:
+        # keep a reference on the SharedMemory objects to keep the buffers alive
+        _ctx["features"], _ctx["shms"] = features_from_shared_memory(features_to_workers)
+    else:
+        _ctx["features"] = FeaturesLoader.from_dict_or_folder(features_to_workers)
     _ctx["peaks"] = _ctx["features"]["peaks"]
 
 
@@ -48,6 +48,57 @@ class FeaturesLoader:
             return FeaturesLoader(features_dict_or_folder)
 
 
+def features_to_shared_memory(features_dict):
+    """
+    Copy a dict of features in shared memory, so that the workers of a pool attach to them instead of receiving
+    a pickled copy.
+
+    Parameters
+    ----------
+    features_dict: dict
+        The features arrays
+
+    Returns
+    -------
+    features_shm_dict: dict
+        The (shm_name, shape, dtype) of each feature, to give to `features_from_shared_memory()`
+    shms: list
+        The SharedMemory objects, to be closed and unlinked by the caller
+    """
+    from spikeinterface.core.core_tools import make_shared_array
+
+    features_shm_dict = {}
+    shms = []
+    for name, arr in features_dict.items():
+        shared_arr, shm = make_shared_array(arr.shape, arr.dtype)
+        shared_arr[:] = arr
+        shms.append(shm)
+        features_shm_dict[name] = (shm.name, arr.shape, arr.dtype)
+    return features_shm_dict, shms
+
+
+def features_from_shared_memory(features_shm_dict):
+    """
+    Attach to the features created by `features_to_shared_memory()`.
+
+    Returns
+    -------
+    features: dict
+        The features arrays
+    shms: list
+        The SharedMemory objects, a reference must be kept to keep the buffers alive
+    """
+    from multiprocessing.shared_memory import SharedMemory
+
+    features = {}
+    shms = []
+    for name, (shm_name, shape, dtype) in features_shm_dict.items():
+        shm = SharedMemory(shm_name)
+        shms.append(shm)
+        features[name] = np.ndarray(shape=shape, dtype=dtype, buffer=shm.buf)
+    return features, shms
+
+
 def aggregate_sparse_features(peaks, peak_indices, sparse_feature, sparse_mask, target_channels):
     """
     Aggregate sparse features that have unaligned channels and realigned then on target_channels.
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import hashlib
+from pathlib import Path
 
 import numpy as np
 
@@ -54,6 +56,62 @@ def compress_templates(
     return temporal, singular, spatial, templates_array
 
 
+def compute_svd_overlaps(temporal, singular, spatial, sparsity_mask, units_overlaps):
+    """Compute the overlaps (scalar products at all lags) between pairs of SVD compressed templates.
+
+    Templates are low rank: template_i = (temporal_i * singular_i) @ spatial_i. The overlap between
+    template i and j is then a sum over (rank x rank) pairs of temporal correlations weighted by the
+    spatial scalar products on the channels of j. All temporal correlations are done at once in the
+    Fourier domain, and only for the pairs of templates with overlapping sparsity (units_overlaps).
+
+    Parameters
+    ----------
+    temporal : ndarray (num_templates, num_samples, rank)
+        Temporal components, already normalized and flipped in time (as used by CircusOMPSVDPeeler)
+    singular : ndarray (num_templates, rank)
+        Singular values
+    spatial : ndarray (num_templates, rank, num_channels)
+        Spatial components
+    sparsity_mask : ndarray (num_templates, num_channels)
+        The sparsity of the templates
+    units_overlaps : ndarray (num_templates, num_templates)
+        Boolean mask of the pairs of templates to consider
+
+    Returns
+    -------
+    overlaps : list of ndarray
+        For each template i, an array (num_overlapping_units, 2 * num_samples - 1) with the overlaps
+        with the templates np.flatnonzero(units_overlaps[i])
+    max_similarity : ndarray (num_templates, num_templates)
+        The maximum of the overlaps over lags
+    """
+    import scipy.fft
+
+    num_templates, num_samples, _ = temporal.shape
+    size = 2 * num_samples - 1
+    nfft = scipy.fft.next_fast_len(size, real=True)
+
+    # spatial components of j are only seen on the channels of j
+    masked_spatial = spatial * sparsity_mask[:, np.newaxis, :]
+    spectrum_flipped = scipy.fft.rfft(temporal, n=nfft, axis=1)
+    spectrum = scipy.fft.rfft(temporal[:, ::-1, :], n=nfft, axis=1)
+
+    overlaps = []
+    max_similarity = np.zeros((num_templates, num_templates), dtype=np.float32)
+    for i in range(num_templates):
+        (overlapping_units,) = np.nonzero(units_overlaps[i])
+        # weights[j, r, s] = singular_i[r] * <spatial_i[r], spatial_j[s]> * singular_j[s]
+        weights = np.matmul(spatial[i], masked_spatial[overlapping_units].transpose(0, 2, 1))
+        weights *= singular[i][np.newaxis, :, np.newaxis] * singular[overlapping_units][:, np.newaxis, :]
+        mixed = np.matmul(spectrum[i], weights)
+        unit_spectrum = np.sum(mixed * spectrum_flipped[overlapping_units], axis=2)
+        unit_overlaps = scipy.fft.irfft(unit_spectrum, n=nfft, axis=1)[:, :size].astype(np.float32)
+        max_similarity[i, overlapping_units] = np.max(unit_overlaps, axis=1)
+        overlaps.append(unit_overlaps)
+
+    return overlaps, max_similarity
+
+
 def compute_overlaps(templates, num_samples, num_channels, sparsities):
     import scipy.spatial
     import scipy
@@ -118,6 +176,9 @@ class CircusOMPSVDPeeler(BaseTemplateMatchingEngine):
     vicinity: int
         Size of the area surrounding a spike to perform modification (expressed in terms
         of template temporal width)
+    cache_folder: str | Path | None, default: None
+        If given, the compressed templates, norms and overlaps are saved in this folder and
+        reloaded by further runs with the same templates and rank
     -----
     """
 
@@ -131,8 +192,42 @@ class CircusOMPSVDPeeler(BaseTemplateMatchingEngine):
         "rank": 5,
         "ignore_inds": [],
         "vicinity": 3,
+        "cache_folder": None,
     }
 
+    # keys of the prepared template bank that are cached on disk
+    _cached_keys = ["temporal", "singular", "spatial", "norms", "max_similarity"]
+
+    @classmethod
+    def _get_cache_file(cls, d):
+        templates = d["templates"]
+        hasher = hashlib.sha1(np.ascontiguousarray(templates.templates_array).tobytes())
+        hasher.update(np.ascontiguousarray(templates.sparsity.mask).tobytes())
+        hasher.update(str(d["rank"]).encode())
+        return Path(d["cache_folder"]) / f"circus_omp_svd_{hasher.hexdigest()}.npz"
+
+    @classmethod
+    def _save_to_cache(cls, d, cache_file):
+        # overlaps are stored as a single compact array, the splits are given by units_overlaps
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        to_save = {key: d[key] for key in cls._cached_keys}
+        to_save["overlaps"] = np.concatenate(d["overlaps"], axis=0)
+        np.savez(cache_file, **to_save)
+
+    @classmethod
+    def _load_from_cache(cls, d, cache_file):
+        with np.load(cache_file) as data:
+            for key in cls._cached_keys:
+                d[key] = data[key]
+            all_overlaps = data["overlaps"]
+        splits = np.cumsum(np.sum(d["units_overlaps"], axis=1))[:-1]
+        d["overlaps"] = np.split(all_overlaps, splits, axis=0)
+        # the normed templates are rebuilt from the (normalized and flipped) SVD factors
+        normed_templates = np.einsum("rts,rt,rtc->tsc", d["temporal"], d["singular"][:, :, 0], d["spatial"])
+        d["normed_templates"] = np.flip(normed_templates, axis=1) * d["templates"].sparsity.mask[:, np.newaxis, :]
+        d["normed_templates"] = d["normed_templates"].astype(np.float32)
+        return d
+
     @classmethod
     def _prepare_templates(cls, d):
         templates = d["templates"]
@@ -148,6 +243,13 @@ class CircusOMPSVDPeeler(BaseTemplateMatchingEngine):
         for i in range(num_templates):
             (d["unit_overlaps_indices"][i],) = np.nonzero(d["units_overlaps"][i])
 
+        if d["cache_folder"] is not None:
+            cache_file = cls._get_cache_file(d)
+            if cache_file.exists():
+                d = cls._load_from_cache(d, cache_file)
+                cls._set_amplitudes(d)
+                return d
+
         templates_array = templates.get_dense_templates().copy()
         # Then we keep only the strongest components
         d["temporal"], d["singular"], d["spatial"], templates_array = compress_templates(templates_array, d["rank"])
@@ -164,46 +266,30 @@ class CircusOMPSVDPeeler(BaseTemplateMatchingEngine):
         d["temporal"] /= d["norms"][:, np.newaxis, np.newaxis]
         d["temporal"] = np.flip(d["temporal"], axis=1)
 
-        d["overlaps"] = []
-        d["max_similarity"] = np.zeros((num_templates, num_templates), dtype=np.float32)
-        for i in range(num_templates):
-            num_overlaps = np.sum(d["units_overlaps"][i])
-            overlapping_units = np.where(d["units_overlaps"][i])[0]
-
-            # Reconstruct unit template from SVD Matrices
-            data = d["temporal"][i] * d["singular"][i][np.newaxis, :]
-            template_i = np.matmul(data, d["spatial"][i, :, :])
-            template_i = np.flipud(template_i)
-
-            unit_overlaps = np.zeros([num_overlaps, 2 * d["num_samples"] - 1], dtype=np.float32)
-
-            for count, j in enumerate(overlapping_units):
-                overlapped_channels = sparsity[j]
-                visible_i = template_i[:, overlapped_channels]
-
-                spatial_filters = d["spatial"][j, :, overlapped_channels]
-                spatially_filtered_template = np.matmul(visible_i, spatial_filters)
-                visible_i = spatially_filtered_template * d["singular"][j]
+        d["overlaps"], d["max_similarity"] = compute_svd_overlaps(
+            d["temporal"], d["singular"], d["spatial"], sparsity, d["units_overlaps"]
+        )
 
-                for rank in range(visible_i.shape[1]):
-                    unit_overlaps[count, :] += np.convolve(visible_i[:, rank], d["temporal"][j][:, rank], mode="full")
+        d["spatial"] = np.moveaxis(d["spatial"], [0, 1, 2], [1, 0, 2])
+        d["temporal"] = np.moveaxis(d["temporal"], [0, 1, 2], [1, 2, 0])
+        d["singular"] = d["singular"].T[:, :, np.newaxis]
 
-                d["max_similarity"][i, j] = np.max(unit_overlaps[count])
+        if d["cache_folder"] is not None:
+            cls._save_to_cache(d, cache_file)
 
-            d["overlaps"].append(unit_overlaps)
+        cls._set_amplitudes(d)
+        return d
 
+    @classmethod
+    def _set_amplitudes(cls, d):
         if d["amplitudes"] is None:
+            num_templates = d["max_similarity"].shape[0]
             distances = np.sort(d["max_similarity"], axis=1)[:, ::-1]
             distances = 1 - distances[:, 1] / 2
             d["amplitudes"] = np.zeros((num_templates, 2))
             d["amplitudes"][:, 0] = distances
             d["amplitudes"][:, 1] = np.inf
 
-        d["spatial"] = np.moveaxis(d["spatial"], [0, 1, 2], [1, 0, 2])
-        d["temporal"] = np.moveaxis(d["temporal"], [0, 1, 2], [1, 2, 0])
-        d["singular"] = d["singular"].T[:, :, np.newaxis]
-        return d
-
     @classmethod
     def initialize_and_check_kwargs(cls, recording, kwargs):
         d = cls._default_params.copy()
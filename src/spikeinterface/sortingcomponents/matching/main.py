@@ -3,12 +3,19 @@ from __future__ import annotations
 from threadpoolctl import threadpool_limits
 import numpy as np
 
-from spikeinterface.core.job_tools import ChunkRecordingExecutor, fix_job_kwargs
+from spikeinterface.core.job_tools import ChunkRecordingExecutor, fix_job_kwargs, ensure_n_jobs
+from spikeinterface.core.core_tools import dumps_to_shared_memory, loads_from_shared_memory
 from spikeinterface.core import get_chunk_with_margin
 
 
 def find_spikes_from_templates(
-    recording, method="naive", method_kwargs={}, extra_outputs=False, verbose=False, **job_kwargs
+    recording,
+    method="naive",
+    method_kwargs={},
+    extra_outputs=False,
+    verbose=False,
+    use_shared_memory=True,
+    **job_kwargs,
 ) -> np.ndarray | tuple[np.ndarray, dict]:
     """Find spike from a recording from given templates.
 
@@ -26,6 +33,10 @@ def find_spikes_from_templates(
         Parameters for ChunkRecordingExecutor
     verbose : Bool, default: False
         If True, output is verbose
+    use_shared_memory : bool, default: True
+        When n_jobs > 1, the template bank (templates, compressed components, overlaps, norms...)
+        is placed once in shared memory and workers use it without copy, instead of each worker
+        receiving its own pickled copy.
 
     Returns
     -------
@@ -52,10 +63,14 @@ def find_spikes_from_templates(
     # serialiaze for worker
     method_kwargs_seralized = method_class.serialize_method_kwargs(method_kwargs)
 
+    shm = None
+    if use_shared_memory and ensure_n_jobs(recording, job_kwargs["n_jobs"]) > 1:
+        method_kwargs_seralized, shm = dumps_to_shared_memory(method_kwargs_seralized)
+
     # and run
     func = _find_spikes_chunk
     init_func = _init_worker_find_spikes
-    init_args = (recording, method, method_kwargs_seralized)
+    init_args = (recording, method, method_kwargs_seralized, shm is not None)
     processor = ChunkRecordingExecutor(
         recording,
         func,
@@ -66,7 +81,12 @@ def find_spikes_from_templates(
         verbose=verbose,
         **job_kwargs,
     )
-    spikes = processor.run()
+    try:
+        spikes = processor.run()
+    finally:
+        if shm is not None:
+            shm.close()
+            shm.unlink()
 
     spikes = np.concatenate(spikes)
 
@@ -76,16 +96,22 @@ def find_spikes_from_templates(
         return spikes
 
 
-def _init_worker_find_spikes(recording, method, method_kwargs):
+def _init_worker_find_spikes(recording, method, method_kwargs, in_shared_memory=False):
     """Initialize worker for finding spikes."""
 
     from .method_list import matching_methods
 
+    # create a local dict per worker
+    worker_ctx = {}
+
+    if in_shared_memory:
+        # arrays are read-only views on the shared template bank
+        method_kwargs, shm = loads_from_shared_memory(method_kwargs)
+        worker_ctx["shm"] = shm
+
     method_class = matching_methods[method]
     method_kwargs = method_class.unserialize_in_worker(method_kwargs)
 
-    # create a local dict per worker
-    worker_ctx = {}
     worker_ctx["recording"] = recording
     worker_ctx["method"] = method
     worker_ctx["method_kwargs"] = method_kwargs
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import numpy as np
 from spikeinterface.core.core_tools import define_function_from_class
+from spikeinterface.core.time_tools import PiecewiseLinearTimes
 from spikeinterface.preprocessing import get_spatial_interpolation_kernel
 from spikeinterface.preprocessing.basepreprocessor import BasePreprocessor, BasePreprocessorSegment
 from spikeinterface.preprocessing.filter import fix_dtype
@@ -433,7 +434,7 @@ class InterpolateMotionRecordingSegment(BasePreprocessorSegment):
         self.motion = motion
 
     def get_traces(self, start_frame, end_frame, channel_indices):
-        if self.time_vector is not None:
+        if self.time_vector is not None and not isinstance(self.time_vector, PiecewiseLinearTimes):
             raise NotImplementedError("InterpolateMotionRecording does not yet support recordings with time_vectors.")
 
         if start_frame is None:
@@ -441,7 +442,7 @@ class InterpolateMotionRecordingSegment(BasePreprocessorSegment):
         if end_frame is None:
             end_frame = self.get_num_samples()
 
-        times = self.parent_recording_segment.sample_index_to_time(np.arange(start_frame, end_frame))
+        times = self.parent_recording_segment.get_times(start_frame=start_frame, end_frame=end_frame)
         traces = self.parent_recording_segment.get_traces(start_frame, end_frame, channel_indices=slice(None))
         traces = traces.astype(self.dtype)
         traces = interpolate_motion_on_traces(
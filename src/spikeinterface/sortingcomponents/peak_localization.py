@@ -29,8 +29,10 @@ from ..postprocessing.unit_locations import (
 from ..postprocessing.localization_tools import (
     make_radial_order_parents,
     solve_monopolar_triangulation,
+    solve_monopolar_triangulation_batched,
     enforce_decrease_shells_data,
-    get_grid_convolution_templates_and_weights,
+    enforce_decrease_shells_data_batched,
+    get_grid_convolution_sparse_weights,
 )
 
 from .tools import get_prototype_spike
@@ -244,8 +246,12 @@ class LocalizeMonopolarTriangulation(PipelineNode):
     params_doc = """
     radius_um: float
         For channel sparsity.
-    max_distance_um: float, default: 1000
+    max_distance_um: float, default: 150
         Boundary for distance estimation.
+    optimizer: "least_square" | "minimize_with_log_penality" | "batched_lm", default: "minimize_with_log_penality"
+        The optimizer to use. "least_square" and "minimize_with_log_penality" solve each peak with scipy.
+        "batched_lm" solves the "least_square" problem for all peaks of a chunk at once with a vectorized
+        Levenberg-Marquardt, which is much faster for large number of peaks.
     enforce_decrease : bool, default: True
         Enforce spatial decreasingness for PTP vectors
     feature: "ptp", "energy", "peak_voltage", default: "ptp"
@@ -269,6 +275,11 @@ class LocalizeMonopolarTriangulation(PipelineNode):
         LocalizeBase.__init__(self, recording, return_output=return_output, parents=parents, radius_um=radius_um)
 
         assert feature in ["ptp", "energy", "peak_voltage"], f"{feature} is not a valid feature"
+        assert optimizer in (
+            "least_square",
+            "minimize_with_log_penality",
+            "batched_lm",
+        ), f"{optimizer} is not a valid optimizer"
         self.max_distance_um = max_distance_um
         self.optimizer = optimizer
         self.feature = feature
@@ -294,6 +305,9 @@ class LocalizeMonopolarTriangulation(PipelineNode):
         self._dtype = np.dtype(dtype_localize_by_method["monopolar_triangulation"])
 
     def compute(self, traces, peaks, waveforms):
+        if self.optimizer == "batched_lm":
+            return self._compute_batched(peaks, waveforms)
+
         peak_locations = np.zeros(peaks.size, dtype=self._dtype)
 
         for i, peak in enumerate(peaks):
@@ -321,6 +335,34 @@ class LocalizeMonopolarTriangulation(PipelineNode):
 
         return peak_locations
 
+    def _compute_batched(self, peaks, waveforms):
+        # peaks sharing the same main channel have the same neighborhood and are solved together
+        peak_locations = np.zeros(peaks.size, dtype=self._dtype)
+
+        for main_chan in np.unique(peaks["channel_index"]):
+            (idx,) = np.nonzero(peaks["channel_index"] == main_chan)
+            (chan_inds,) = np.nonzero(self.neighbours_mask[main_chan])
+            local_contact_locations = self.contact_locations[chan_inds, :]
+
+            wf = waveforms[idx][:, :, chan_inds]
+            if self.feature == "ptp":
+                wf_data = np.ptp(wf, axis=1)
+            elif self.feature == "energy":
+                wf_data = np.linalg.norm(wf, axis=1)
+            elif self.feature == "peak_voltage":
+                wf_data = np.abs(wf[:, self.nbefore])
+
+            if self.enforce_decrease_radial_parents is not None:
+                enforce_decrease_shells_data_batched(
+                    wf_data, main_chan, self.enforce_decrease_radial_parents, in_place=True
+                )
+
+            locations = solve_monopolar_triangulation_batched(wf_data, local_contact_locations, self.max_distance_um)
+            for i, name in enumerate(("x", "y", "z", "alpha")):
+                peak_locations[name][idx] = locations[:, i]
+
+        return peak_locations
+
 
 class LocalizeGridConvolution(PipelineNode):
     """Localize peaks using convolution with a grid of fake templates
@@ -352,6 +394,9 @@ class LocalizeGridConvolution(PipelineNode):
         Parameter that should be provided to the get_convolution_weights() function
         in order to know how to estimate the positions. One argument is mode that could
         be either gaussian_2d (KS like) or exponential_3d (default)
+    weights_cache_folder: str | Path | None, default: None
+        Folder where the sparse weights of the grid are cached, so they are computed only once
+        per probe geometry and parameters. If None, they are only cached in memory.
     """
 
     def __init__(
@@ -367,6 +412,7 @@ class LocalizeGridConvolution(PipelineNode):
         percentile=5.0,
         peak_sign="neg",
         weight_method={},
+        weights_cache_folder=None,
     ):
         PipelineNode.__init__(self, recording, return_output=return_output, parents=parents)
 
@@ -399,31 +445,29 @@ class LocalizeGridConvolution(PipelineNode):
 
         (
             self.template_positions,
-            self.weights,
-            self.nearest_template_mask,
+            self.sparse_weights,
             self.z_factors,
-        ) = get_grid_convolution_templates_and_weights(
+        ) = get_grid_convolution_sparse_weights(
             contact_locations,
             self.radius_um,
             self.upsampling_um,
             self.margin_um,
             self.weight_method,
+            cache_folder=weights_cache_folder,
         )
 
-        self.weights_sparsity_mask = self.weights > 0
         self._dtype = np.dtype(dtype_localize_by_method["grid_convolution"])
         self._kwargs.update(
             dict(
                 radius_um=self.radius_um,
                 prototype=self.prototype,
                 template_positions=self.template_positions,
-                nearest_template_mask=self.nearest_template_mask,
-                weights=self.weights,
                 nbefore=self.nbefore,
                 percentile=self.percentile,
                 peak_sign=self.peak_sign,
                 weight_method=self.weight_method,
                 z_factors=self.z_factors,
+                weights_cache_folder=None if weights_cache_folder is None else str(weights_cache_folder),
             )
         )
 
@@ -432,21 +476,17 @@ class LocalizeGridConvolution(PipelineNode):
 
     def compute(self, traces, peaks, waveforms):
         peak_locations = np.zeros(peaks.size, dtype=self._dtype)
-        nb_weights = self.weights.shape[0]
 
         for main_chan in np.unique(peaks["channel_index"]):
             (idx,) = np.nonzero(peaks["channel_index"] == main_chan)
             num_spikes = len(idx)
-            nearest_mask = self.nearest_template_mask[main_chan, :]
 
-            num_templates = np.sum(nearest_mask)
-            channel_mask = np.sum(self.weights_sparsity_mask[:, :, nearest_mask], axis=(0, 2)) > 0
-            sub_w = self.weights[:, channel_mask, :][:, :, nearest_mask]
-            global_products = (waveforms[idx][:, :, channel_mask] * self.prototype).sum(axis=1)
+            chan_inds = self.sparse_weights["channel_indices"][main_chan]
+            sub_w = self.sparse_weights["weights"][main_chan]
+            global_products = (waveforms[idx][:, :, chan_inds] * self.prototype).sum(axis=1)
 
-            dot_products = np.zeros((nb_weights, num_spikes, num_templates), dtype=np.float32)
-            for count in range(nb_weights):
-                dot_products[count] = np.dot(global_products, sub_w[count])
+            # (nb_weights, num_spikes, num_templates) in one batched product
+            dot_products = np.matmul(global_products.astype(np.float32), sub_w)
 
             mask = dot_products < 0
             if self.percentile > 0:
@@ -462,9 +502,8 @@ class LocalizeGridConvolution(PipelineNode):
 
             scalar_products = dot_products.sum(2)
             found_positions = np.zeros((num_spikes, 3), dtype=np.float32)
-            nearest_templates = self.template_positions[nearest_mask]
-            for count in range(nb_weights):
-                found_positions[:, :2] += np.dot(dot_products[count], nearest_templates)
+            nearest_templates = self.template_positions[self.sparse_weights["template_indices"][main_chan]]
+            found_positions[:, :2] = np.dot(dot_products.sum(axis=0), nearest_templates)
 
             ## Now we need to compute a putative depth given the z_factors
             found_positions[:, 2] = np.dot(self.z_factors, scalar_products)
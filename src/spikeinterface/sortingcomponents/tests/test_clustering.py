@@ -71,6 +71,16 @@ def test_find_cluster_from_peaks(clustering_method, recording, peaks, peak_locat
     print(clustering_method, "found", len(labels), "clusters in ", t1 - t0)
 
 
+@pytest.mark.parametrize("clustering_method", ["circus", "random_projections"])
+def test_clustering_tmp_folder_removed(clustering_method, recording, peaks, tmp_path, monkeypatch):
+    import spikeinterface.sortingcomponents.clustering.partition as partition
+
+    # the features of a run without tmp_folder are written in a temporary folder, removed at the end
+    monkeypatch.setattr(partition, "get_global_tmp_folder", lambda: tmp_path)
+    find_cluster_from_peaks(recording, peaks, method=clustering_method, method_kwargs={})
+    assert list(tmp_path.iterdir()) == []
+
+
 if __name__ == "__main__":
     job_kwargs = dict(n_jobs=1, chunk_size=10000, progress_bar=True)
     recording, sorting = make_dataset()
@@ -0,0 +1,59 @@
+import pytest
+import numpy as np
+
+from spikeinterface.sortingcomponents.clustering.partition import partition_clustering
+
+
+def make_partitioned_features(seed=0):
+    rng = np.random.default_rng(seed)
+    features = []
+    partition_labels = []
+    # 3 partitions with 2 well separated blobs each
+    for partition in range(3):
+        for center in (-10.0, 10.0):
+            features.append(rng.normal(loc=center, scale=0.5, size=(200, 3, 4)))
+            partition_labels.append(np.full(200, partition))
+    features = np.concatenate(features).astype("float32")
+    partition_labels = np.concatenate(partition_labels)
+    # shuffle like peaks sorted by time
+    order = rng.permutation(partition_labels.size)
+    return features[order], partition_labels[order]
+
+
+def test_partition_clustering(tmp_path):
+    pytest.importorskip("hdbscan")
+
+    features, partition_labels = make_partitioned_features()
+    method_kwargs = dict(n_components=2, clusterer_kwargs=dict(min_cluster_size=25))
+
+    peak_labels = partition_clustering(
+        partition_labels, dict(features=features), "features", method_kwargs=method_kwargs, n_jobs=1
+    )
+    assert peak_labels.size == partition_labels.size
+    assert np.unique(peak_labels[peak_labels >= 0]).size == 6
+    # every cluster belongs to a single partition
+    for label in np.unique(peak_labels[peak_labels >= 0]):
+        assert np.unique(partition_labels[peak_labels == label]).size == 1
+
+    # same result from a folder of npy files and from shared memory with several workers
+    np.save(tmp_path / "features.npy", features)
+    peak_labels_folder = partition_clustering(
+        partition_labels, tmp_path, "features", method_kwargs=method_kwargs, n_jobs=2, progress_bar=False
+    )
+    np.testing.assert_array_equal(peak_labels, peak_labels_folder)
+
+    peak_labels_shm = partition_clustering(
+        partition_labels, dict(features=features), "features", method_kwargs=method_kwargs, n_jobs=2
+    )
+    np.testing.assert_array_equal(peak_labels, peak_labels_shm)
+
+    # partition -1 is not clustered
+    partition_labels[partition_labels == 0] = -1
+    peak_labels = partition_clustering(
+        partition_labels, dict(features=features), "features", method_kwargs=method_kwargs, n_jobs=1
+    )
+    assert np.all(peak_labels[partition_labels == -1] == -1)
+
+
+if __name__ == "__main__":
+    test_partition_clustering()
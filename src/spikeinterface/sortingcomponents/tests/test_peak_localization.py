@@ -33,6 +33,15 @@ def test_localize_peaks():
     assert peaks.size == peak_locations.shape[0]
     list_locations.append(("least_square", peak_locations))
 
+    peak_locations_batched = localize_peaks(
+        recording, peaks, method="monopolar_triangulation", optimizer="batched_lm", **job_kwargs
+    )
+    assert peaks.size == peak_locations_batched.shape[0]
+    # same cost function than "least_square" so results must be very close
+    for dim in ("x", "y", "z"):
+        assert np.median(np.abs(peak_locations_batched[dim] - peak_locations[dim])) < 0.1
+    list_locations.append(("batched_lm", peak_locations_batched))
+
     peak_locations = localize_peaks(
         recording, peaks, method="monopolar_triangulation", optimizer="minimize_with_log_penality", **job_kwargs
     )
@@ -109,5 +118,37 @@ def test_localize_peaks():
     # plt.show()
 
 
+def test_grid_convolution_weights_cache(tmp_path):
+    from spikeinterface.postprocessing.localization_tools import (
+        get_grid_convolution_sparse_weights,
+        _grid_convolution_sparse_weights_cache,
+    )
+
+    recording, _ = make_dataset()
+    contact_locations = recording.get_channel_locations()
+
+    template_positions, sparse_weights, z_factors = get_grid_convolution_sparse_weights(
+        contact_locations, cache_folder=tmp_path
+    )
+    assert len(list(tmp_path.glob("grid_convolution_weights_*.npz"))) == 1
+    assert len(sparse_weights["weights"]) == contact_locations.shape[0]
+
+    # force reloading from disk
+    _grid_convolution_sparse_weights_cache.clear()
+    template_positions2, sparse_weights2, z_factors2 = get_grid_convolution_sparse_weights(
+        contact_locations, cache_folder=tmp_path
+    )
+    np.testing.assert_array_equal(template_positions, template_positions2)
+    for w, w2 in zip(sparse_weights["weights"], sparse_weights2["weights"]):
+        np.testing.assert_array_equal(w, w2)
+        # the weights are shared between the callers
+        assert not w2.flags.writeable
+
+    # the in-memory cache is bounded
+    for upsampling_um in (6, 7, 8, 9, 10):
+        get_grid_convolution_sparse_weights(contact_locations, upsampling_um=upsampling_um)
+    assert len(_grid_convolution_sparse_weights_cache) == 4
+
+
 if __name__ == "__main__":
     test_localize_peaks()
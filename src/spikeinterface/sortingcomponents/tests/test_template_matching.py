@@ -5,6 +5,7 @@ from pathlib import Path
 from spikeinterface import NumpySorting, create_sorting_analyzer, get_noise_levels, compute_sparsity
 
 from spikeinterface.sortingcomponents.matching import find_spikes_from_templates, matching_methods
+from spikeinterface.sortingcomponents.matching.circus import compress_templates, compute_svd_overlaps
 
 from spikeinterface.sortingcomponents.tests.common import make_dataset
 
@@ -76,6 +77,77 @@ def test_find_spikes_from_templates(method, sorting_analyzer):
     #     plt.show()
 
 
+@pytest.mark.parametrize("method", ["circus", "circus-omp-svd", "wobble", "tdc-peeler"])
+def test_find_spikes_from_templates_shared_memory(method, sorting_analyzer):
+    recording = sorting_analyzer.recording
+    templates = sorting_analyzer.get_extension("templates").get_data(outputs="Templates")
+    sparsity = compute_sparsity(sorting_analyzer, method="snr", threshold=0.5)
+    templates = templates.to_sparse(sparsity)
+    noise_levels = sorting_analyzer.get_extension("noise_levels").get_data()
+
+    spikes = {}
+    for n_jobs in (1, 2):
+        method_kwargs = {"templates": templates, "noise_levels": noise_levels}
+        spikes[n_jobs] = find_spikes_from_templates(
+            recording,
+            method=method,
+            method_kwargs=method_kwargs,
+            use_shared_memory=True,
+            n_jobs=n_jobs,
+            chunk_duration="500ms",
+            progress_bar=False,
+        )
+    # the workers use the template bank from the shared memory
+    np.testing.assert_array_equal(spikes[1], spikes[2])
+
+
+def test_circus_omp_svd_cache(sorting_analyzer, tmp_path):
+    recording = sorting_analyzer.recording
+    templates = sorting_analyzer.get_extension("templates").get_data(outputs="Templates")
+    sparsity = compute_sparsity(sorting_analyzer, method="snr", threshold=0.5)
+    templates = templates.to_sparse(sparsity)
+
+    method_kwargs = {"templates": templates, "cache_folder": tmp_path / "cache"}
+    local_job_kwargs = dict(n_jobs=1, chunk_duration="500ms", progress_bar=False)
+    spikes, computed = find_spikes_from_templates(
+        recording, method="circus-omp-svd", method_kwargs=method_kwargs, extra_outputs=True, **local_job_kwargs
+    )
+    assert len(list((tmp_path / "cache").glob("circus_omp_svd_*.npz"))) == 1
+
+    # second run reloads the template bank from the cache
+    spikes_cached, computed_cached = find_spikes_from_templates(
+        recording, method="circus-omp-svd", method_kwargs=method_kwargs, extra_outputs=True, **local_job_kwargs
+    )
+    for overlaps, overlaps_cached in zip(computed["overlaps"], computed_cached["overlaps"]):
+        np.testing.assert_array_equal(overlaps, overlaps_cached)
+    np.testing.assert_array_equal(spikes, spikes_cached)
+    np.testing.assert_allclose(computed["normed_templates"], computed_cached["normed_templates"], atol=1e-6)
+
+
+def test_compute_svd_overlaps():
+    rng = np.random.default_rng(0)
+    num_templates, num_samples, num_channels, rank = 6, 20, 8, 3
+    templates_array = rng.normal(size=(num_templates, num_samples, num_channels)).astype("float32")
+    sparsity_mask = rng.random((num_templates, num_channels)) > 0.4
+    sparsity_mask[:, 0] = True
+    units_overlaps = np.any(sparsity_mask[:, np.newaxis, :] & sparsity_mask[np.newaxis, :, :], axis=2)
+
+    temporal, singular, spatial, _ = compress_templates(templates_array, rank)
+    temporal = np.flip(temporal, axis=1)
+    overlaps, max_similarity = compute_svd_overlaps(temporal, singular, spatial, sparsity_mask, units_overlaps)
+
+    # reference: the former per pair and per rank np.convolve loop
+    for i in range(num_templates):
+        template_i = np.flipud(np.matmul(temporal[i] * singular[i][np.newaxis, :], spatial[i]))
+        for count, j in enumerate(np.flatnonzero(units_overlaps[i])):
+            visible_i = np.matmul(template_i[:, sparsity_mask[j]], spatial[j][:, sparsity_mask[j]].T) * singular[j]
+            expected = np.zeros(2 * num_samples - 1, dtype="float32")
+            for r in range(rank):
+                expected += np.convolve(visible_i[:, r], temporal[j][:, r], mode="full")
+            np.testing.assert_allclose(overlaps[i][count], expected, rtol=1e-4, atol=1e-4)
+            assert np.isclose(max_similarity[i, j], np.max(expected), rtol=1e-4, atol=1e-4)
+
+
 if __name__ == "__main__":
     sorting_analyzer = get_sorting_analyzer()
     # method = "naive"